@@ -0,0 +1,140 @@
+"""쓰기 세대(generation) 카운터와 그에 묶인 조회 결과 캐시
+
+세대는 이 프로세스의 쓰기 요청이 올리고, 다른 프로세스(일괄 입력 등)의 커밋은
+DATA_VERSION 카운터(sql/data_version.sql)로 알아낸다. 읽기 작업마다
+check_data_version()이 카운터를 확인하며, 이 프로세스가 커밋하지 않은 변경이면
+세대를 올리고 on_external_change()로 등록된 파생 캐시를 모두 비운다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# 응답 캐시만 쓰는 요청(DB를 거치지 않음)도 이 간격마다 한 번은 카운터를 확인한다
+DATA_VERSION_CHECK_INTERVAL = 1.0  # 초
+
+_generation = 0
+_generation_lock = threading.Lock()
+_data_version = None  # 이 프로세스가 알고 있는 DATA_VERSION.VERSION
+_data_checked = 0.0  # 마지막 확인 시각 (monotonic)
+_local_writes = 0  # 진행 중인 이 프로세스의 쓰기 트랜잭션 수
+_listeners = []
+
+
+def generation():
+    return _generation
+
+
+def bump_generation():
+    """데이터를 바꾼 쓰기 요청이 커밋된 뒤 호출. 세대에 묶인 캐시가 모두 무효가 된다."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def on_external_change(callback):
+    """다른 프로세스의 변경을 알았을 때 호출할 함수(인자 없음)를 등록한다."""
+    _listeners.append(callback)
+    return callback
+
+
+def read_data_version(db):
+    row = db.execute("SELECT VERSION FROM DATA_VERSION WHERE ID = 1").fetchone()
+    return row[0] if row else 0
+
+
+def _external_change():
+    bump_generation()
+    for callback in _listeners:
+        callback()
+
+
+def check_data_version(db):
+    """읽기 작업 전에 호출. 이 프로세스가 모르는 커밋이 있었으면 캐시를 버린다."""
+    global _data_version, _data_checked
+    version = read_data_version(db)
+    with _generation_lock:
+        _data_checked = time.monotonic()
+        # 이 프로세스의 쓰기가 커밋 직후일 수 있으므로 쓰기가 끝난 뒤에 판단한다
+        if version == _data_version or _local_writes:
+            return
+        changed = _data_version is not None
+        _data_version = version
+    if changed:
+        _external_change()
+
+
+def data_version_due():
+    """마지막 확인 후 DATA_VERSION_CHECK_INTERVAL이 지났는지"""
+    return time.monotonic() - _data_checked >= DATA_VERSION_CHECK_INTERVAL
+
+
+def begin_local_write():
+    """쓰기 트랜잭션(BEGIN IMMEDIATE) 직전에 호출"""
+    global _local_writes
+    with _generation_lock:
+        _local_writes += 1
+
+
+def end_local_write(before=None, after=None):
+    """쓰기 트랜잭션이 끝난 뒤 호출. before/after는 잠금을 쥔 채 읽은 트랜잭션 전후의
+    DATA_VERSION (롤백이면 None). before가 알고 있던 값과 다르면 그 사이에 다른
+    프로세스가 커밋한 것이다.
+    """
+    global _local_writes, _data_version
+    with _generation_lock:
+        _local_writes -= 1
+        if before is None:
+            return
+        changed = _data_version is not None and before != _data_version
+        _data_version = after
+    if changed:
+        _external_change()
+
+
+class CountCache:
+    """정규화된 (q, mode, 패싯) 필터별 전체 건수 캐시 (LRU).
+
+    항목은 계산 시작 시점의 세대와 함께 저장되며, 세대가 바뀌면 버려진다.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(q, mode, selected):
+        return (" ".join(q.lower().split()), mode, tuple(sorted(selected.items())))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != _generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, count, gen):
+        with self._lock:
+            self._entries[key] = (gen, count)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+count_cache = CountCache()
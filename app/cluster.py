@@ -0,0 +1,156 @@
+"""지도 저배율용 서버 측 마커 클러스터링 (격자 계층 색인)
+
+줌 z의 격자 한 칸은 화면에서 64px 크기이며, 2의 거듭제곱 격자를 쓰므로
+z+1의 네 칸이 정확히 z의 한 칸에 포함된다. 모든 줌 레벨의 칸별 집계(개수, 좌표 합,
+TOP_CD별 개수)를 미리 계산해 두고, 지점이 추가/이동/삭제되면 해당 칸만 갱신한다.
+"""
+
+import math
+import threading
+from collections import Counter
+
+from app.cache import on_external_change
+
+MIN_ZOOM = 0
+CLUSTER_MAX_ZOOM = 11  # 이보다 큰 줌에서는 개별 지점을 그대로 보낸다
+CELL_BITS = 2  # 타일(256px) 한 장을 2^2 x 2^2 칸으로 → 칸 하나 64px
+
+
+def _project(lat, lon):
+    """위경도 → 웹 메르카토르 정규 좌표 (0~1)"""
+    x = (lon + 180.0) / 360.0
+    s = math.sin(math.radians(max(min(lat, 85.0511), -85.0511)))
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return x, y
+
+
+class _Cell:
+    __slots__ = ("count", "sum_lat", "sum_lon", "tops", "ids")
+
+    def __init__(self):
+        self.count = 0
+        self.sum_lat = 0.0
+        self.sum_lon = 0.0
+        self.tops = Counter()
+        self.ids = None  # 최대 줌의 칸에서만 소속 SURVEY_NO를 보관
+
+
+class ClusterIndex:
+    def __init__(self, min_zoom=MIN_ZOOM, max_zoom=CLUSTER_MAX_ZOOM):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._points = {}  # SURVEY_NO → (lat, lon, top_cd, 최대 줌의 칸 좌표)
+        self._levels = {z: {} for z in range(min_zoom, max_zoom + 1)}
+
+    def _cell_key(self, lat, lon):
+        """최대 줌 기준 칸 좌표. 낮은 줌의 칸은 비트 시프트로 구한다."""
+        x, y = _project(lat, lon)
+        scale = 1 << (self.max_zoom + CELL_BITS)
+        return (
+            min(int(x * scale), scale - 1),
+            min(int(y * scale), scale - 1),
+        )
+
+    def _apply(self, survey_no, lat, lon, top_cd, sign):
+        if sign > 0:
+            cx, cy = self._cell_key(lat, lon)
+            self._points[survey_no] = (lat, lon, top_cd, cx, cy)
+        else:
+            lat, lon, top_cd, cx, cy = self._points.pop(survey_no)
+        for z in range(self.max_zoom, self.min_zoom - 1, -1):
+            shift = self.max_zoom - z
+            key = (cx >> shift, cy >> shift)
+            cells = self._levels[z]
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = _Cell()
+            cell.count += sign
+            cell.sum_lat += sign * lat
+            cell.sum_lon += sign * lon
+            cell.tops[top_cd or ""] += sign
+            if z == self.max_zoom:
+                if cell.ids is None:
+                    cell.ids = set()
+                if sign > 0:
+                    cell.ids.add(survey_no)
+                else:
+                    cell.ids.discard(survey_no)
+            if cell.count <= 0:
+                del cells[key]
+            elif cell.tops[top_cd or ""] <= 0:
+                del cell.tops[top_cd or ""]
+
+    def _load(self, db):
+        rows = db.execute(
+            """SELECT SURVEY_NO, LAT, LON, TY1_TOP_CD AS TOP_CD
+               FROM HERITAGE_READ
+               WHERE LAT IS NOT NULL AND LON IS NOT NULL"""
+        ).fetchall()
+        self._points = {}
+        self._levels = {z: {} for z in range(self.min_zoom, self.max_zoom + 1)}
+        for r in rows:
+            self._apply(r["SURVEY_NO"], r["LAT"], r["LON"], r["TOP_CD"], 1)
+        self._loaded = True
+
+    def ensure_loaded(self, db):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load(db)
+
+    def update(self, survey_no, lat, lon, top_cd):
+        """지점 추가/이동. 좌표가 없으면 색인에서 뺀다."""
+        with self._lock:
+            if not self._loaded:
+                return
+            if survey_no in self._points:
+                self._apply(survey_no, None, None, None, -1)
+            if lat is not None and lon is not None:
+                self._apply(survey_no, lat, lon, top_cd, 1)
+
+    def remove(self, survey_no):
+        with self._lock:
+            if self._loaded and survey_no in self._points:
+                self._apply(survey_no, None, None, None, -1)
+
+    def invalidate(self):
+        """다른 프로세스(일괄 입력 등)가 좌표를 바꾼 뒤 호출 (app.cache.on_external_change).
+
+        다음 ensure_loaded()가 전체를 다시 읽으며, 그 전까지는 이전 집계를 그대로 쓴다.
+        """
+        with self._lock:
+            self._loaded = False
+
+    def _single(self, zoom, key):
+        """지점이 하나뿐인 칸: 비어 있지 않은 자식 칸을 따라 최대 줌까지 내려간다."""
+        x, y = key
+        for z in range(zoom + 1, self.max_zoom + 1):
+            cells = self._levels[z]
+            x, y = next(
+                (cx, cy)
+                for cx in (2 * x, 2 * x + 1)
+                for cy in (2 * y, 2 * y + 1)
+                if (cx, cy) in cells
+            )
+        return next(iter(self._levels[self.max_zoom][(x, y)].ids))
+
+    def clusters(self, bbox, zoom):
+        """bbox 안의 칸 목록: (중심 위도, 중심 경도, 개수, TOP_CD별 개수, 단일 지점 SURVEY_NO)"""
+        zoom = max(self.min_zoom, min(zoom, self.max_zoom))
+        min_lon, min_lat, max_lon, max_lat = bbox
+        out = []
+        with self._lock:
+            for key, cell in self._levels[zoom].items():
+                lat = cell.sum_lat / cell.count
+                lon = cell.sum_lon / cell.count
+                if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                    continue
+                single = self._single(zoom, key) if cell.count == 1 else None
+                out.append((lat, lon, cell.count, dict(cell.tops), single))
+        return out
+
+
+clusters = ClusterIndex()
+on_external_change(clusters.invalidate)
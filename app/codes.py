@@ -0,0 +1,109 @@
+"""분류코드(COMMON_CODE) 메모리 캐시
+
+수십 행짜리에 거의 바뀌지 않는 표이므로 한 번 읽어 불변 튜플과 색인 dict로 보관한다.
+TTL이 지나거나 invalidate()가 호출되면 다음 조회 때 다시 읽으며, 내용이 달라졌을
+때만 version이 올라간다 (응답 캐시/ETag 등에서 분류코드 판본으로 쓸 수 있다).
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+from app.cache import on_external_change
+
+CODE_TTL = 300.0  # 초
+
+
+class Code(NamedTuple):
+    CODE: str
+    CODE_NM: str | None
+    TOP_CD: str | None
+    TOP_CD_NM: str | None
+    MID_CD: str | None
+    MID_CD_NM: str | None
+
+
+class TopCode(NamedTuple):
+    TOP_CD: str
+    TOP_CD_NM: str | None
+
+
+class CodeSnapshot(NamedTuple):
+    version: int
+    codes: tuple  # Code, CODE 순
+    tops: tuple  # TopCode, TOP_CD 순
+    by_code: MappingProxyType  # CODE → Code
+    by_top: MappingProxyType  # TOP_CD → (Code, ...)
+
+
+def _build(rows, version):
+    codes = tuple(Code(*r) for r in rows)
+    by_top = {}
+    for c in codes:
+        by_top.setdefault(c.TOP_CD, []).append(c)
+    tops = tuple(
+        TopCode(top, members[0].TOP_CD_NM)
+        for top, members in sorted(by_top.items(), key=lambda kv: kv[0] or "")
+        if top
+    )
+    return CodeSnapshot(
+        version=version,
+        codes=codes,
+        tops=tops,
+        by_code=MappingProxyType({c.CODE: c for c in codes}),
+        by_top=MappingProxyType({k: tuple(v) for k, v in by_top.items()}),
+    )
+
+
+class CodeCache:
+    def __init__(self, ttl=CODE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db):
+        """현재 분류코드 스냅샷. 비어 있거나 TTL이 지났으면 db에서 다시 읽는다."""
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._loaded_at < self.ttl:
+            self.hits += 1
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and time.monotonic() - self._loaded_at < self.ttl:
+                self.hits += 1
+                return snap
+            self.misses += 1
+            rows = db.execute(
+                """SELECT CODE, CODE_NM, TOP_CD, TOP_CD_NM, MID_CD, MID_CD_NM
+                   FROM COMMON_CODE ORDER BY CODE"""
+            ).fetchall()
+            rows = [tuple(r) for r in rows]
+            if snap is not None and [tuple(c) for c in snap.codes] == rows:
+                version = snap.version
+            else:
+                version = (snap.version if snap else 0) + 1
+            self._snapshot = _build(rows, version)
+            self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        """COMMON_CODE를 바꾼 뒤 호출. 다음 조회 때 다시 읽는다."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def stats(self):
+        snap = self._snapshot
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "version": snap.version if snap else None,
+            "size": len(snap.codes) if snap else 0,
+        }
+
+
+code_cache = CodeCache()
+on_external_change(code_cache.invalidate)
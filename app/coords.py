@@ -0,0 +1,138 @@
+"""위경도 DMS 문자열 일괄 변환/검증 (입력 스크립트용)
+
+한 배치의 좌표 문자열 전체를 컴파일된 정규식 한 번으로 나눈 뒤, 도/분/초/부호
+열(list)끼리 한꺼번에 십진 도로 바꾼다. 잘못된 값은 예외 대신 레코드별 오류로
+돌려주며, 범위(한반도) 밖이거나 위도/경도가 뒤바뀐 점도 함께 표시한다.
+
+허용 형식: 34°44′19.18″N, 34°44'19.18"N, 34° 44′ 19.18″ N, N34°44′19.18″,
+34°44.3197′N(십진 분), 34.738661°N(십진 도). 여러 점을 '/'로 이은 값은 첫 점을 쓴다.
+"""
+
+import re
+from typing import NamedTuple
+
+# 한반도와 부속 도서 (마라도, 독도 포함) — (최소 위도, 최대 위도, 최소 경도, 최대 경도)
+KOREA_BOUNDS = (32.8, 43.1, 124.0, 132.0)
+
+# 열 전체를 줄바꿈으로 이어 한 번에 훑는다. 줄마다 정확히 한 번 일치하며,
+# 형식에 맞지 않는 줄은 bad 그룹으로 떨어진다.
+DMS_RE = re.compile(
+    r"""^[ \t]*(?:
+          (?P<pre>[NSEWnsew])?[ \t]*
+          (?P<deg>\d{1,3}(?:\.\d+)?)[ \t]*[°º˚][ \t]*
+          (?:(?P<min>\d{1,2}(?:\.\d+)?)[ \t]*[′'’][ \t]*
+             (?:(?P<sec>\d{1,2}(?:\.\d+)?)[ \t]*(?:″|"|”|′′|'')[ \t]*)?
+          )?
+          (?P<post>[NSEWnsew])?[ \t]*(?P<rest>/.*)?
+        |(?P<bad>.*))$""",
+    re.VERBOSE | re.MULTILINE,
+)
+AXIS = {"N": "lat", "S": "lat", "E": "lon", "W": "lon"}
+
+
+class Coord(NamedTuple):
+    lat: float | None
+    lon: float | None
+    errors: tuple  # 이 레코드의 좌표를 쓸 수 없는 이유
+    warnings: tuple  # 고쳐서 썼거나 일부만 쓴 경우
+
+
+def parse_dms_column(values, field="dms"):
+    """DMS 문자열 목록 → (십진 도 목록, 반구 목록, 오류 목록, 경고 목록). 빈 값은 None.
+
+    분/초가 정확히 60인 값은 반올림 자리올림으로 보고 받아들인다. 문자열이 아닌 값
+    (JSON 숫자 등)은 예외 대신 그 칸의 오류로 남긴다.
+    """
+    values = list(values)
+    n = len(values)
+    out, hemis, errors, warnings = [None] * n, [None] * n, [None] * n, [None] * n
+    text = "\n".join(v.replace("\n", " ") if v and isinstance(v, str) else "" for v in values)
+    rows = DMS_RE.findall(text)  # 일치하지 않은 그룹은 ''
+    ok = []
+    for i, (value, (pre, deg, minutes, sec, post, rest, bad)) in enumerate(zip(values, rows)):
+        if value is not None and not isinstance(value, str):
+            errors[i] = f"{field}: expected a string, got {type(value).__name__}"
+            continue
+        if not value:
+            continue
+        if bad:
+            errors[i] = f"{field}: cannot parse {value!r}"
+        elif pre and post or not (pre or post):
+            errors[i] = f"{field}: needs one N/S/E/W hemisphere in {value!r}"
+        elif sec and "." in minutes:
+            errors[i] = f"{field}: decimal minutes with seconds in {value!r}"
+        else:
+            ok.append(i)
+            if rest:
+                warnings[i] = f"{field}: {rest.count('/') + 1} points, using the first"
+    # 형식이 맞은 값만 열 단위로 모아 한꺼번에 계산한다
+    picked = [rows[i] for i in ok]
+    degs = [float(r[1]) for r in picked]
+    mins = [float(r[2] or 0) for r in picked]
+    secs = [float(r[3] or 0) for r in picked]
+    hemi = [(r[0] or r[4]).upper() for r in picked]
+    for i, h, d, m, x in zip(ok, hemi, degs, mins, secs):
+        if m > 60 or x > 60:
+            errors[i] = f"{field}: minutes/seconds out of range in {values[i]!r}"
+            warnings[i] = None
+            continue
+        dd = round(d + m / 60 + x / 3600, 6)
+        out[i] = -dd if h in ("S", "W") else dd
+        hemis[i] = h
+    return out, hemis, errors, warnings
+
+
+def _in_bounds(lat, lon, bounds):
+    min_lat, max_lat, min_lon, max_lon = bounds
+    return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+
+def _check(lat, lon, lat_hemi, lon_hemi, errors, warnings, bounds):
+    """한 점의 느린 경로: 빠진 값, 뒤바뀐 위도/경도, 범위 검사 → Coord"""
+    if errors or (lat is None and lon is None):
+        return Coord(None, None, tuple(errors), tuple(warnings))
+    if lat is None or lon is None:
+        missing = "lat" if lat is None else "lon"
+        return Coord(None, None, (f"{missing}: missing",), tuple(warnings))
+    axes = (AXIS[lat_hemi], AXIS[lon_hemi])
+    if axes == ("lon", "lat") or (
+        axes == ("lat", "lon")
+        and not _in_bounds(lat, lon, bounds)
+        and _in_bounds(lon, lat, bounds)
+    ):
+        lat, lon = lon, lat
+        warnings.append("lat/lon swapped, corrected")
+    elif axes[0] == axes[1]:
+        errors.append(f"lat/lon: both values are {axes[0]} ({lat_hemi}/{lon_hemi})")
+    if not errors and not _in_bounds(lat, lon, bounds):
+        errors.append(f"lat/lon: ({lat}, {lon}) outside {bounds}")
+    if errors:
+        return Coord(None, None, tuple(errors), tuple(warnings))
+    return Coord(lat, lon, (), tuple(warnings))
+
+
+def parse_coordinates(pairs, bounds=KOREA_BOUNDS):
+    """(lat_dms, lon_dms) 목록 → Coord 목록 (같은 순서).
+
+    위도 칸에 E/W, 경도 칸에 N/S가 있거나, 범위 밖인데 바꾸면 범위 안에 드는 점은
+    위도/경도가 뒤바뀐 것으로 보고 바꿔 쓰며 경고를 남긴다. 그래도 bounds 밖이면
+    오류다. 위도/경도 중 하나만 있으면 둘 다 쓰지 않는다.
+    """
+    pairs = list(pairs)
+    lats, lat_hemi, lat_err, lat_warn = parse_dms_column([p[0] for p in pairs], "lat")
+    lons, lon_hemi, lon_err, lon_warn = parse_dms_column([p[1] for p in pairs], "lon")
+    min_lat, max_lat, min_lon, max_lon = bounds
+    # 대부분인 정상 값(N/E, 경고 없음, 범위 안)은 바로 통과시키고 나머지만 따로 본다
+    out = [
+        Coord(lat, lon, (), ())
+        if lh == "N" and oh == "E" and not (lw or ow)
+        and min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+        else None
+        for lat, lon, lh, oh, lw, ow in zip(lats, lons, lat_hemi, lon_hemi, lat_warn, lon_warn)
+    ]
+    for i, coord in enumerate(out):
+        if coord is None:
+            errors = [e for e in (lat_err[i], lon_err[i]) if e]
+            warnings = [w for w in (lat_warn[i], lon_warn[i]) if w]
+            out[i] = _check(lats[i], lons[i], lat_hemi[i], lon_hemi[i], errors, warnings, bounds)
+    return out
@@ -1,14 +1,253 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.metrics import TracedConnection, connect_seconds, query_tracer
+
 DB_PATH = Path(__file__).resolve().parent.parent / "ghc2026.db"
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+
+# 기본 스키마 위에 얹는 색인/트리거 (모두 IF NOT EXISTS로 재실행 가능)
+SCHEMA_EXTENSIONS = (
+    "heritage_search.sql", "heritage_geo.sql", "heritage_read.sql", "import_state.sql",
+    "data_version.sql",
+)
+# 기존 DB에 없으면 추가하는 컬럼 (기본 스키마 파일에는 이미 반영됨)
+COLUMN_EXTENSIONS = {
+    "CHT_IMAG_DM": (
+        ("FILE_HASH", "TEXT"),
+        ("IMG_WIDTH", "INTEGER"),
+        ("IMG_HEIGHT", "INTEGER"),
+    ),
+}
+# 컬럼이 늘어난 파생 테이블: 옛 정의가 남아 있으면 지우고 스키마 파일로 다시 만든다
+DERIVED_COLUMNS = {"HERITAGE_READ": ("AREA_NM", "SURVEY_YEAR", "TY1_MID_CD")}
+# rowid를 GEOLOGICAL_CULTURAL_HERITAGE의 rowid와 맞춰 두는 색인/읽기 테이블
+ROWID_INDEXES = ("HERITAGE_FTS", "HERITAGE_RTREE", "HERITAGE_READ")
+
+READ_POOL_SIZE = 8
+WRITE_POOL_SIZE = 1  # SQLite는 동시에 한 writer만 허용
+POOL_TIMEOUT = 30.0  # 초
+STATEMENT_CACHE_SIZE = 256
+
+# 연결마다 한 번만 실행되는 설정
+PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",  # WAL 모드에서는 NORMAL로도 DB 손상 없음
+    "PRAGMA cache_size = -32000",  # 32 MB (음수 = KiB 단위)
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class PoolTimeout(RuntimeError):
+    """풀에서 제한 시간 안에 연결을 얻지 못함"""
+
+
+class ConnectionPool:
+    """고정 크기 SQLite 연결 풀.
+
+    연결은 처음 필요할 때 만들어 재사용하므로 페이지 캐시와
+    prepared statement 캐시(cached_statements)가 요청 사이에 유지된다.
+    """
+
+    def __init__(self, db_path, size, readonly=False, timeout=POOL_TIMEOUT):
+        self.db_path = str(db_path)
+        self.size = size
+        self.readonly = readonly
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _connect(self):
+        start = time.perf_counter()
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=TracedConnection,
+        )
+        conn.row_factory = sqlite3.Row
+        if not self.readonly:
+            conn.execute("PRAGMA journal_mode = WAL")
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        if self.readonly:
+            conn.execute("PRAGMA query_only = ON")
+        connect_seconds.observe(
+            time.perf_counter() - start, "read" if self.readonly else "write"
+        )
+        query_tracer.attach(conn)
+        return conn
+
+    def acquire(self):
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._all) < self.size:
+                    conn = self._connect()
+                    self._all.append(conn)
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise PoolTimeout(
+                        f"no connection available within {self.timeout}s"
+                    ) from None
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        # 커밋되지 않은 작업은 다음 사용자에게 넘기지 않는다
+        if conn.in_transaction:
+            conn.rollback()
+        query_tracer.finish(conn)
+        self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
+
+    def stats(self):
+        with self._lock:
+            opened = len(self._all)
+            idle = self._idle.qsize()
+            return {
+                "size": self.size,
+                "open": opened,
+                "idle": idle,
+                "in_use": opened - idle,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_total * 1000, 3),
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(kind):
+    pool = _pools.get(kind)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(kind)
+            if pool is None:
+                if kind == "write":
+                    pool = ConnectionPool(DB_PATH, WRITE_POOL_SIZE)
+                else:
+                    pool = ConnectionPool(DB_PATH, READ_POOL_SIZE, readonly=True)
+                _pools[kind] = pool
+    return pool
+
+
+def _rowids_stale(conn, table):
+    """VACUUM 등으로 유산 테이블 rowid가 바뀌어 색인과 어긋났는지 확인"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", [table]
+    ).fetchone()
+    if not exists:
+        return False
+    return conn.execute(
+        f"""SELECT 1 FROM {table} t
+            LEFT JOIN GEOLOGICAL_CULTURAL_HERITAGE h ON h.rowid = t.rowid
+            WHERE h.SURVEY_NO IS NOT t.SURVEY_NO LIMIT 1"""
+    ).fetchone() is not None
+
+
+def _drop_derived(conn, table):
+    """파생 테이블과 그 테이블을 채우는 뷰/트리거를 지운다"""
+    objects = conn.execute(
+        """SELECT type, name FROM sqlite_master
+           WHERE type IN ('trigger', 'view') AND instr(sql, ?) > 0""",
+        [table],
+    ).fetchall()
+    for kind, name in objects:
+        conn.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def init_db(conn):
+    """빠진 컬럼과 부가 색인/트리거를 만들고, rowid가 어긋난 색인은 비운 뒤 다시 채운다."""
+    for table, columns in COLUMN_EXTENSIONS.items():
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        for name, decl in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+    for table, columns in DERIVED_COLUMNS.items():
+        existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if existing and not existing.issuperset(columns):
+            _drop_derived(conn, table)
+    conn.commit()
+    for table in ROWID_INDEXES:
+        if _rowids_stale(conn, table):
+            conn.execute(f"DELETE FROM {table}")
+            conn.commit()
+    for name in SCHEMA_EXTENSIONS:
+        conn.executescript((SQL_DIR / name).read_text(encoding="utf-8"))
+
+
+def open_pools():
+    """앱 시작 시 호출. writer 연결로 WAL 모드와 부가 스키마를 보장한다."""
+    write_pool = _pool("write")
+    conn = write_pool.acquire()
+    try:
+        init_db(conn)
+    finally:
+        write_pool.release(conn)
+    _pool("read")
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def pool_stats():
+    return {kind: pool.stats() for kind, pool in _pools.items()}
+
+
+@contextmanager
+def read_db():
+    """읽기 전용 연결. 라우트는 직접 쓰지 않고 app.executor의 run_read를 거친다."""
+    pool = _pool("read")
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
 
 
-def get_db():
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+@contextmanager
+def write_db():
+    """쓰기 연결. 커밋되지 않은 작업은 반납 시 롤백된다."""
+    pool = _pool("write")
+    conn = pool.acquire()
     try:
         yield conn
     finally:
-        conn.close()
+        pool.release(conn)
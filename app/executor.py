@@ -0,0 +1,136 @@
+"""async 라우트용 SQLite 전용 실행기
+
+읽기는 읽기 풀 크기만큼의 스레드에서, 쓰기는 스레드 하나에서 차례로 실행한다
+(SQLite는 writer가 하나뿐이므로). Starlette 기본 스레드풀과 분리되어 있어 느린
+쿼리가 정적 파일 등 다른 요청을 막지 않는다. 대기 작업이 한도를 넘으면
+Overloaded를 던지고, 앱은 503으로 응답한다.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.cache import check_data_version
+from app.database import READ_POOL_SIZE, WRITE_POOL_SIZE, read_db, write_db
+from app.metrics import add_timing
+
+READ_QUEUE_LIMIT = 64  # 실행 중인 작업 외에 기다릴 수 있는 읽기 작업 수
+WRITE_QUEUE_LIMIT = 16
+
+
+class Overloaded(RuntimeError):
+    """대기열이 가득 차 작업을 받지 않음"""
+
+
+class DBExecutor:
+    def __init__(self, name, workers, queue_limit, connect, prepare=None):
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._connect = connect
+        self._prepare = prepare  # 작업 함수 전에 같은 연결로 실행할 함수
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0  # 제출되었지만 끝나지 않은 작업 (대기 + 실행 중)
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix=f"sqlite-{self.name}"
+                    )
+        return self._executor
+
+    def _job(self, fn, submitted):
+        started = time.perf_counter()
+        waited = started - submitted
+        with self._lock:
+            self.running += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        add_timing("queue", waited)
+        try:
+            with self._connect() as db:
+                if self._prepare is not None:
+                    self._prepare(db)
+                return fn(db)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def run(self, fn):
+        """fn(db)를 전용 스레드에서 실행하고 결과를 돌려준다."""
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise Overloaded(f"{self.name} queue is full")
+            self.pending += 1
+            self.max_queued = max(self.max_queued, self.pending - self.running)
+        # 요청별 계측(current_timing)이 작업 스레드에도 보이도록 컨텍스트를 넘긴다
+        ctx = contextvars.copy_context()
+        try:
+            future = self._pool().submit(ctx.run, self._job, fn, time.perf_counter())
+        except BaseException:
+            self._done(None)
+            raise
+        # 요청이 취소되어도 스레드의 작업은 계속 돌므로, 대기 수는 작업이 실제로
+        # 끝나거나(또는 시작 전에 취소되거나) 할 때 줄인다
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "queue_limit": self.queue_limit,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_total": round(self.wait_total * 1000, 3),
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+# 읽기 작업마다 다른 프로세스의 커밋이 있었는지 먼저 확인한다 (app.cache)
+reads = DBExecutor("read", READ_POOL_SIZE, READ_QUEUE_LIMIT, read_db, check_data_version)
+writes = DBExecutor("write", WRITE_POOL_SIZE, WRITE_QUEUE_LIMIT, write_db)
+
+
+async def run_read(fn):
+    return await reads.run(fn)
+
+
+async def run_write(fn):
+    return await writes.run(fn)
+
+
+def shutdown_executors():
+    reads.shutdown()
+    writes.shutdown()
+
+
+def executor_stats():
+    return {"read": reads.stats(), "write": writes.stats()}
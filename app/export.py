@@ -0,0 +1,181 @@
+"""전체 데이터 내보내기 (NDJSON / CSV / GeoJSON 스트리밍)
+
+유산 행은 SURVEY_NO 기준 keyset 페이지로 EXPORT_CHUNK개씩 읽기 실행기(run_read)에서
+가져오고, 동굴/참고문헌은 그 페이지의 SURVEY_NO로 한 번씩 조회해 중첩한다. 페이지를
+읽는 동안만 연결을 빌리므로 느린 다운로드가 읽기 풀 연결이나 스냅샷을 붙잡지 않는다.
+(페이지마다 스냅샷이 다르므로 내보내는 도중 저장된 변경은 아직 안 보낸 행에만 반영된다.)
+"""
+
+import asyncio
+import csv
+import io
+import json
+import zlib
+
+from app.executor import Overloaded, run_read
+
+EXPORT_CHUNK = 500
+OVERLOAD_RETRY_DELAY = 0.2  # 둘째 페이지부터 대기열이 가득 차면 이만큼 쉬고 다시 시도
+OVERLOAD_RETRY_LIMIT = 150  # 약 30초 (POOL_TIMEOUT과 같은 수준)
+
+# 형식 → (media type, 파일 확장자)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "geojson": ("application/geo+json", "geojson"),
+}
+
+
+def _columns(db, table):
+    return [r[1] for r in db.execute(f"PRAGMA table_info({table})")]
+
+
+def fetch_page(db, join, where, params, after, limit=EXPORT_CHUNK):
+    """SURVEY_NO가 after보다 큰 다음 limit건의 (유산 dict, 동굴 dict 또는 None, 참고문헌 dict 목록)"""
+    # 조건(join/where)은 목록과 같이 HERITAGE_READ(h) 기준이고, 내보낼 값은 유산 테이블(g)에서 읽는다
+    keyset = "h.SURVEY_NO > ?"
+    where = f"{where} AND {keyset}" if where else f"WHERE {keyset}"
+    rows = db.execute(
+        f"""SELECT g.* FROM HERITAGE_READ h
+            JOIN GEOLOGICAL_CULTURAL_HERITAGE g ON g.rowid = h.ID
+            {join} {where} ORDER BY h.SURVEY_NO LIMIT ?""",
+        [*params, after, limit],
+    ).fetchall()
+    if not rows:
+        return []
+    ids = [r["SURVEY_NO"] for r in rows]
+    marks = ",".join("?" * len(ids))
+    caves = {
+        r["SURVEY_NO"]: dict(r)
+        for r in db.execute(
+            f"SELECT * FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO IN ({marks})", ids
+        )
+    }
+    refs = {}
+    for r in db.execute(
+        f"""SELECT * FROM REFERENCE_MATERIAL WHERE SURVEY_NO IN ({marks})
+            ORDER BY SURVEY_NO, GROUP_GBN, ORDR""",
+        ids,
+    ):
+        refs.setdefault(r["SURVEY_NO"], []).append(dict(r))
+    return [(dict(r), caves.get(r["SURVEY_NO"]), refs.get(r["SURVEY_NO"], [])) for r in rows]
+
+
+class ExportWriter:
+    """형식별 직렬화와 gzip 압축 상태를 페이지 사이에 이어 간다."""
+
+    def __init__(self, fmt, gzip=False):
+        self.fmt = fmt
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self._sep = ""
+        self._heritage_cols = self._cave_cols = None
+        self._buf = io.StringIO()
+        self._csv = csv.writer(self._buf)
+
+    def prepare(self, db):
+        """CSV 컬럼 목록을 읽어 둔다 (첫 페이지와 같은 읽기 작업에서 호출)."""
+        if self.fmt == "csv":
+            self._heritage_cols = _columns(db, "GEOLOGICAL_CULTURAL_HERITAGE")
+            self._cave_cols = [
+                c for c in _columns(db, "GEOLOGICAL_CULTURAL_CAVE") if c != "SURVEY_NO"
+            ]
+
+    def _csv_row(self, row):
+        self._csv.writerow(row)
+        text = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return text
+
+    def _encode(self, parts, final=False):
+        data = "".join(parts).encode("utf-8")
+        if self._compressor:
+            data = self._compressor.compress(data)
+            if final:
+                data += self._compressor.flush()
+        return data
+
+    def header(self):
+        if self.fmt == "geojson":
+            return self._encode(['{"type":"FeatureCollection","features":['])
+        if self.fmt == "csv":
+            cols = self._heritage_cols
+            # 엑셀에서 한글이 깨지지 않도록 BOM을 붙인다
+            return self._encode([self._csv_row(
+                ["\ufeff" + cols[0]] + cols[1:]
+                + [f"CAVE_{c}" for c in self._cave_cols] + ["REFERENCES"]
+            )])
+        return b""
+
+    def page(self, records):
+        """fetch_page 결과 한 페이지 → 바이트 (압축 중이면 빈 값일 수 있음)"""
+        parts = []
+        for heritage, cave, refs in records:
+            if self.fmt == "csv":
+                # 유산 컬럼 + CAVE_ 접두 동굴 컬럼 + 참고문헌(JSON 문자열) 한 줄씩
+                parts.append(self._csv_row(
+                    [heritage.get(c) for c in self._heritage_cols]
+                    + [cave.get(c) if cave else None for c in self._cave_cols]
+                    + [json.dumps(refs, ensure_ascii=False) if refs else None]
+                ))
+                continue
+            heritage["cave"] = cave
+            heritage["references"] = refs
+            if self.fmt == "ndjson":
+                parts.append(json.dumps(heritage, ensure_ascii=False) + "\n")
+                continue
+            lat, lon = heritage["LAT"], heritage["LON"]
+            feature = {
+                "type": "Feature",
+                "geometry": (
+                    {"type": "Point", "coordinates": [lon, lat]}
+                    if lat is not None and lon is not None
+                    else None
+                ),
+                "properties": heritage,
+            }
+            parts.append(self._sep + json.dumps(feature, ensure_ascii=False))
+            self._sep = ","
+        return self._encode(parts)
+
+    def footer(self):
+        return self._encode(["]}\n" if self.fmt == "geojson" else ""], final=True)
+
+
+async def _next_page(join, where, params, after):
+    """다음 페이지. 응답을 이미 보내기 시작했으므로 대기열이 가득 차면 잠시 기다렸다 다시 시도한다."""
+    for _ in range(OVERLOAD_RETRY_LIMIT):
+        try:
+            return await run_read(lambda db: fetch_page(db, join, where, params, after))
+        except Overloaded:
+            await asyncio.sleep(OVERLOAD_RETRY_DELAY)
+    return await run_read(lambda db: fetch_page(db, join, where, params, after))
+
+
+async def open_export(fmt, join, where, params, gzip=False):
+    """첫 페이지를 읽고 본문 바이트를 내는 async 제너레이터를 돌려준다.
+
+    첫 페이지는 응답 전에 읽으므로 읽기 대기열이 가득 차면 Overloaded(503)가 그대로 전달된다.
+    """
+    writer = ExportWriter(fmt, gzip)
+
+    def first(db):
+        writer.prepare(db)
+        return fetch_page(db, join, where, params, "")
+
+    records = await run_read(first)
+
+    async def body():
+        nonlocal records
+        if data := writer.header():
+            yield data
+        while records:
+            if data := writer.page(records):
+                yield data
+            if len(records) < EXPORT_CHUNK:
+                break
+            records = await _next_page(join, where, params, records[-1][0]["SURVEY_NO"])
+        if data := writer.footer():
+            yield data
+
+    return body()
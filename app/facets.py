@@ -0,0 +1,164 @@
+"""패싯(분류/지역/조사연도/지질시대/동굴 여부) 건수용 메모리 비트맵 색인
+
+패싯 값마다 해당 유산 ID(HERITAGE_READ.ID = 유산 rowid)의 비트를 켠 정수(비트맵)를
+보관한다. 여러 패싯을 고르면 비트맵 AND로 좁히고 bit_count()로 건수를 세므로
+필터 조합마다 유산 테이블을 다시 훑지 않는다. 유산을 저장/삭제하면 그 행만 갱신한다.
+"""
+
+import threading
+from typing import NamedTuple
+
+from app.cache import on_external_change
+
+# 패싯 이름 → HERITAGE_READ 컬럼 (sql/heritage_read.sql)
+FACETS = {
+    "top": "TY1_TOP_CD",
+    "mid": "TY1_MID_CD",
+    "area": "AREA_NM",
+    "year": "SURVEY_YEAR",
+    "age": "GEOLGC_AGE",
+    "cave": "HAS_CAVE",
+}
+
+
+class FacetCount(NamedTuple):
+    value: object
+    count: int
+
+
+def facet_conditions(selected):
+    """고른 패싯 {이름: 값} → 목록 쿼리 WHERE 조각. HERITAGE_READ 별칭은 h로 가정한다."""
+    conditions = []
+    params = []
+    for name, value in selected.items():
+        conditions.append(f"h.{FACETS[name]} = ?")
+        params.append(value)
+    return conditions, params
+
+
+def ids_bitmap(ids):
+    """유산 ID 목록 → 비트맵"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._rows = {}  # SURVEY_NO → (ID, 패싯 값 튜플)
+        self._postings = {name: {} for name in FACETS}  # 패싯 → 값 → 비트맵
+        self._all = 0
+
+    def _apply(self, survey_no, row_id, values, sign):
+        bit = 1 << row_id
+        if sign > 0:
+            self._rows[survey_no] = (row_id, values)
+            self._all |= bit
+        else:
+            del self._rows[survey_no]
+            self._all &= ~bit
+        for name, value in zip(FACETS, values):
+            if value is None:
+                continue
+            postings = self._postings[name]
+            if sign > 0:
+                postings[value] = postings.get(value, 0) | bit
+            else:
+                remaining = postings.get(value, 0) & ~bit
+                if remaining:
+                    postings[value] = remaining
+                else:
+                    postings.pop(value, None)
+
+    def _select(self, db, where, params):
+        return db.execute(
+            f"SELECT SURVEY_NO, ID, {', '.join(FACETS.values())} FROM HERITAGE_READ {where}",
+            params,
+        ).fetchall()
+
+    def _load(self, db):
+        # 행마다 |= 하면 매번 최대 ID 폭의 정수를 새로 만들어 행 수의 제곱에 비례하므로,
+        # 값별 ID 목록을 모은 뒤 ids_bitmap으로 한 번에 만든다 (|, &~는 한 건 갱신에만 쓴다)
+        rows = {}
+        ids = {name: {} for name in FACETS}
+        for r in self._select(db, "", []):
+            values = tuple(r[2:])
+            rows[r[0]] = (r[1], values)
+            for name, value in zip(FACETS, values):
+                if value is not None:
+                    ids[name].setdefault(value, []).append(r[1])
+        self._rows = rows
+        self._postings = {
+            name: {value: ids_bitmap(v) for value, v in by_value.items()}
+            for name, by_value in ids.items()
+        }
+        self._all = ids_bitmap(row_id for row_id, _ in rows.values())
+        self._loaded = True
+
+    def ensure_loaded(self, db):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load(db)
+
+    def update(self, db, survey_no):
+        """저장된 유산 하나의 패싯 값을 HERITAGE_READ에서 다시 읽어 반영한다."""
+        rows = self._select(db, "WHERE SURVEY_NO = ?", [survey_no])
+        with self._lock:
+            if not self._loaded:
+                return
+            if survey_no in self._rows:
+                self._apply(survey_no, *self._rows[survey_no], -1)
+            for r in rows:
+                self._apply(r[0], r[1], tuple(r[2:]), 1)
+
+    def remove(self, survey_no):
+        with self._lock:
+            if self._loaded and survey_no in self._rows:
+                self._apply(survey_no, *self._rows[survey_no], -1)
+
+    def invalidate(self):
+        """다른 프로세스(일괄 입력 등)가 유산을 바꾼 뒤 호출 (app.cache.on_external_change).
+
+        다음 ensure_loaded()가 전체를 다시 읽으며, 그 전까지는 이전 비트맵을 그대로 쓴다.
+        """
+        with self._lock:
+            self._loaded = False
+
+    def counts(self, selected, base=None):
+        """(전체 건수, {패싯: [FacetCount, ...]}).
+
+        selected는 고른 패싯 {이름: 값}, base는 검색어 결과 비트맵(없으면 전체).
+        각 패싯의 값별 건수는 그 패싯 자신의 선택을 뺀 나머지 조건으로 센다
+        (대분류를 고른 상태에서도 다른 대분류로 바꿨을 때의 건수를 보여 준다).
+        """
+        with self._lock:
+            universe = self._all if base is None else self._all & base
+            masks = {}
+            for name, value in selected.items():
+                masks[name] = self._postings[name].get(value, 0)
+            matched = universe
+            for mask in masks.values():
+                matched &= mask
+            facets = {}
+            for name, postings in self._postings.items():
+                scope = universe
+                for other, mask in masks.items():
+                    if other != name:
+                        scope &= mask
+                facets[name] = [
+                    FacetCount(value, n)
+                    for value, bits in postings.items()
+                    if (n := (bits & scope).bit_count())
+                ]
+            return matched.bit_count(), facets
+
+
+facet_index = FacetIndex()
+on_external_change(facet_index.invalidate)
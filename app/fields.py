@@ -0,0 +1,110 @@
+"""API 응답 필드 선택 (fields= 화이트리스트 → 최소 SELECT)과 여러 유산 일괄 조회"""
+
+from typing import NamedTuple
+
+# 선택 가능한 유산 컬럼 (SURVEY_NO는 항상 포함)
+HERITAGE_FIELDS = (
+    "SURVEY_NO", "SURVEY_YEAR", "GCH_NM", "SURVEY_NM", "PSITN", "CTTPC", "AREA_NM",
+    "GEOLGC_MAP_NM", "STRK_SDP",
+    "TY1_CD", "TY1_DES", "TY2_CD", "TY2_DES", "TY3_CD", "TY3_DES",
+    "GEOLGC_AGE", "RRSTV_RCK", "ADDRESS", "LAT", "LON",
+    "CCLT_SCL", "RKFR_DES", "CREATE_DT", "CREATOR_ID",
+)
+# 하위 테이블 (이름을 fields에 넣었을 때만 조회)
+CHILD_FIELDS = ("cave", "references")
+# 목록 API 기본 필드 (snippet은 검색어가 있을 때만 값이 있다)
+LIST_FIELDS = ("SURVEY_NO", "GCH_NM", "TY1_DES", "ADDRESS", "GEOLGC_AGE", "LAT", "LON", "snippet")
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class Projection(NamedTuple):
+    columns: tuple
+    cave: bool
+    references: bool
+    extras: frozenset  # 엔드포인트별 추가 필드 (예: 목록의 snippet)
+
+
+def parse_fields(fields, default=HERITAGE_FIELDS + CHILD_FIELDS, extras=()):
+    """'GCH_NM,LAT,cave' 또는 이름 목록 → Projection. 비어 있으면 default.
+
+    extras는 해당 엔드포인트에서만 허용하는 추가 필드 이름이다.
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = [f.strip() for f in (fields or ()) if f.strip()] or list(default)
+    special = set(CHILD_FIELDS) | set(extras)
+    unknown = [n for n in names if n not in special and n.upper() not in HERITAGE_FIELDS]
+    if unknown:
+        raise InvalidFields(f"unknown fields: {', '.join(unknown)}")
+    wanted = {n.upper() for n in names if n not in special}
+    # 순서는 화이트리스트 순서를 따른다
+    columns = tuple(c for c in HERITAGE_FIELDS if c == "SURVEY_NO" or c in wanted)
+    return Projection(
+        columns,
+        "cave" in names,
+        "references" in names,
+        frozenset(n for n in names if n in extras),
+    )
+
+
+def tuple_cursor(db, sql, params):
+    """sqlite3.Row 대신 튜플로 읽는 커서 (dict 변환 비용을 줄인다)"""
+    cur = db.cursor()
+    cur.row_factory = None
+    return cur.execute(sql, params)
+
+
+def fetch_records(db, survey_nos, projection):
+    """SURVEY_NO 목록 → {SURVEY_NO: {"heritage", "cave", "references"}}.
+
+    유산/동굴/참고문헌을 각각 IN (...) 쿼리 한 번으로 읽는다. 없는 SURVEY_NO는 빠진다.
+    """
+    if not survey_nos:
+        return {}
+    marks = ",".join("?" * len(survey_nos))
+    cols = projection.columns
+    out = {}
+    for row in tuple_cursor(
+        db,
+        f"SELECT {', '.join(cols)} FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO IN ({marks})",
+        survey_nos,
+    ):
+        out[row[0]] = {"heritage": dict(zip(cols, row))}
+
+    caves, refs = fetch_children(db, list(out), projection)
+    for survey_no, record in out.items():
+        if projection.cave:
+            record["cave"] = caves.get(survey_no)
+        if projection.references:
+            record["references"] = refs.get(survey_no, [])
+    return out
+
+
+def fetch_children(db, survey_nos, projection):
+    """요청된 하위 테이블만 IN (...) 한 번씩 읽는다 → (동굴 dict, 참고문헌 목록 dict)"""
+    caves, refs = {}, {}
+    if not survey_nos:
+        return caves, refs
+    marks = ",".join("?" * len(survey_nos))
+    if projection.cave:
+        cur = tuple_cursor(
+            db, f"SELECT * FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO IN ({marks})", survey_nos
+        )
+        names = [d[0] for d in cur.description]
+        for row in cur:
+            caves[row[0]] = dict(zip(names, row))
+    if projection.references:
+        cur = tuple_cursor(
+            db,
+            f"""SELECT * FROM REFERENCE_MATERIAL WHERE SURVEY_NO IN ({marks})
+                ORDER BY SURVEY_NO, GROUP_GBN, ORDR""",
+            survey_nos,
+        )
+        names = [d[0] for d in cur.description]
+        sn = names.index("SURVEY_NO")
+        for row in cur:
+            refs.setdefault(row[sn], []).append(dict(zip(names, row)))
+    return caves, refs
@@ -0,0 +1,155 @@
+"""지도용 공간 조회 (HERITAGE_RTREE 색인 + 간결한 GeoJSON)"""
+
+import math
+
+GEO_LIMIT = 2000  # 한 번에 내려보내는 최대 지점 수
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+NEAR_MAX_K = 100
+NEAR_MAX_RADIUS_KM = 1000.0  # 반경 없이 k개만 찾을 때도 이 거리까지만 넓힌다
+NEAR_START_KM = 5.0  # 반경 없는 k-최근접 검색의 첫 탐색 반경
+
+
+def parse_bbox(bbox):
+    """'minLon,minLat,maxLon,maxLat' → (min_lon, min_lat, max_lon, max_lat)"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError(f"invalid bbox: {bbox}") from None
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError(f"invalid bbox: {bbox}")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def coord_precision(zoom):
+    """줌 레벨에 맞는 좌표 소수 자릿수 (낮은 줌에서는 정밀도가 필요 없다)"""
+    if zoom < 8:
+        return 3
+    if zoom < 12:
+        return 4
+    return 5
+
+
+def sites_in_bbox(db, bbox, limit=GEO_LIMIT):
+    """bbox 안의 좌표 보유 유산. R*Tree로 후보를 좁힌 뒤 실제 좌표로 다시 거른다."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return db.execute(
+        """SELECT h.SURVEY_NO, h.GCH_NM, h.LAT, h.LON, h.ADDRESS,
+                  h.TY1_TOP_CD AS TOP_CD, h.TY1_TOP_NM AS ty1_top_nm
+           FROM HERITAGE_RTREE r
+           JOIN HERITAGE_READ h ON h.ID = r.id
+           WHERE r.MAX_LAT >= ? AND r.MIN_LAT <= ?
+             AND r.MAX_LON >= ? AND r.MIN_LON <= ?
+             AND h.LAT BETWEEN ? AND ? AND h.LON BETWEEN ? AND ?
+           LIMIT ?""",
+        [
+            min_lat, max_lat, min_lon, max_lon,
+            min_lat, max_lat, min_lon, max_lon,
+            limit,
+        ],
+    ).fetchall()
+
+
+def sites_by_ids(db, survey_nos):
+    if not survey_nos:
+        return []
+    marks = ",".join("?" * len(survey_nos))
+    return db.execute(
+        f"""SELECT SURVEY_NO, GCH_NM, LAT, LON, ADDRESS,
+                   TY1_TOP_CD AS TOP_CD, TY1_TOP_NM AS ty1_top_nm
+            FROM HERITAGE_READ
+            WHERE SURVEY_NO IN ({marks})""",
+        list(survey_nos),
+    ).fetchall()
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 위경도 사이의 대권 거리 (km)"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat, lon, radius_km):
+    """중심에서 radius_km 안의 점을 모두 포함하는 bbox (min_lon, min_lat, max_lon, max_lat)"""
+    dlat = radius_km / KM_PER_DEG_LAT
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    # 극에 가까우면 경도 폭이 의미 없으므로 전체 경도를 본다
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    dlon = radius_km / (KM_PER_DEG_LAT * cos_lat) if cos_lat > 1e-9 else 360.0
+    if dlon >= 180.0:
+        return -180.0, min_lat, 180.0, max_lat
+    return lon - dlon, min_lat, lon + dlon, max_lat
+
+
+def _within(db, lat, lon, radius_km, top):
+    """반경 안의 유산과 거리. R*Tree로 bbox 후보를 고른 뒤 haversine으로 거른다.
+
+    대분류 조건이 있어도 R*Tree부터 읽도록 CROSS JOIN으로 조인 순서를 고정한다.
+    """
+    min_lon, min_lat, max_lon, max_lat = radius_bbox(lat, lon, radius_km)
+    sql = """SELECT h.SURVEY_NO, h.GCH_NM, h.LAT, h.LON, h.ADDRESS,
+                    h.TY1_TOP_CD AS TOP_CD, h.TY1_TOP_NM AS ty1_top_nm
+             FROM HERITAGE_RTREE r
+             CROSS JOIN HERITAGE_READ h ON h.ID = r.id
+             WHERE r.MAX_LAT >= ? AND r.MIN_LAT <= ?
+               AND r.MAX_LON >= ? AND r.MIN_LON <= ?"""
+    params = [min_lat, max_lat, min_lon, max_lon]
+    if top:
+        sql += " AND h.TY1_TOP_CD = ?"
+        params.append(top)
+    found = []
+    for row in db.execute(sql, params):
+        dist = haversine_km(lat, lon, row["LAT"], row["LON"])
+        if dist <= radius_km:
+            found.append((dist, row["SURVEY_NO"], row))
+    found.sort(key=lambda f: f[:2])
+    return found
+
+
+def sites_near(db, lat, lon, k, radius_km=None, top=None):
+    """(lat, lon)에서 가까운 순으로 최대 k개의 (거리 km, 행).
+
+    radius_km를 주면 그 안에서만 찾고, 없으면 NEAR_START_KM에서 시작해 k개가 모이거나
+    NEAR_MAX_RADIUS_KM에 이를 때까지 반경을 두 배씩 넓힌다. 반경 r 안에 k개 이상이
+    있으면 가장 가까운 k개는 모두 그 안에 있으므로 결과는 정확하다.
+    """
+    if radius_km is not None:
+        found = _within(db, lat, lon, radius_km, top)
+    else:
+        radius = NEAR_START_KM
+        while True:
+            found = _within(db, lat, lon, radius, top)
+            if len(found) >= k or radius >= NEAR_MAX_RADIUS_KM:
+                break
+            radius = min(radius * 2, NEAR_MAX_RADIUS_KM)
+    return [(dist, row) for dist, _, row in found[:k]]
+
+
+def cluster_feature(lat, lon, count, tops, precision):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [round(lon, precision), round(lat, precision)],
+        },
+        "properties": {"cluster": True, "count": count, "tops": tops},
+    }
+
+
+def site_feature(row, precision):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [round(row["LON"], precision), round(row["LAT"], precision)],
+        },
+        "properties": {
+            "id": row["SURVEY_NO"],
+            "nm": row["GCH_NM"],
+            "top": row["ty1_top_nm"],
+            "addr": row["ADDRESS"],
+        },
+    }
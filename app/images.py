@@ -0,0 +1,191 @@
+"""조사 사진 파생 이미지(썸네일/표시용) 디스크 캐시
+
+원본(heritage_list/extracted_images의 JPG/JP2)은 처음 요청될 때 한 번만
+축소·변환한다. 결과는 내용 해시로 이름 붙인 객체 파일로 저장하고
+(objects/ab/abcd….webp), 원본 식별자(경로·크기·mtime)+변형+포맷 → 내용 해시
+참조는 refs/에 둔다. 객체 파일 총량이 CACHE_MAX_BYTES를 넘으면 가장 오래
+쓰이지 않은 것부터 지운다 (사용 시각은 파일 mtime으로 기록).
+"""
+
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+IMAGE_ROOT = Path(__file__).resolve().parent.parent / "heritage_list"
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".image_cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# 변형 이름 → 긴 변 최대 픽셀
+VARIANTS = {
+    "thumb": 320,
+    "display": 1280,
+}
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def source_path(save_pt, sfile_nm):
+    """CHT_IMAG_DM의 SAVE_PT/SFILE_NM → 원본 파일 경로 (IMAGE_ROOT 밖은 거부)"""
+    if not sfile_nm:
+        return None
+    path = (IMAGE_ROOT / (save_pt or "") / sfile_nm).resolve()
+    if IMAGE_ROOT not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+def pick_format(accept):
+    return "webp" if "image/webp" in (accept or "") else "jpeg"
+
+
+def _render(src, max_px, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        im.thumbnail((max_px, max_px), Image.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, pil_format, **options)
+    return buf.getvalue()
+
+
+class DerivativeCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # 객체 파일 총 바이트 (처음 필요할 때 계산)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _ref_path(self, src, variant, fmt):
+        st = src.stat()
+        ident = f"{src}|{st.st_size}|{st.st_mtime_ns}|{variant}|{fmt}"
+        return self.root / "refs" / hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+    def _object_path(self, digest, fmt):
+        return self.root / "objects" / digest[:2] / f"{digest}.{fmt}"
+
+    def _scan_total(self):
+        objects = self.root / "objects"
+        if not objects.exists():
+            return 0
+        return sum(p.stat().st_size for p in objects.glob("*/*") if p.is_file())
+
+    def get(self, src, variant, fmt):
+        """파생 이미지 (경로, 내용 해시). 없으면 만들어 저장한다."""
+        ref = self._ref_path(src, variant, fmt)
+        if ref.exists():
+            digest = ref.read_text().strip()
+            obj = self._object_path(digest, fmt)
+            if obj.exists():
+                os.utime(obj)  # LRU용 사용 시각 갱신
+                with self._lock:
+                    self.hits += 1
+                return obj, digest
+
+        data = _render(src, VARIANTS[variant], fmt)
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self._object_path(digest, fmt)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        ref.parent.mkdir(parents=True, exist_ok=True)
+        if not obj.exists():
+            tmp = obj.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, obj)
+            added = len(data)
+        else:
+            added = 0
+        tmp = ref.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(digest)
+        os.replace(tmp, ref)
+
+        with self._lock:
+            self.misses += 1
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += added
+            if self._total > self.max_bytes:
+                self._evict(keep=obj)
+        return obj, digest
+
+    def _evict(self, keep):
+        """가장 오래 쓰이지 않은 객체부터 지워 max_bytes의 90%까지 줄인다."""
+        target = int(self.max_bytes * 0.9)
+        files = sorted(
+            (p for p in (self.root / "objects").glob("*/*") if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for p in files:
+            if self._total <= target:
+                break
+            if p == keep:
+                continue
+            size = p.stat().st_size
+            p.unlink(missing_ok=True)
+            self._total -= size
+            self.evictions += 1
+        # refs는 객체가 없으면 다음 요청 때 다시 만들어지므로 그대로 둔다
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+
+derivatives = DerivativeCache()
+
+
+_etags = {}  # 경로 → (크기, mtime_ns, 해시). 파일이 바뀌면 같은 칸을 덮어쓴다
+
+
+def file_etag(path):
+    """원본 파일용 strong ETag (내용 SHA-256, 크기·mtime이 같으면 재사용)"""
+    st = path.stat()
+    key = str(path)
+    cached = _etags.get(key)
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _etags[key] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def parse_range(header, size):
+    """단일 'bytes=start-end' Range → (start, end) 포함 구간. 형식 오류면 None, 범위 밖이면 ValueError."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[6:].strip().partition("-")
+    try:
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                return None
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
@@ -1,9 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.routers import heritage
+from app.database import close_pools, open_pools
+from app.executor import Overloaded, shutdown_executors
+from app.metrics import MetricsMiddleware
+from app.routers import heritage, images, metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_pools()
+    yield
+    shutdown_executors()
+    close_pools()
+
+
+app = FastAPI(title="지질유산 DB", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
 
-app = FastAPI(title="지질유산 DB")
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(
+        {"error": "server busy"}, status_code=503, headers={"Retry-After": "1"}
+    )
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 app.include_router(heritage.router)
+app.include_router(images.router)
+app.include_router(metrics.router)
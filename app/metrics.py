@@ -0,0 +1,440 @@
+"""요청/쿼리 계측 (라우트별 지연 히스토그램, SQLite 문장별 시간, 느린 쿼리 기록)
+
+- MetricsMiddleware: 라우트 템플릿(/heritage/{survey_no} 등)별 응답 시간을 기록하고,
+  SERVER_TIMING이 켜져 있으면(환경 변수 GHC_SERVER_TIMING=1) Server-Timing 헤더
+  (db/queue/render/app)를 붙인다. 내부 구간 시간이 드러나므로 기본은 꺼져 있다.
+- QueryTracer: 연결에 set_trace_callback을 걸어 문장 원문을 받고, TracedConnection/
+  TracedCursor의 execute·fetch 호출 안에서 보낸 시간만 그 문장에 더한다. 행을 받은
+  뒤의 파이썬 처리나 템플릿 렌더링 시간은 문장 시간에 들어가지 않는다.
+  SLOW_QUERY_MS를 넘은 문장은 연결 반납 시 EXPLAIN QUERY PLAN과 함께 로그로 남긴다
+  (리터럴은 ?로 바꿔서).
+- render_prometheus(): 위 값과 각 캐시/풀 통계를 Prometheus 텍스트 형식으로 만든다.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+TRACE_QUERIES = True
+SERVER_TIMING = os.environ.get("GHC_SERVER_TIMING", "").lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = 100.0
+SLOW_QUERY_LOG_SIZE = 50  # 최근 느린 쿼리 보관 수
+QUERY_STATS_SIZE = 500  # 정규화된 문장 종류 상한 (넘으면 오래된 것부터 버림)
+SQL_LABEL_MAX = 200
+
+# 초 단위 히스토그램 경계
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{name}_bucket{_labels(labels, le=le)} {cumulative}"
+        yield f"{name}_sum{_labels(labels)} {self.sum:.6f}"
+        yield f"{name}_count{_labels(labels)} {self.count}"
+
+
+class HistogramFamily:
+    """레이블 조합별 Histogram 모음"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            hist = self._series.get(label_values)
+            if hist is None:
+                hist = self._series[label_values] = Histogram()
+            hist.observe(value)
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            for values, hist in sorted(self._series.items()):
+                yield from hist.lines(self.name, dict(zip(self.label_names, values)))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, **extra):
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items.items()) + "}"
+
+
+request_seconds = HistogramFamily(
+    "ghc_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+render_seconds = HistogramFamily(
+    "ghc_template_render_seconds", "Jinja2 template render time", ("template",)
+)
+connect_seconds = HistogramFamily(
+    "ghc_sqlite_connect_seconds", "SQLite connection setup time (connect + PRAGMAs)", ("pool",)
+)
+_responses = {}  # (method, route, status) → 건수
+_responses_lock = threading.Lock()
+
+
+# ─── 요청별 시간 (Server-Timing) ───
+
+
+class RequestTiming:
+    """요청 하나 동안 쌓이는 구간별 시간. 실행기 스레드에서도 같은 객체에 더한다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}  # 이름 → [초, 횟수]
+
+    def add(self, name, seconds):
+        with self._lock:
+            span = self.spans.setdefault(name, [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def header(self, total):
+        with self._lock:
+            parts = [
+                f'{name};dur={sec * 1000:.2f};desc="{n}x"'
+                for name, (sec, n) in self.spans.items()
+            ]
+        parts.append(f"app;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+current_timing = ContextVar("current_timing", default=None)
+
+
+def add_timing(name, seconds):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def instrument_templates(templates):
+    """Jinja2Templates의 템플릿 렌더링 시간을 기록한다 (템플릿 이름별 히스토그램)."""
+    env = templates.env
+    base = env.template_class
+
+    class TimedTemplate(base):
+        def render(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().render(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                render_seconds.observe(elapsed, self.name or "<string>")
+                add_timing("render", elapsed)
+
+    env.template_class = TimedTemplate
+    if env.cache is not None:
+        env.cache.clear()
+
+
+# ─── SQLite 문장 추적 ───
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """바인딩 값이 펼쳐진 문장에서 리터럴을 ?로 바꿔 같은 종류끼리 묶는다."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?, ...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """execute/fetch 호출에 걸린 시간을 연결의 현재 문장에 더한다."""
+
+    def _timed(self, call, *args):
+        start = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            query_tracer.spend(self.connection, time.perf_counter() - start)
+
+    def execute(self, *args):
+        return self._timed(super().execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(super().executemany, *args)
+
+    def executescript(self, *args):
+        return self._timed(super().executescript, *args)
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+    def __next__(self):
+        return self._timed(super().__next__)
+
+
+class TracedConnection(sqlite3.Connection):
+    """모든 문장이 TracedCursor를 거치게 하는 연결 (sqlite3.connect(factory=...))"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute 등은 cursor()를 부르지 않으므로 직접 돌린다
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            query_tracer.spend(self, time.perf_counter() - start)
+
+    def rollback(self):
+        start = time.perf_counter()
+        try:
+            super().rollback()
+        finally:
+            query_tracer.spend(self, time.perf_counter() - start)
+
+
+class QueryTracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}  # id(conn) → [sql, SQLite 호출 안에서 보낸 초]
+        self._slow_pending = {}  # id(conn) → [(sql, 초), ...] (반납 시 EXPLAIN)
+        self._explaining = set()
+        self._stats = OrderedDict()  # 정규화 문장 → [횟수, 합계, 최대]
+        self.slow = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self.slow_total = 0
+
+    def attach(self, conn):
+        if not TRACE_QUERIES:
+            return
+        key = id(conn)
+
+        def trace(sql):
+            if key in self._explaining:
+                return
+            # 트리거 안의 문장("-- TRIGGER ...")은 바깥 문장 시간에 포함시킨다
+            if sql.startswith("--"):
+                return
+            self._close(key)
+            self._active[key] = [sql, 0.0]
+
+        conn.set_trace_callback(trace)
+
+    def spend(self, conn, seconds):
+        """TracedCursor/TracedConnection이 SQLite 호출 시간을 현재 문장에 더한다."""
+        active = self._active.get(id(conn))
+        if active is not None:
+            active[1] += seconds
+
+    def _close(self, key):
+        active = self._active.pop(key, None)
+        if active is None:
+            return
+        sql, elapsed = active
+        add_timing("db", elapsed)
+        norm = normalize_sql(sql)
+        with self._lock:
+            entry = self._stats.get(norm)
+            if entry is None:
+                entry = self._stats[norm] = [0, 0.0, 0.0]
+                while len(self._stats) > QUERY_STATS_SIZE:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(norm)
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            self._slow_pending.setdefault(key, []).append((sql, norm, elapsed))
+
+    def finish(self, conn):
+        """연결 반납 시 호출. 마지막 문장을 마감하고 느린 문장의 실행 계획을 남긴다."""
+        key = id(conn)
+        self._close(key)
+        for sql, norm, elapsed in self._slow_pending.pop(key, ()):
+            # 실행 계획은 값이 펼쳐진 원문으로 구하되, 기록·로그에는 값을 지운 문장만 남긴다
+            # (/metrics/slow는 인증 없이 열려 있고 원문에는 검색어·저장 내용이 들어 있다)
+            self._explaining.add(key)
+            try:
+                plan = [
+                    row[3]
+                    for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                ]
+            except sqlite3.Error as e:
+                plan = [f"(EXPLAIN failed: {e})"]
+            finally:
+                self._explaining.discard(key)
+            entry = {
+                "sql": norm,
+                "ms": round(elapsed * 1000, 3),
+                "plan": plan,
+                "at": time.time(),
+            }
+            with self._lock:
+                self.slow.append(entry)
+                self.slow_total += 1
+            logger.warning(
+                "slow query %.1f ms: %s\n  plan: %s", entry["ms"], entry["sql"], " | ".join(plan)
+            )
+
+    def stats(self):
+        with self._lock:
+            return {sql: tuple(v) for sql, v in self._stats.items()}
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self.slow)
+
+
+query_tracer = QueryTracer()
+
+
+# ─── 미들웨어 ───
+
+
+class MetricsMiddleware:
+    """순수 ASGI 미들웨어 (스트리밍 응답도 그대로 통과시킨다)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    header = timing.header(time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", ())) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            elapsed = time.perf_counter() - start
+            route = _route_label(scope)
+            request_seconds.observe(elapsed, scope["method"], route)
+            key = (scope["method"], route, status)
+            with _responses_lock:
+                _responses[key] = _responses.get(key, 0) + 1
+
+
+def _route_label(scope):
+    """경로 대신 라우트 템플릿을 레이블로 쓴다 (값 종류가 늘어나지 않도록)."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mount(/static 등)는 route 대신 root_path에 마운트 경로가 들어 있다
+    return scope.get("root_path") or "unmatched"
+
+
+# ─── Prometheus 출력 ───
+
+
+def _stat_lines(name, stats, labels):
+    """{키: 숫자} dict → 게이지 줄들 (숫자가 아닌 값은 건너뜀)"""
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        yield f"{name}_{key}{_labels(labels)} {value}"
+
+
+def render_prometheus(stats):
+    """stats: {이름: {키: 숫자} 또는 {레이블 값: {키: 숫자}}} → Prometheus 텍스트"""
+    lines = list(request_seconds.lines())
+    lines += ["# HELP ghc_http_responses_total HTTP responses by route and status",
+              "# TYPE ghc_http_responses_total counter"]
+    with _responses_lock:
+        for (method, route, status), n in sorted(_responses.items()):
+            lines.append(
+                f"ghc_http_responses_total{_labels(dict(method=method, route=route, status=status))} {n}"
+            )
+    lines += list(render_seconds.lines())
+    lines += list(connect_seconds.lines())
+
+    query_stats = query_tracer.stats()
+    lines += ["# HELP ghc_sqlite_statements_total Executed statements by normalized SQL",
+              "# TYPE ghc_sqlite_statements_total counter"]
+    lines += [
+        f"ghc_sqlite_statements_total{_labels(dict(sql=sql[:SQL_LABEL_MAX]))} {n}"
+        for sql, (n, _, _) in query_stats.items()
+    ]
+    lines += ["# HELP ghc_sqlite_statement_seconds_total Time spent per normalized SQL",
+              "# TYPE ghc_sqlite_statement_seconds_total counter"]
+    lines += [
+        f"ghc_sqlite_statement_seconds_total{_labels(dict(sql=sql[:SQL_LABEL_MAX]))} {total:.6f}"
+        for sql, (_, total, _) in query_stats.items()
+    ]
+    lines += ["# HELP ghc_sqlite_statement_seconds_max Slowest execution per normalized SQL",
+              "# TYPE ghc_sqlite_statement_seconds_max gauge"]
+    lines += [
+        f"ghc_sqlite_statement_seconds_max{_labels(dict(sql=sql[:SQL_LABEL_MAX]))} {worst:.6f}"
+        for sql, (_, _, worst) in query_stats.items()
+    ]
+    lines += ["# TYPE ghc_sqlite_slow_statements_total counter",
+              f"ghc_sqlite_slow_statements_total {query_tracer.slow_total}"]
+
+    for name, values in stats.items():
+        metric = f"ghc_{name}"
+        if values and all(isinstance(v, dict) for v in values.values()):
+            for label, sub in values.items():
+                lines += _stat_lines(metric, sub, {"kind": label})
+        else:
+            lines += _stat_lines(metric, values, {})
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,25 @@
+"""키셋(커서) 페이지네이션용 불투명 커서 인코딩"""
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    """정렬 키 (예: [SURVEY_NO] 또는 [bm25, SURVEY_NO]) → URL-safe 문자열"""
+    raw = json.dumps(key, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor) from None
+    if not isinstance(key, list) or len(key) != length:
+        raise InvalidCursor(cursor)
+    return key
@@ -0,0 +1,215 @@
+"""렌더링된 페이지/API 응답 캐시 (메모리 LRU + 선택적 디스크 계층)
+
+항목은 태그와 함께 저장된다. 상세 응답은 SURVEY_NO를 태그로 가지며 그 유산을
+저장/삭제할 때만 지워지고, 목록 응답(태그 None)은 어떤 쓰기에도 함께 지워진다.
+다른 프로세스(일괄 입력 등)의 변경은 DATA_VERSION으로 알아내 캐시 전체를 비우며
+(app.cache), 항목은 TTL이 지나도 버린다.
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi.responses import Response
+
+from app.cache import (
+    check_data_version,
+    data_version_due,
+    generation,
+    on_external_change,
+)
+from app.executor import run_read
+
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_TTL = 600.0  # 초
+# 디스크 계층 경로 (None이면 메모리만 사용)
+RESPONSE_DISK_DIR = None
+
+LIST_TAG = "_list"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+    last_modified: float
+    created: float
+
+    def headers(self):
+        return {
+            "ETag": f'"{self.etag}"',
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+    def not_modified(self, request):
+        """조건부 GET(If-None-Match / If-Modified-Since)이 이 항목과 일치하는지"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return f'"{self.etag}"' in if_none_match or if_none_match.strip() == "*"
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= since
+        return False
+
+    def respond(self, request):
+        if self.not_modified(request):
+            return Response(status_code=304, headers=self.headers())
+        return Response(self.body, media_type=self.media_type, headers=self.headers())
+
+
+class ResponseCache:
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_TTL, disk_dir=RESPONSE_DISK_DIR):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries = OrderedDict()  # key → (tag, CachedResponse)
+        self._tags = {}  # tag → {key, ...}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _tag(tag):
+        return tag if tag is not None else LIST_TAG
+
+    def _disk_path(self, key, tag):
+        name = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        tag_dir = hashlib.sha256(tag.encode("utf-8")).hexdigest()[:16]
+        return self.disk_dir / tag_dir / name
+
+    def _store(self, key, tag, entry):
+        self._entries[key] = (tag, entry)
+        self._entries.move_to_end(key)
+        self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            old_key, (old_tag, _) = self._entries.popitem(last=False)
+            self._tags.get(old_tag, set()).discard(old_key)
+
+    def _read_disk(self, key, tag):
+        path = self._disk_path(key, tag)
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        header, _, body = raw.partition(b"\n")
+        try:
+            meta = json.loads(header)
+            if len(body) != meta["size"]:
+                raise ValueError("truncated body")
+            return CachedResponse(body, meta["media_type"], meta["etag"],
+                                  meta["last_modified"], meta["created"])
+        except (ValueError, KeyError, TypeError):
+            # 쓰다 만 파일이나 옛 형식: 지우고 없는 것으로 본다 (다시 렌더링해 저장됨)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write_disk(self, key, tag, entry):
+        path = self._disk_path(key, tag)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "media_type": entry.media_type,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "created": entry.created,
+            "size": len(entry.body),
+        }
+        # 임시 파일에 다 쓴 뒤 바꿔 넣으므로 읽는 쪽이 쓰는 중인 파일을 보지 않는다
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(json.dumps(meta).encode("utf-8") + b"\n" + entry.body)
+        tmp.replace(path)
+
+    def get(self, key, tag):
+        tag = self._tag(tag)
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and now - item[1].created < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if self.disk_dir is not None:
+                entry = self._read_disk(key, tag)
+                if entry is not None and now - entry.created < self.ttl:
+                    self._store(key, tag, entry)
+                    self.disk_hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def put(self, key, tag, body, media_type):
+        """본문을 저장하고 항목을 돌려준다. 같은 본문이면 ETag/Last-Modified를 유지한다."""
+        tag = self._tag(tag)
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            last_modified = item[1].last_modified if item and item[1].etag == etag else now
+            entry = CachedResponse(body, media_type, etag, last_modified, now)
+            self._store(key, tag, entry)
+            if self.disk_dir is not None:
+                self._write_disk(key, tag, entry)
+        return entry
+
+    def invalidate(self, survey_no):
+        """유산 하나를 저장/삭제한 뒤 호출. 그 유산의 항목과 모든 목록 항목을 지운다."""
+        with self._lock:
+            for tag in (survey_no, LIST_TAG):
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key, None)
+                    self.invalidations += 1
+                if self.disk_dir is not None:
+                    shutil.rmtree(self._disk_path((), tag).parent, ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            if self.disk_dir is not None:
+                shutil.rmtree(self.disk_dir, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
+on_external_change(response_cache.clear)
+
+
+async def cached_response(request, key, tag, render):
+    """캐시된 응답을 조건부 GET에 맞춰 돌려준다. 없으면 await render()로 만들어 저장한다.
+
+    render()가 200이 아닌 응답을 주거나 렌더링 도중 쓰기가 커밋되었으면
+    저장하지 않고 그대로 돌려준다.
+    """
+    # 캐시 적중만 이어지면 DB를 읽지 않으므로, 다른 프로세스의 변경은 주기적으로 확인한다
+    if data_version_due():
+        await run_read(check_data_version)
+    entry = response_cache.get(key, tag)
+    if entry is None:
+        gen = generation()
+        response = await render()
+        if response.status_code != 200 or generation() != gen:
+            return response
+        entry = response_cache.put(key, tag, response.body, response.media_type)
+    return entry.respond(request)
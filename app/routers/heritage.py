@@ -1,70 +1,218 @@
 import math
-import sqlite3
+from functools import partial
+from urllib.parse import urlencode
+
 from fastapi import APIRouter, Depends, Request, Query, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-
-from app.database import get_db
+from pydantic import BaseModel, Field
+
+from app.cache import bump_generation, count_cache, generation
+from app.executor import run_read, run_write
+from app.export import EXPORT_FORMATS, open_export
+from app.facets import facet_conditions, facet_index, ids_bitmap
+from app.fields import (
+    LIST_FIELDS,
+    InvalidFields,
+    fetch_children,
+    fetch_records,
+    parse_fields,
+    tuple_cursor,
+)
+from app.cluster import CLUSTER_MAX_ZOOM, clusters
+from app.codes import code_cache
+from app.geo import (
+    GEO_LIMIT,
+    NEAR_MAX_K,
+    NEAR_MAX_RADIUS_KM,
+    cluster_feature,
+    coord_precision,
+    parse_bbox,
+    site_feature,
+    sites_by_ids,
+    sites_in_bbox,
+    sites_near,
+)
+from app.metrics import add_timing, instrument_templates
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.response_cache import cached_response, response_cache
+from app.search import build_search, highlight
+from app.writes import DuplicateSurveyNo, HeritageNotFound, delete_heritage, save_heritage
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
+templates.env.filters["highlight"] = highlight
+instrument_templates(templates)
 
 PAGE_SIZE = 20
+# 목록/필터/건수 쿼리의 기준 테이블 (sql/heritage_read.sql)
+LIST_FROM = "HERITAGE_READ h"
+# HERITAGE_READ에 있어 유산 테이블을 조인하지 않고 고를 수 있는 컬럼
+READ_COLUMNS = frozenset((
+    "SURVEY_NO", "GCH_NM", "TY1_CD", "TY1_DES", "TY2_CD", "TY3_CD",
+    "ADDRESS", "GEOLGC_AGE", "LAT", "LON",
+))
+BATCH_MAX = 200  # /api/heritage/batch 한 번에 조회할 수 있는 최대 SURVEY_NO 수
+# 패싯 이름 → 목록 URL 파라미터 (대분류는 예전부터 ty)
+FACET_PARAMS = {"top": "ty", "mid": "mid", "area": "area", "year": "year", "age": "age", "cave": "cave"}
+CAVE_LABELS = {1: "동굴 있음", 0: "동굴 없음"}
+NEARBY_K = 5  # 상세 페이지 '주변 유산' 개수
+NEARBY_RADIUS_KM = 20
 
 
 def _get_codes(db):
     """분류코드 전체 목록 (폼 드롭다운용)"""
-    return db.execute(
-        "SELECT CODE, CODE_NM, TOP_CD, TOP_CD_NM, MID_CD, MID_CD_NM FROM COMMON_CODE ORDER BY CODE"
-    ).fetchall()
+    return code_cache.get(db).codes
+
+
+def facet_params(
+    ty: str = "",
+    mid: str = "",
+    area: str = "",
+    year: str = Query("", pattern=r"^\d*$"),
+    age: str = "",
+    cave: str = Query("", pattern="^[01]?$"),
+):
+    """목록 필터 쿼리 파라미터 → 고른 패싯 {이름: 값}. 빈 값(폼의 '전체')은 뺀다."""
+    # 폼 전송 시 값의 줄바꿈은 CRLF로 바뀐다 (지질시대는 여러 줄일 수 있음)
+    age = age.replace("\r\n", "\n")
+    values = {"top": ty, "mid": mid, "area": area, "year": year, "age": age, "cave": cave}
+    selected = {name: value for name, value in values.items() if value}
+    for name in ("year", "cave"):
+        if name in selected:
+            selected[name] = int(selected[name])
+    return selected
+
+
+def _list_filter(q, mode, selected):
+    """목록 검색 조건 → (join, where, params, rank, snippet).
+
+    목록 쿼리는 HERITAGE_READ를 별칭 h로 쓴다 (LIST_FROM).
+    """
+    conditions = []
+    params = []
+    join = ""
+    rank = None
+    snippet = "NULL"
+
+    search = build_search(q, mode)
+    if search:
+        join = search.join
+        conditions.extend(search.conditions)
+        params.extend(search.params)
+        rank = search.rank
+        snippet = search.snippet
+    facet_where, facet_args = facet_conditions(selected)
+    conditions.extend(facet_where)
+    params.extend(facet_args)
+
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    return join, where, params, rank, snippet
+
+
+def _count(db, q, mode, selected, join, where, params):
+    """필터별 전체 건수. 쓰기 세대가 바뀌기 전까지 캐시된 값을 쓴다."""
+    key = count_cache.key(q, mode, selected)
+    total = count_cache.get(key)
+    if total is None:
+        gen = generation()
+        total = db.execute(
+            f"SELECT COUNT(*) FROM {LIST_FROM} {join} {where}", params
+        ).fetchone()[0]
+        count_cache.put(key, total, gen)
+    return total
+
+
+def _facet_counts(db, q, mode, selected):
+    """패싯 값별 건수 (app.facets). 검색어가 있으면 검색 결과 안에서 센다."""
+    facet_index.ensure_loaded(db)
+    base = None
+    search = build_search(q, mode)
+    if search:
+        rows = db.execute(
+            f"""SELECT h.ID FROM {LIST_FROM} {search.join}
+                WHERE {" AND ".join(search.conditions)}""",
+            search.params,
+        )
+        base = ids_bitmap(r[0] for r in rows)
+    return facet_index.counts(selected, base)
+
+
+def _facet_options(db, facets, selected):
+    """패싯 건수 → {패싯: [{value, label, count}, ...]} (드롭다운/API 공용).
+
+    분류는 코드표 순서로 건수 0인 코드도 포함하고, 고른 값은 건수가 없어도 남긴다.
+    """
+    snap = code_cache.get(db)
+    counts = {name: {c.value: c.count for c in items} for name, items in facets.items()}
+    labels = {
+        "top": {t.TOP_CD: t.TOP_CD_NM for t in snap.tops},
+        "mid": {c.MID_CD: c.MID_CD_NM for c in snap.codes if c.MID_CD},
+        "cave": CAVE_LABELS,
+    }
+    options = {}
+    for name, found in counts.items():
+        values = set(found) | set(labels.get(name, ()))
+        if name in selected:
+            values.add(selected[name])
+        if name in labels:
+            ordered = sorted(values, key=lambda v: (v not in labels[name], str(v)))
+        elif name == "year":
+            ordered = sorted(values, reverse=True)
+        else:
+            ordered = sorted(values, key=lambda v: (-found.get(v, 0), str(v)))
+        options[name] = [
+            {"value": v, "label": labels.get(name, {}).get(v) or str(v), "count": found.get(v, 0)}
+            for v in ordered
+        ]
+    return options
 
 
 # ─── HTML pages ───
 
 
 @router.get("/", response_class=HTMLResponse)
-def index(
+async def index(
     request: Request,
     q: str = "",
-    ty: str = "",
+    mode: str = Query("fts", pattern="^(fts|like)$"),
     page: int = Query(1, ge=1),
-    db: sqlite3.Connection = Depends(get_db),
+    selected: dict = Depends(facet_params),
 ):
-    conditions = []
-    params = []
+    return await cached_response(
+        request,
+        ("index", q, mode, page, tuple(sorted(selected.items()))),
+        None,
+        lambda: run_read(partial(_index_page, request, q, mode, page, selected)),
+    )
 
-    if q:
-        conditions.append("(h.GCH_NM LIKE ? OR h.ADDRESS LIKE ?)")
-        params.extend([f"%{q}%", f"%{q}%"])
-    if ty:
-        conditions.append("c1.TOP_CD = ?")
-        params.append(ty)
 
-    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+def _index_page(request, q, mode, page, selected, db):
+    join, where, params, rank, snippet = _list_filter(q, mode, selected)
+    order = f"{rank}, h.SURVEY_NO" if rank else "h.SURVEY_NO"
 
-    count_sql = f"""
-        SELECT COUNT(*) FROM GEOLOGICAL_CULTURAL_HERITAGE h
-        LEFT JOIN COMMON_CODE c1 ON h.TY1_CD = c1.CODE
-        {where}
-    """
-    total = db.execute(count_sql, params).fetchone()[0]
+    total = _count(db, q, mode, selected, join, where, params)
     total_pages = max(1, math.ceil(total / PAGE_SIZE))
     page = min(page, total_pages)
 
     list_sql = f"""
         SELECT h.SURVEY_NO, h.GCH_NM, h.TY1_DES, h.ADDRESS, h.GEOLGC_AGE,
-               c1.TOP_CD_NM AS ty1_top_nm
-        FROM GEOLOGICAL_CULTURAL_HERITAGE h
-        LEFT JOIN COMMON_CODE c1 ON h.TY1_CD = c1.CODE
+               h.TY1_TOP_NM AS ty1_top_nm, {snippet} AS snippet
+        FROM {LIST_FROM}
+        {join}
         {where}
-        ORDER BY h.SURVEY_NO
+        ORDER BY {order}
         LIMIT ? OFFSET ?
     """
     rows = db.execute(list_sql, params + [PAGE_SIZE, (page - 1) * PAGE_SIZE]).fetchall()
 
-    top_codes = db.execute(
-        "SELECT DISTINCT TOP_CD, TOP_CD_NM FROM COMMON_CODE ORDER BY TOP_CD"
-    ).fetchall()
+    _, facets = _facet_counts(db, q, mode, selected)
+    # 페이지 링크에 붙일 현재 검색/필터 조건
+    link_params = {"q": q}
+    if mode != "fts":
+        link_params["mode"] = mode
+    for name, value in selected.items():
+        link_params[FACET_PARAMS[name]] = value
 
     return templates.TemplateResponse(
         "index.html",
@@ -72,32 +220,35 @@ def index(
             "request": request,
             "rows": rows,
             "q": q,
-            "ty": ty,
+            "mode": mode,
+            "selected": selected,
             "page": page,
             "total_pages": total_pages,
             "total": total,
-            "top_codes": top_codes,
+            "facets": _facet_options(db, facets, selected),
+            "filter_qs": urlencode(link_params),
         },
     )
 
 
 @router.get("/map", response_class=HTMLResponse)
-def map_view(request: Request, db: sqlite3.Connection = Depends(get_db)):
-    sites = db.execute(
-        """SELECT h.SURVEY_NO, h.GCH_NM, h.LAT, h.LON, h.ADDRESS,
-                  c1.TOP_CD_NM AS ty1_top_nm
-           FROM GEOLOGICAL_CULTURAL_HERITAGE h
-           LEFT JOIN COMMON_CODE c1 ON h.TY1_CD = c1.CODE
-           WHERE h.LAT IS NOT NULL AND h.LON IS NOT NULL"""
-    ).fetchall()
+async def map_view(request: Request):
+    return await run_read(partial(_map_page, request))
+
+
+def _map_page(request, db):
+    # 지점은 화면 범위에 따라 /api/heritage/geo에서 불러온다
+    total = db.execute("SELECT COUNT(*) FROM HERITAGE_RTREE").fetchone()[0]
+    top_names = dict(code_cache.get(db).tops)
     return templates.TemplateResponse(
         "map.html",
-        {"request": request, "sites": [dict(s) for s in sites]},
+        {"request": request, "total": total, "top_names": top_names},
     )
 
 
 @router.get("/heritage/new", response_class=HTMLResponse)
-def new_form(request: Request, db: sqlite3.Connection = Depends(get_db)):
+async def new_form(request: Request):
+    codes = await run_read(_get_codes)
     return templates.TemplateResponse(
         "form.html",
         {
@@ -105,28 +256,31 @@ def new_form(request: Request, db: sqlite3.Connection = Depends(get_db)):
             "heritage": None,
             "cave": None,
             "references": [],
-            "codes": _get_codes(db),
+            "codes": codes,
             "is_new": True,
         },
     )
 
 
 @router.get("/heritage/{survey_no}", response_class=HTMLResponse)
-def detail(
-    request: Request,
-    survey_no: str,
-    db: sqlite3.Connection = Depends(get_db),
-):
+async def detail(request: Request, survey_no: str):
+    return await cached_response(
+        request,
+        ("detail", survey_no),
+        survey_no,
+        lambda: run_read(partial(_detail_page, request, survey_no)),
+    )
+
+
+def _detail_page(request, survey_no, db):
     heritage = db.execute(
         """
         SELECT h.*,
-               c1.CODE_NM AS ty1_nm, c1.TOP_CD_NM AS ty1_top,
-               c2.CODE_NM AS ty2_nm, c2.TOP_CD_NM AS ty2_top,
-               c3.CODE_NM AS ty3_nm, c3.TOP_CD_NM AS ty3_top
+               r.TY1_NM AS ty1_nm, r.TY1_TOP_NM AS ty1_top,
+               r.TY2_NM AS ty2_nm, r.TY2_TOP_NM AS ty2_top,
+               r.TY3_NM AS ty3_nm, r.TY3_TOP_NM AS ty3_top
         FROM GEOLOGICAL_CULTURAL_HERITAGE h
-        LEFT JOIN COMMON_CODE c1 ON h.TY1_CD = c1.CODE
-        LEFT JOIN COMMON_CODE c2 ON h.TY2_CD = c2.CODE
-        LEFT JOIN COMMON_CODE c3 ON h.TY3_CD = c3.CODE
+        LEFT JOIN HERITAGE_READ r ON r.ID = h.rowid
         WHERE h.SURVEY_NO = ?
         """,
         [survey_no],
@@ -149,6 +303,13 @@ def detail(
         [survey_no],
     ).fetchall()
 
+    images = db.execute(
+        """SELECT FILE_SN, SFILE_NM, FILE_SZ, FILE_HASH, IMG_WIDTH, IMG_HEIGHT, REMARK
+           FROM CHT_IMAG_DM
+           WHERE REF_SEID = ? ORDER BY SUB_NO, FILE_SN""",
+        [survey_no],
+    ).fetchall()
+
     return templates.TemplateResponse(
         "detail.html",
         {
@@ -156,16 +317,19 @@ def detail(
             "heritage": heritage,
             "cave": cave,
             "references": references,
+            "images": images,
+            "nearby_k": NEARBY_K,
+            "nearby_radius_km": NEARBY_RADIUS_KM,
         },
     )
 
 
 @router.get("/heritage/{survey_no}/edit", response_class=HTMLResponse)
-def edit_form(
-    request: Request,
-    survey_no: str,
-    db: sqlite3.Connection = Depends(get_db),
-):
+async def edit_form(request: Request, survey_no: str):
+    return await run_read(partial(_edit_page, request, survey_no))
+
+
+def _edit_page(request, survey_no, db):
     heritage = db.execute(
         "SELECT * FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?",
         [survey_no],
@@ -198,9 +362,8 @@ def edit_form(
 
 
 @router.post("/heritage/save")
-def save(
+async def save(
     request: Request,
-    db: sqlite3.Connection = Depends(get_db),
     is_new: str = Form(""),
     survey_no: str = Form(""),
     gch_nm: str = Form(""),
@@ -260,112 +423,79 @@ def save(
     def _or_none(v):
         return v.strip() if v.strip() else None
 
-    if is_new == "1":
-        db.execute(
-            """INSERT INTO GEOLOGICAL_CULTURAL_HERITAGE
-               (SURVEY_NO, GCH_NM, SURVEY_NM, PSITN, CTTPC, AREA_NM,
-                GEOLGC_MAP_NM, STRK_SDP, TY1_CD, TY1_DES, TY2_CD, TY2_DES,
-                TY3_CD, TY3_DES, GEOLGC_AGE, RRSTV_RCK, ADDRESS, LAT, LON,
-                CCLT_SCL, RKFR_DES, CREATE_DT)
-               VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,datetime('now'))""",
-            [
-                survey_no, _or_none(gch_nm), _or_none(survey_nm), _or_none(psitn),
-                _or_none(cttpc), _or_none(area_nm), _or_none(geolgc_map_nm),
-                _or_none(strk_sdp), _or_none(ty1_cd), _or_none(ty1_des),
-                _or_none(ty2_cd), _or_none(ty2_des), _or_none(ty3_cd),
-                _or_none(ty3_des), _or_none(geolgc_age), _or_none(rrstv_rck),
-                _or_none(address), lat_val, lon_val, _or_none(cclt_scl),
-                _or_none(rkfr_des),
-            ],
-        )
-    else:
-        db.execute(
-            """UPDATE GEOLOGICAL_CULTURAL_HERITAGE SET
-               GCH_NM=?, SURVEY_NM=?, PSITN=?, CTTPC=?, AREA_NM=?,
-               GEOLGC_MAP_NM=?, STRK_SDP=?, TY1_CD=?, TY1_DES=?, TY2_CD=?,
-               TY2_DES=?, TY3_CD=?, TY3_DES=?, GEOLGC_AGE=?, RRSTV_RCK=?,
-               ADDRESS=?, LAT=?, LON=?, CCLT_SCL=?, RKFR_DES=?
-               WHERE SURVEY_NO=?""",
-            [
-                _or_none(gch_nm), _or_none(survey_nm), _or_none(psitn),
-                _or_none(cttpc), _or_none(area_nm), _or_none(geolgc_map_nm),
-                _or_none(strk_sdp), _or_none(ty1_cd), _or_none(ty1_des),
-                _or_none(ty2_cd), _or_none(ty2_des), _or_none(ty3_cd),
-                _or_none(ty3_des), _or_none(geolgc_age), _or_none(rrstv_rck),
-                _or_none(address), lat_val, lon_val, _or_none(cclt_scl),
-                _or_none(rkfr_des), survey_no,
-            ],
-        )
-
-    # 동굴 정보
-    existing_cave = db.execute(
-        "SELECT 1 FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO = ?", [survey_no]
-    ).fetchone()
-
+    heritage = {
+        "GCH_NM": _or_none(gch_nm), "SURVEY_NM": _or_none(survey_nm),
+        "PSITN": _or_none(psitn), "CTTPC": _or_none(cttpc), "AREA_NM": _or_none(area_nm),
+        "GEOLGC_MAP_NM": _or_none(geolgc_map_nm), "STRK_SDP": _or_none(strk_sdp),
+        "TY1_CD": _or_none(ty1_cd), "TY1_DES": _or_none(ty1_des),
+        "TY2_CD": _or_none(ty2_cd), "TY2_DES": _or_none(ty2_des),
+        "TY3_CD": _or_none(ty3_cd), "TY3_DES": _or_none(ty3_des),
+        "GEOLGC_AGE": _or_none(geolgc_age), "RRSTV_RCK": _or_none(rrstv_rck),
+        "ADDRESS": _or_none(address), "LAT": lat_val, "LON": lon_val,
+        "CCLT_SCL": _or_none(cclt_scl), "RKFR_DES": _or_none(rkfr_des),
+    }
+    cave = None
     if has_cave == "1":
-        cave_params = [
-            _or_none(cave_ent_size), _or_none(cave_length), _or_none(cave_type),
-            _or_none(cave_ent_dir), _or_none(cave_direction),
-            _or_none(cave_ungrd_water), _or_none(cave_ent_water),
-            _or_none(cave_access), _or_none(cave_unkn_topo_des),
-            _or_none(cave_unkn_topo_rank), _or_none(cave_prodt_des),
-            _or_none(cave_prodt_rank), _or_none(cave_bio_des),
-            _or_none(cave_bio_rank), _or_none(cave_prs_protect),
-            _or_none(cave_protect), _or_none(cave_prsv_rank),
-            _or_none(cave_eval_des), _or_none(cave_eval_rank),
-        ]
-        if existing_cave:
-            db.execute(
-                """UPDATE GEOLOGICAL_CULTURAL_CAVE SET
-                   ENT_SIZE=?, LENGTH=?, TYPE=?, ENT_DIR=?, DIRECTION=?,
-                   UNGRD_WATER=?, ENT_WATER=?, ACCESS=?, UNKN_TOPO_DES=?,
-                   UNKN_TOPO_RANK=?, PRODT_DES=?, PRODT_RANK=?, BIO_DES=?,
-                   BIO_RANK=?, PRS_PROTECT=?, PROTECT=?, PRSV_RANK=?,
-                   EVAL_DES=?, EVAL_RANK=?
-                   WHERE SURVEY_NO=?""",
-                cave_params + [survey_no],
-            )
-        else:
-            db.execute(
-                """INSERT INTO GEOLOGICAL_CULTURAL_CAVE
-                   (SURVEY_NO, ENT_SIZE, LENGTH, TYPE, ENT_DIR, DIRECTION,
-                    UNGRD_WATER, ENT_WATER, ACCESS, UNKN_TOPO_DES,
-                    UNKN_TOPO_RANK, PRODT_DES, PRODT_RANK, BIO_DES,
-                    BIO_RANK, PRS_PROTECT, PROTECT, PRSV_RANK,
-                    EVAL_DES, EVAL_RANK)
-                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                [survey_no] + cave_params,
-            )
-    elif existing_cave:
-        db.execute("DELETE FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO = ?", [survey_no])
-
-    # 참고문헌: 기존 삭제 후 재입력
-    db.execute("DELETE FROM REFERENCE_MATERIAL WHERE SURVEY_NO = ?", [survey_no])
-    for i in range(len(ref_material_nm)):
-        nm = ref_material_nm[i].strip() if i < len(ref_material_nm) else ""
+        cave = {
+            "ENT_SIZE": _or_none(cave_ent_size), "LENGTH": _or_none(cave_length),
+            "TYPE": _or_none(cave_type), "ENT_DIR": _or_none(cave_ent_dir),
+            "DIRECTION": _or_none(cave_direction),
+            "UNGRD_WATER": _or_none(cave_ungrd_water), "ENT_WATER": _or_none(cave_ent_water),
+            "ACCESS": _or_none(cave_access),
+            "UNKN_TOPO_DES": _or_none(cave_unkn_topo_des),
+            "UNKN_TOPO_RANK": _or_none(cave_unkn_topo_rank),
+            "PRODT_DES": _or_none(cave_prodt_des), "PRODT_RANK": _or_none(cave_prodt_rank),
+            "BIO_DES": _or_none(cave_bio_des), "BIO_RANK": _or_none(cave_bio_rank),
+            "PRS_PROTECT": _or_none(cave_prs_protect), "PROTECT": _or_none(cave_protect),
+            "PRSV_RANK": _or_none(cave_prsv_rank),
+            "EVAL_DES": _or_none(cave_eval_des), "EVAL_RANK": _or_none(cave_eval_rank),
+        }
+    # 참고문헌 (동적 행): 자료명이 빈 행은 버린다
+    refs = []
+    for i, nm in enumerate(ref_material_nm):
+        nm = nm.strip()
         if not nm:
             continue
-        db.execute(
-            """INSERT INTO REFERENCE_MATERIAL
-               (SURVEY_NO, GROUP_GBN, ORDR, MATERIAL_NM, PGE, CREATE_DT)
-               VALUES (?,?,?,?,?,datetime('now'))""",
-            [
-                survey_no,
-                ref_group_gbn[i].strip() if i < len(ref_group_gbn) else None,
-                ref_ordr[i].strip() if i < len(ref_ordr) else None,
-                nm,
-                ref_pge[i].strip() if i < len(ref_pge) and ref_pge[i].strip() else None,
-            ],
-        )
-
-    db.commit()
+        refs.append((
+            ref_group_gbn[i].strip() if i < len(ref_group_gbn) else None,
+            ref_ordr[i].strip() if i < len(ref_ordr) else None,
+            nm,
+            ref_pge[i].strip() if i < len(ref_pge) and ref_pge[i].strip() else None,
+        ))
+
+    def write(db):
+        result = save_heritage(db, survey_no, heritage, cave, refs, is_new=is_new == "1")
+        if not result.changed:
+            return result
+        bump_generation()
+        response_cache.invalidate(survey_no)
+        top = code_cache.get(db).by_code.get(heritage["TY1_CD"])
+        clusters.update(survey_no, lat_val, lon_val, top.TOP_CD if top else None)
+        facet_index.update(db, survey_no)
+        return result
+
+    try:
+        result = await run_write(write)
+    except DuplicateSurveyNo:
+        return HTMLResponse(f"이미 등록된 조사번호입니다: {survey_no}", status_code=409)
+    except HeritageNotFound:
+        return HTMLResponse(f"없는 조사번호입니다 (삭제되었을 수 있음): {survey_no}", status_code=404)
+    # 쓰기 잠금 대기와 트랜잭션 시간 (SERVER_TIMING이 켜져 있으면 헤더에 나온다)
+    add_timing("lock", result.lock_wait)
+    add_timing("write", result.duration)
     return RedirectResponse(f"/heritage/{survey_no}", status_code=302)
 
 
 @router.post("/heritage/{survey_no}/delete")
-def delete(survey_no: str, db: sqlite3.Connection = Depends(get_db)):
-    db.execute("DELETE FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?", [survey_no])
-    db.commit()
+async def delete(survey_no: str):
+    def write(db):
+        delete_heritage(db, survey_no)
+        bump_generation()
+        response_cache.invalidate(survey_no)
+        clusters.remove(survey_no)
+        facet_index.remove(survey_no)
+
+    await run_write(write)
     return RedirectResponse("/", status_code=302)
 
 
@@ -373,65 +503,297 @@ def delete(survey_no: str, db: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/api/heritage")
-def api_list(
+async def api_list(
+    request: Request,
     q: str = "",
-    ty: str = "",
+    mode: str = Query("fts", pattern="^(fts|like)$"),
     page: int = Query(1, ge=1),
-    db: sqlite3.Connection = Depends(get_db),
+    after: str = "",
+    before: str = "",
+    fields: str = "",
+    selected: dict = Depends(facet_params),
 ):
-    conditions = []
-    params = []
-
-    if q:
-        conditions.append("(GCH_NM LIKE ? OR ADDRESS LIKE ?)")
-        params.extend([f"%{q}%", f"%{q}%"])
-    if ty:
-        conditions.append("TY1_CD IN (SELECT CODE FROM COMMON_CODE WHERE TOP_CD = ?)")
-        params.append(ty)
-
-    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    """목록 API. after/before 커서를 주면 키셋 페이지네이션, 없으면 page(OFFSET).
 
-    total = db.execute(
-        f"SELECT COUNT(*) FROM GEOLOGICAL_CULTURAL_HERITAGE {where}", params
-    ).fetchone()[0]
+    fields(쉼표 구분)로 유산 컬럼, snippet, 하위 테이블(cave, references)을 고른다.
+    ty/mid/area/year/age/cave로 패싯 필터를 건다 (/api/heritage/facets 참고).
+    """
+    return await cached_response(
+        request,
+        ("api_list", q, mode, page, after, before, fields, tuple(sorted(selected.items()))),
+        None,
+        lambda: run_read(partial(_api_list, q, mode, page, after, before, fields, selected)),
+    )
 
-    rows = db.execute(
-        f"""SELECT SURVEY_NO, GCH_NM, TY1_DES, ADDRESS, GEOLGC_AGE, LAT, LON
-            FROM GEOLOGICAL_CULTURAL_HERITAGE {where}
-            ORDER BY SURVEY_NO LIMIT ? OFFSET ?""",
-        params + [PAGE_SIZE, (page - 1) * PAGE_SIZE],
-    ).fetchall()
 
-    return {
+def _api_list(q, mode, page, after, before, fields, selected, db):
+    try:
+        projection = parse_fields(fields, default=LIST_FIELDS, extras=("snippet",))
+    except InvalidFields as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    join, where, params, rank, snippet = _list_filter(q, mode, selected)
+    total = _count(db, q, mode, selected, join, where, params)
+
+    # 정렬 키: 검색 순위가 있으면 (bm25, SURVEY_NO), 없으면 SURVEY_NO
+    sort_cols = ["rank_score", "SURVEY_NO"] if rank else ["SURVEY_NO"]
+    cursor = after or before
+    try:
+        cursor_key = decode_cursor(cursor, len(sort_cols)) if cursor else None
+    except InvalidCursor:
+        return JSONResponse({"error": "invalid cursor"}, status_code=400)
+
+    # 출력 컬럼 뒤에 정렬 키(rank_score)를 붙인다. snippet()은 요청될 때만 계산한다.
+    # HERITAGE_READ에 없는 컬럼을 요청했을 때만 유산 테이블(g)을 rowid로 붙인다.
+    names = list(projection.columns)
+    select = [f"h.{c}" if c in READ_COLUMNS else f"g.{c}" for c in projection.columns]
+    if not READ_COLUMNS.issuperset(projection.columns):
+        join = f"JOIN GEOLOGICAL_CULTURAL_HERITAGE g ON g.rowid = h.ID {join}"
+    if "snippet" in projection.extras:
+        names.append("snippet")
+        select.append(f"{snippet} AS snippet")
+    inner = f"""SELECT {", ".join(select)}, {rank or "NULL"} AS rank_score
+                FROM {LIST_FROM} {join} {where}"""
+    key_expr = "(" + ", ".join(sort_cols) + ")"
+    asc = ", ".join(sort_cols)
+    desc = ", ".join(f"{c} DESC" for c in sort_cols)
+
+    if cursor_key is None:
+        rows = tuple_cursor(
+            db,
+            f"SELECT * FROM ({inner}) ORDER BY {asc} LIMIT ? OFFSET ?",
+            params + [PAGE_SIZE + 1, (page - 1) * PAGE_SIZE],
+        ).fetchall()
+        has_more = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+        has_next, has_prev = has_more, page > 1
+    elif after:
+        rows = tuple_cursor(
+            db,
+            f"""SELECT * FROM ({inner}) WHERE {key_expr} > ({", ".join("?" * len(sort_cols))})
+                ORDER BY {asc} LIMIT ?""",
+            params + cursor_key + [PAGE_SIZE + 1],
+        ).fetchall()
+        has_next, has_prev = len(rows) > PAGE_SIZE, True
+        rows = rows[:PAGE_SIZE]
+    else:
+        rows = tuple_cursor(
+            db,
+            f"""SELECT * FROM ({inner}) WHERE {key_expr} < ({", ".join("?" * len(sort_cols))})
+                ORDER BY {desc} LIMIT ?""",
+            params + cursor_key + [PAGE_SIZE + 1],
+        ).fetchall()
+        has_next, has_prev = True, len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE][::-1]
+
+    # SURVEY_NO는 항상 첫 컬럼, rank_score는 마지막 컬럼
+    def _key(r):
+        return encode_cursor([r[-1], r[0]] if rank else [r[0]])
+
+    n = len(names)
+    items = [dict(zip(names, r[:n])) for r in rows]
+    if "snippet" in projection.extras:
+        for item in items:
+            item["snippet"] = str(highlight(item["snippet"])) or None
+    if projection.cave or projection.references:
+        caves, refs = fetch_children(db, [r[0] for r in rows], projection)
+        for item in items:
+            if projection.cave:
+                item["cave"] = caves.get(item["SURVEY_NO"])
+            if projection.references:
+                item["references"] = refs.get(item["SURVEY_NO"], [])
+
+    return JSONResponse({
         "total": total,
-        "page": page,
+        "page": None if cursor_key else page,
         "page_size": PAGE_SIZE,
-        "items": [dict(r) for r in rows],
-    }
+        "mode": mode,
+        "next": _key(rows[-1]) if rows and has_next else None,
+        "prev": _key(rows[0]) if rows and has_prev else None,
+        "items": items,
+    })
 
 
-@router.get("/api/heritage/{survey_no}")
-def api_detail(survey_no: str, db: sqlite3.Connection = Depends(get_db)):
-    heritage = db.execute(
-        "SELECT * FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?",
-        [survey_no],
-    ).fetchone()
+@router.get("/api/heritage/facets")
+async def api_facets(
+    request: Request,
+    q: str = "",
+    mode: str = Query("fts", pattern="^(fts|like)$"),
+    selected: dict = Depends(facet_params),
+):
+    """패싯(대분류 top, 중분류 mid, 지역 area, 조사연도 year, 지질시대 age, 동굴 여부 cave)
+    값별 건수. 목록과 같은 q/ty/mid/area/year/age/cave 조건을 받는다.
 
-    if not heritage:
-        return {"error": "not found"}
+    각 패싯의 건수는 그 패싯 자신의 선택을 뺀 나머지 조건으로 센다.
+    """
+    return await cached_response(
+        request,
+        ("api_facets", q, mode, tuple(sorted(selected.items()))),
+        None,
+        lambda: run_read(partial(_api_facets, q, mode, selected)),
+    )
 
-    cave = db.execute(
-        "SELECT * FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO = ?",
-        [survey_no],
-    ).fetchone()
 
-    references = db.execute(
-        "SELECT * FROM REFERENCE_MATERIAL WHERE SURVEY_NO = ? ORDER BY GROUP_GBN, ORDR",
-        [survey_no],
-    ).fetchall()
+def _api_facets(q, mode, selected, db):
+    total, facets = _facet_counts(db, q, mode, selected)
+    options = _facet_options(db, facets, selected)
+    # 키는 목록 URL 파라미터 이름이므로 value를 그대로 ?ty=, ?area= 등에 넣으면 된다
+    return JSONResponse({
+        "total": total,
+        "selected": {FACET_PARAMS[name]: value for name, value in selected.items()},
+        "facets": {FACET_PARAMS[name]: items for name, items in options.items()},
+    })
 
+
+@router.get("/api/heritage/geo")
+async def api_geo(
+    bbox: str,
+    zoom: int = Query(7, ge=0, le=22),
+):
+    """화면 범위(bbox=minLon,minLat,maxLon,maxLat) 안의 지점을 GeoJSON으로 반환.
+
+    zoom이 CLUSTER_MAX_ZOOM 이하이면 클러스터(개수, TOP_CD별 개수)로 묶어 보낸다.
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError:
+        return JSONResponse({"error": "invalid bbox"}, status_code=400)
+    return await run_read(partial(_geo, box, zoom))
+
+
+def _geo(box, zoom, db):
+    precision = coord_precision(zoom)
+
+    if zoom <= CLUSTER_MAX_ZOOM:
+        clusters.ensure_loaded(db)
+        cells = clusters.clusters(box, zoom)
+        singles = {
+            r["SURVEY_NO"]: r
+            for r in sites_by_ids(db, [c[4] for c in cells if c[4]])
+        }
+        features = []
+        for lat, lon, count, tops, single in cells:
+            if single in singles:
+                features.append(site_feature(singles[single], precision))
+            else:
+                features.append(cluster_feature(lat, lon, count, tops, precision))
+        return {"type": "FeatureCollection", "truncated": False, "features": features}
+
+    rows = sites_in_bbox(db, box, GEO_LIMIT + 1)
     return {
-        "heritage": dict(heritage),
-        "cave": dict(cave) if cave else None,
-        "references": [dict(r) for r in references],
+        "type": "FeatureCollection",
+        "truncated": len(rows) > GEO_LIMIT,
+        "features": [site_feature(r, precision) for r in rows[:GEO_LIMIT]],
+    }
+
+
+@router.get("/api/heritage/near")
+async def api_near(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0, le=NEAR_MAX_RADIUS_KM),
+    k: int = Query(10, ge=1, le=NEAR_MAX_K),
+    ty: str = "",
+):
+    """좌표에서 가까운 유산 k개 (radius_km를 주면 그 반경 안에서만). ty로 대분류를 거른다.
+
+    R*Tree로 반경을 덮는 bbox 후보를 고른 뒤 haversine 거리로 거르고 정렬한다.
+    """
+    return await cached_response(
+        request,
+        ("api_near", lat, lon, radius_km, k, ty),
+        None,
+        lambda: run_read(partial(_near, lat, lon, radius_km, k, ty)),
+    )
+
+
+def _near(lat, lon, radius_km, k, ty, db):
+    found = sites_near(db, lat, lon, k, radius_km, ty or None)
+    return JSONResponse({
+        "lat": lat,
+        "lon": lon,
+        "radius_km": radius_km,
+        "k": k,
+        "items": [
+            {
+                "SURVEY_NO": row["SURVEY_NO"],
+                "GCH_NM": row["GCH_NM"],
+                "LAT": row["LAT"],
+                "LON": row["LON"],
+                "ADDRESS": row["ADDRESS"],
+                "TOP_CD": row["TOP_CD"],
+                "TOP_NM": row["ty1_top_nm"],
+                "distance_km": round(dist, 3),
+            }
+            for dist, row in found
+        ],
+    })
+
+
+@router.get("/api/heritage/export")
+async def api_export(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv|geojson)$"),
+    q: str = "",
+    mode: str = Query("fts", pattern="^(fts|like)$"),
+    selected: dict = Depends(facet_params),
+):
+    """검색 조건에 맞는 전체 유산을 동굴/참고문헌과 함께 스트리밍으로 내보낸다."""
+    join, where, params, _, _ = _list_filter(q, mode, selected)
+    media_type, ext = EXPORT_FORMATS[format]
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+
+    # 페이지마다 run_read로 읽으므로 다운로드 중에는 연결을 붙잡지 않는다
+    body = await open_export(format, join, where, params, gzip=gzip)
+    headers = {
+        "Content-Disposition": f'attachment; filename="heritage.{ext}"',
+        "Vary": "Accept-Encoding",
     }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+class BatchRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=BATCH_MAX)
+    fields: list[str] | None = None
+
+
+@router.post("/api/heritage/batch")
+async def api_batch(body: BatchRequest):
+    """여러 유산을 한 번에 조회. fields로 유산 컬럼과 하위 테이블(cave, references)을 고른다."""
+    try:
+        projection = parse_fields(body.fields)
+    except InvalidFields as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    ids = list(dict.fromkeys(body.ids))
+    records = await run_read(lambda db: fetch_records(db, ids, projection))
+    return JSONResponse({
+        "items": [records[i] for i in ids if i in records],
+        "missing": [i for i in ids if i not in records],
+    })
+
+
+@router.get("/api/heritage/{survey_no}")
+async def api_detail(request: Request, survey_no: str, fields: str = ""):
+    """유산 하나. fields(쉼표 구분)로 유산 컬럼과 하위 테이블(cave, references)을 고른다."""
+    return await cached_response(
+        request,
+        ("api_detail", survey_no, fields),
+        survey_no,
+        lambda: run_read(partial(_api_detail, survey_no, fields)),
+    )
+
+
+def _api_detail(survey_no, fields, db):
+    try:
+        projection = parse_fields(fields)
+    except InvalidFields as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    record = fetch_records(db, [survey_no], projection).get(survey_no)
+    if record is None:
+        return JSONResponse({"error": "not found"})
+    return JSONResponse(record)
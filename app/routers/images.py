@@ -0,0 +1,134 @@
+import mimetypes
+import os
+from functools import partial
+
+from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.executor import run_read
+from app.images import (
+    FORMATS,
+    VARIANTS,
+    derivatives,
+    file_etag,
+    parse_range,
+    pick_format,
+    source_path,
+)
+
+router = APIRouter()
+
+# URL의 v=가 현재 파일 내용의 해시와 일치할 때만 오래 캐시한다
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 버전이 없거나 맞지 않는 URL은 매번 ETag로 재검증한다
+CACHE_CONTROL_REVALIDATE = "public, no-cache"
+FILE_CHUNK = 64 * 1024  # 파일 본문을 이만큼씩 읽어 보낸다
+
+mimetypes.add_type("image/jp2", ".jp2")
+
+
+def _file_chunks(f, start, length):
+    """열린 파일의 start부터 length바이트를 FILE_CHUNK씩 읽어 낸다 (전체를 메모리에 올리지 않음)."""
+    with f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(FILE_CHUNK, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _file_response(f, start, length, media_type, headers, status_code=200):
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _file_chunks(f, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def _cache_control(request, src_digest):
+    """v=가 원본 파일의 현재 해시(앞 16자)와 같을 때만 immutable"""
+    version = request.query_params.get("v")
+    if version and version == src_digest[:16]:
+        return CACHE_CONTROL
+    return CACHE_CONTROL_REVALIDATE
+
+
+def _serve(request, path, media_type, etag, cache_control, vary=False):
+    """ETag/조건부 GET/Range를 지원하는 파일 응답.
+
+    파일은 응답을 만들기 전에 연다. 열린 뒤에는 캐시 정리로 지워져도 끝까지 읽을 수
+    있고, 그 전에 없어졌으면 FileNotFoundError를 그대로 던진다.
+    """
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if vary:
+        headers["Vary"] = "Accept"
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if f'"{etag}"' in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    f = open(path, "rb")
+    size = os.fstat(f.fileno()).st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == f'"{etag}"'):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            f.close()
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return _file_response(f, start, end - start + 1, media_type, headers, 206)
+
+    return _file_response(f, 0, size, media_type, headers)
+
+
+def _image_row(file_sn, db):
+    return db.execute(
+        "SELECT SAVE_PT, SFILE_NM FROM CHT_IMAG_DM WHERE FILE_SN = ?",
+        [file_sn],
+    ).fetchone()
+
+
+@router.get("/images/{file_sn}/{variant}")
+async def image(request: Request, file_sn: int, variant: str):
+    """CHT_IMAG_DM 이미지. variant: thumb | display | original"""
+    if variant != "original" and variant not in VARIANTS:
+        return Response(status_code=404)
+
+    row = await run_read(partial(_image_row, file_sn))
+    src = source_path(row["SAVE_PT"], row["SFILE_NM"]) if row else None
+    if src is None:
+        return Response(status_code=404)
+
+    # FILE_HASH는 입력 시점의 값이라 파일이 교체되면 낡는다.
+    # file_etag는 크기·mtime이 같으면 캐시된 해시를 돌려준다.
+    # 해시 계산과 파생 이미지 생성은 DB를 쓰지 않으므로 기본 스레드풀에서 돌린다.
+    src_digest = await run_in_threadpool(file_etag, src)
+    cache_control = _cache_control(request, src_digest)
+
+    if variant == "original":
+        media_type = mimetypes.guess_type(src.name)[0] or "application/octet-stream"
+        return _serve(request, src, media_type, src_digest, cache_control)
+
+    fmt = pick_format(request.headers.get("accept"))
+    for attempt in range(2):
+        path, digest = await run_in_threadpool(derivatives.get, src, variant, fmt)
+        try:
+            return _serve(request, path, FORMATS[fmt][1], digest, cache_control, vary=True)
+        except FileNotFoundError:
+            # get()이 돌려준 뒤 파일을 열기 전에 캐시 정리(_evict)가 지웠으면 다시 만든다
+            if attempt:
+                raise
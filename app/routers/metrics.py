@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.cache import count_cache
+from app.codes import code_cache
+from app.database import pool_stats
+from app.executor import executor_stats
+from app.images import derivatives
+from app.metrics import query_tracer, render_prometheus
+from app.response_cache import response_cache
+from app.writes import write_stats
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 텍스트 형식의 요청/쿼리/캐시 지표"""
+    body = render_prometheus({
+        "pool": pool_stats(),
+        "executor": executor_stats(),
+        "count_cache": count_cache.stats(),
+        "code_cache": code_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "derivative_cache": derivatives.stats(),
+        "writes": write_stats(),
+    })
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/metrics/slow", include_in_schema=False)
+def slow_queries():
+    """최근 느린 쿼리와 실행 계획 (새 것부터)"""
+    return JSONResponse(query_tracer.slow_queries()[::-1])
@@ -0,0 +1,89 @@
+"""키워드 검색 (FTS5 trigram 색인 + LIKE 대체 경로)"""
+
+from typing import NamedTuple
+
+from markupsafe import Markup, escape
+
+# HERITAGE_FTS에서 LIKE로 훑을 색인 컬럼 (sql/heritage_search.sql 참고)
+FTS_COLUMNS = ("GCH_NM", "ADDRESS", "RKFR_DES", "GEOLGC_AGE", "RRSTV_RCK", "MATERIAL_NM")
+# bm25 컬럼 가중치: SURVEY_NO(미색인), 유산명, 주소, 암석기재, 지질시대, 대표암석, 참고문헌
+BM25_WEIGHTS = "0, 10.0, 4.0, 1.0, 2.0, 2.0, 1.0"
+TRIGRAM = 3  # trigram 색인은 3글자 이상만 MATCH 가능
+
+# snippet() 강조 표시용 제어문자 — HTML 이스케이프 후 <mark>로 바꾼다
+MARK_OPEN = "\x02"
+MARK_CLOSE = "\x03"
+
+
+class SearchClause(NamedTuple):
+    join: str
+    conditions: list
+    params: list
+    rank: str | None
+    snippet: str
+
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_search(q, mode="fts"):
+    """검색어를 JOIN/WHERE 조각으로 변환. 유산 테이블 별칭은 h로 가정한다.
+
+    mode="fts": 3글자 이상 단어는 MATCH(bm25 순위, snippet 포함),
+                짧은 단어는 색인 컬럼 전체에 대한 LIKE로 처리한다.
+    mode="like": 기존 방식 (유산명/주소 LIKE).
+    """
+    q = q.strip()
+    if not q:
+        return None
+
+    if mode == "like":
+        return SearchClause(
+            join="",
+            conditions=["(h.GCH_NM LIKE ? OR h.ADDRESS LIKE ?)"],
+            params=[f"%{q}%", f"%{q}%"],
+            rank=None,
+            snippet="NULL",
+        )
+
+    terms = q.split()
+    long_terms = [t for t in terms if len(t) >= TRIGRAM]
+    short_terms = [t for t in terms if len(t) < TRIGRAM]
+
+    conditions = []
+    params = []
+    if long_terms:
+        conditions.append("HERITAGE_FTS MATCH ?")
+        params.append(" AND ".join(_phrase(t) for t in long_terms))
+    for t in short_terms:
+        conditions.append(
+            "(" + " OR ".join(f"HERITAGE_FTS.{c} LIKE ?" for c in FTS_COLUMNS) + ")"
+        )
+        params.extend([f"%{t}%"] * len(FTS_COLUMNS))
+
+    if long_terms:
+        rank = f"bm25(HERITAGE_FTS, {BM25_WEIGHTS})"
+        snippet = f"snippet(HERITAGE_FTS, -1, '{MARK_OPEN}', '{MARK_CLOSE}', '…', 16)"
+    else:
+        rank = None
+        snippet = "NULL"
+
+    return SearchClause(
+        join="JOIN HERITAGE_FTS ON HERITAGE_FTS.rowid = h.rowid",
+        conditions=conditions,
+        params=params,
+        rank=rank,
+        snippet=snippet,
+    )
+
+
+def highlight(snippet):
+    """snippet() 결과를 이스케이프하고 일치 구간을 <mark>로 감싼다."""
+    if not snippet:
+        return ""
+    return Markup(
+        str(escape(snippet))
+        .replace(MARK_OPEN, "<mark>")
+        .replace(MARK_CLOSE, "</mark>")
+    )
@@ -0,0 +1,240 @@
+"""유산 저장/삭제 쓰기 서비스
+
+저장 한 건은 BEGIN IMMEDIATE 트랜잭션 하나로 처리한다. 유산 행은 새로 등록할 때만
+INSERT하고 수정은 기존 행의 UPDATE로만 한다 (없는 조사번호는 만들지 않음). 유산/동굴
+행은 값이 같으면 UPDATE를 건너뛰어 검색·공간 색인 트리거가 돌지 않게 하고,
+참고문헌은 기존 행과 비교해 바뀐 행만 executemany로 지우고 넣는다.
+오류가 나면 롤백하고 예외를 다시 던진다. 쓰기 지연 시간은 write_stats()로 본다.
+"""
+
+import threading
+import time
+from typing import NamedTuple
+
+from app.cache import begin_local_write, end_local_write, read_data_version
+
+HERITAGE_COLUMNS = (
+    "GCH_NM", "SURVEY_NM", "PSITN", "CTTPC", "AREA_NM", "GEOLGC_MAP_NM", "STRK_SDP",
+    "TY1_CD", "TY1_DES", "TY2_CD", "TY2_DES", "TY3_CD", "TY3_DES",
+    "GEOLGC_AGE", "RRSTV_RCK", "ADDRESS", "LAT", "LON", "CCLT_SCL", "RKFR_DES",
+)
+CAVE_COLUMNS = (
+    "ENT_SIZE", "LENGTH", "TYPE", "ENT_DIR", "DIRECTION", "UNGRD_WATER", "ENT_WATER",
+    "ACCESS", "UNKN_TOPO_DES", "UNKN_TOPO_RANK", "PRODT_DES", "PRODT_RANK",
+    "BIO_DES", "BIO_RANK", "PRS_PROTECT", "PROTECT", "PRSV_RANK", "EVAL_DES", "EVAL_RANK",
+)
+
+
+def _insert_sql(table, columns, extra_insert=""):
+    """새 행만 넣는 INSERT. 조사번호가 이미 있으면 아무것도 하지 않는다 (rowcount 0 → 중복)."""
+    names = ", ".join(columns)
+    marks = ", ".join(f":{c}" for c in columns)
+    insert_cols = f"SURVEY_NO, {names}" + (", CREATE_DT" if extra_insert else "")
+    insert_vals = f":SURVEY_NO, {marks}" + (f", {extra_insert}" if extra_insert else "")
+    return f"""INSERT INTO {table} ({insert_cols}) VALUES ({insert_vals})
+               ON CONFLICT(SURVEY_NO) DO NOTHING"""
+
+
+def _update_sql(table, columns):
+    """값이 하나라도 다를 때만 기존 행을 고치는 UPDATE (없는 행은 만들지 않는다)."""
+    updates = ", ".join(f"{c} = :{c}" for c in columns)
+    changed = " OR ".join(f"{c} IS NOT :{c}" for c in columns)
+    return f"""UPDATE {table} SET {updates}
+               WHERE SURVEY_NO = :SURVEY_NO AND ({changed})"""
+
+
+def _upsert_sql(table, columns):
+    """값이 하나라도 다를 때만 UPDATE하는 INSERT ... ON CONFLICT 문 (동굴 정보용)."""
+    names = ", ".join(columns)
+    marks = ", ".join(f":{c}" for c in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns)
+    changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in columns)
+    return f"""INSERT INTO {table} (SURVEY_NO, {names}) VALUES (:SURVEY_NO, {marks})
+               ON CONFLICT(SURVEY_NO) DO UPDATE SET {updates}
+               WHERE {changed}"""
+
+
+HERITAGE_INSERT_SQL = _insert_sql(
+    "GEOLOGICAL_CULTURAL_HERITAGE", HERITAGE_COLUMNS, "datetime('now')"
+)
+HERITAGE_UPDATE_SQL = _update_sql("GEOLOGICAL_CULTURAL_HERITAGE", HERITAGE_COLUMNS)
+CAVE_UPSERT_SQL = _upsert_sql("GEOLOGICAL_CULTURAL_CAVE", CAVE_COLUMNS)
+REFERENCE_INSERT_SQL = """INSERT INTO REFERENCE_MATERIAL
+    (SURVEY_NO, GROUP_GBN, ORDR, MATERIAL_NM, PGE, CREATE_DT)
+    VALUES (?,?,?,?,?,datetime('now'))"""
+
+
+class DuplicateSurveyNo(ValueError):
+    """새로 등록하려는 조사번호가 이미 있음"""
+
+
+class HeritageNotFound(LookupError):
+    """수정하려는 조사번호가 없음 (그 사이 삭제되었거나 잘못된 요청)"""
+
+
+class SaveResult(NamedTuple):
+    heritage_changed: bool
+    cave_changed: bool
+    refs_added: int
+    refs_removed: int
+    lock_wait: float  # BEGIN IMMEDIATE로 쓰기 잠금을 얻기까지 (초)
+    duration: float  # 잠금을 얻은 뒤 커밋까지 (초)
+
+    @property
+    def changed(self):
+        return self.heritage_changed or self.cave_changed or bool(self.refs_added or self.refs_removed)
+
+
+class WriteStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.rollbacks = 0
+        self.lock_wait_total = 0.0
+        self.lock_wait_max = 0.0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+
+    def record(self, lock_wait, duration):
+        with self._lock:
+            self.commits += 1
+            self.lock_wait_total += lock_wait
+            self.lock_wait_max = max(self.lock_wait_max, lock_wait)
+            self.duration_total += duration
+            self.duration_max = max(self.duration_max, duration)
+
+    def rollback(self):
+        with self._lock:
+            self.rollbacks += 1
+
+    def stats(self):
+        with self._lock:
+            n = self.commits or 1
+            return {
+                "commits": self.commits,
+                "rollbacks": self.rollbacks,
+                "lock_wait_ms_avg": round(self.lock_wait_total / n * 1000, 3),
+                "lock_wait_ms_max": round(self.lock_wait_max * 1000, 3),
+                "duration_ms_avg": round(self.duration_total / n * 1000, 3),
+                "duration_ms_max": round(self.duration_max * 1000, 3),
+            }
+
+
+_stats = WriteStats()
+
+
+def write_stats():
+    return _stats.stats()
+
+
+def _transaction(db, work):
+    """BEGIN IMMEDIATE ~ COMMIT 안에서 work()를 실행 → (결과, 잠금 대기, 소요 시간)
+
+    잠금을 쥔 채 트랜잭션 전후의 DATA_VERSION을 읽어 app.cache에 알린다
+    (이 프로세스의 쓰기를 다른 프로세스의 변경으로 오인하지 않도록).
+    """
+    start = time.perf_counter()
+    if db.in_transaction:
+        db.rollback()
+    begin_local_write()
+    before = after = None
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        locked = time.perf_counter()
+        try:
+            before = read_data_version(db)
+            result = work()
+            after = read_data_version(db)
+            db.commit()
+        except BaseException:
+            before = None
+            db.rollback()
+            _stats.rollback()
+            raise
+    finally:
+        end_local_write(before, after)
+    done = time.perf_counter()
+    _stats.record(locked - start, done - locked)
+    return result, locked - start, done - locked
+
+
+def _ref_key(values):
+    return tuple(None if v is None else str(v) for v in values)
+
+
+def sync_references(db, survey_no, refs):
+    """참고문헌을 refs(GROUP_GBN, ORDR, MATERIAL_NM, PGE 튜플 목록)에 맞춘다.
+
+    내용이 같은 기존 행은 그대로 두고(MATERIAL_SN 유지) 나머지만 지우고 넣는다.
+    웹 저장과 import_heritage.py --update가 함께 쓴다. → (추가 수, 삭제 수)
+    """
+    old = {}
+    for row in db.execute(
+        """SELECT MATERIAL_SN, GROUP_GBN, ORDR, MATERIAL_NM, PGE
+           FROM REFERENCE_MATERIAL WHERE SURVEY_NO = ? ORDER BY MATERIAL_SN""",
+        [survey_no],
+    ):
+        old.setdefault(_ref_key(tuple(row)[1:]), []).append(row[0])
+    added = []
+    for ref in refs:
+        sns = old.get(_ref_key(ref))
+        if sns:
+            sns.pop(0)
+        else:
+            added.append((survey_no, *ref))
+    removed = [(sn,) for sns in old.values() for sn in sns]
+    if removed:
+        db.executemany("DELETE FROM REFERENCE_MATERIAL WHERE MATERIAL_SN = ?", removed)
+    if added:
+        db.executemany(REFERENCE_INSERT_SQL, added)
+    return len(added), len(removed)
+
+
+def save_heritage(db, survey_no, heritage, cave, refs, is_new=False):
+    """유산 한 건을 저장한다.
+
+    heritage/cave는 컬럼명 → 값 dict (cave가 None이면 동굴 정보를 지운다),
+    refs는 (GROUP_GBN, ORDR, MATERIAL_NM, PGE) 튜플 목록이다.
+    is_new인데 조사번호가 이미 있으면 DuplicateSurveyNo를, 수정인데 조사번호가 없으면
+    HeritageNotFound를 던진다 (둘 다 롤백됨).
+    """
+
+    def work():
+        params = {c: heritage.get(c) for c in HERITAGE_COLUMNS}
+        params["SURVEY_NO"] = survey_no
+        if is_new:
+            if db.execute(HERITAGE_INSERT_SQL, params).rowcount == 0:
+                raise DuplicateSurveyNo(survey_no)
+            heritage_changed = True
+        else:
+            heritage_changed = db.execute(HERITAGE_UPDATE_SQL, params).rowcount > 0
+            if not heritage_changed and db.execute(
+                "SELECT 1 FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?", [survey_no]
+            ).fetchone() is None:
+                raise HeritageNotFound(survey_no)
+
+        if cave is not None:
+            params = {c: cave.get(c) for c in CAVE_COLUMNS}
+            params["SURVEY_NO"] = survey_no
+            cave_changed = db.execute(CAVE_UPSERT_SQL, params).rowcount > 0
+        else:
+            cave_changed = db.execute(
+                "DELETE FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO = ?", [survey_no]
+            ).rowcount > 0
+
+        added, removed = sync_references(db, survey_no, refs)
+        return heritage_changed, cave_changed, added, removed
+
+    (heritage_changed, cave_changed, added, removed), lock_wait, duration = _transaction(db, work)
+    return SaveResult(heritage_changed, cave_changed, added, removed, lock_wait, duration)
+
+
+def delete_heritage(db, survey_no):
+    """유산 한 건을 지운다 (동굴/참고문헌은 ON DELETE CASCADE). → 삭제 여부"""
+    deleted, _, _ = _transaction(
+        db,
+        lambda: db.execute(
+            "DELETE FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?", [survey_no]
+        ).rowcount > 0,
+    )
+    return deleted
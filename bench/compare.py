@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare two bench.run result files.
+
+Prints per-scenario p50/p99/throughput for both runs and the relative change.
+Exits with status 1 if any scenario's p99 got worse by more than --threshold
+(default 20%), so it can gate a CI job.
+
+Usage: python -m bench.compare <baseline.json> <candidate.json> [--threshold 0.2]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _change(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def _fmt(change):
+    return "      -" if change is None else f"{change:+7.1%}"
+
+
+def compare(base, cand, threshold):
+    """Print the comparison table; return the scenario names that regressed."""
+    for key in ("size", "requests", "concurrency"):
+        if base["meta"].get(key) != cand["meta"].get(key):
+            print(f"warning: {key} differs ({base['meta'].get(key)} vs {cand['meta'].get(key)})")
+    for label, run in (("baseline ", base), ("candidate", cand)):
+        print(f"{label} {(run['meta']['commit'] or 'nogit')[:10]}  {run['meta']['timestamp']}")
+    print()
+    print(f"{'scenario':<14}{'p50 ms':>26}{'p99 ms':>26}{'req/s':>26}")
+
+    regressed = []
+    for name in sorted(set(base["http"]) | set(cand["http"])):
+        b, c = base["http"].get(name), cand["http"].get(name)
+        if b is None or c is None:
+            print(f"{name:<14}  (only in {'candidate' if b is None else 'baseline'})")
+            continue
+        p99 = _change(b["p99_ms"], c["p99_ms"])
+        print(
+            f"{name:<14}"
+            f"{b['p50_ms']:>9.2f} → {c['p50_ms']:<6.2f} {_fmt(_change(b['p50_ms'], c['p50_ms']))}"
+            f"{b['p99_ms']:>9.2f} → {c['p99_ms']:<6.2f} {_fmt(p99)}"
+            f"{b['rps']:>9.1f} → {c['rps']:<6.1f} {_fmt(_change(b['rps'], c['rps']))}"
+        )
+        if p99 is not None and p99 > threshold:
+            regressed.append(name)
+
+    for phase in ("initial", "reimport"):
+        b = base["import"][phase]["seconds"]
+        c = cand["import"][phase]["seconds"]
+        print(f"import {phase:<8}{b:>9.3f} → {c:<6.3f} s {_fmt(_change(b, c))}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative p99 increase before failing (default 0.2)")
+    args = parser.parse_args()
+
+    base = json.loads(args.baseline.read_text(encoding="utf-8"))
+    cand = json.loads(args.candidate.read_text(encoding="utf-8"))
+    regressed = compare(base, cand, args.threshold)
+    if regressed:
+        print(f"\np99 regression over {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
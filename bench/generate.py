@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Synthetic heritage JSON generator for benchmarks.
+
+Writes one JSON file per record in the same shape as heritage_list/data/*.json
+(types, cave, references, DMS coordinates, Korean text). Record i is built
+from its own Random(seed, i), so any size is reproducible and a larger data
+set is a superset of a smaller one with the same seed.
+
+Usage: python -m bench.generate <out_dir> <count> [--seed N] [--workers N]
+"""
+
+import json
+import random
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SEED = 2026
+MARKER = ".generated"
+
+# (survey_no prefix, area_nm, (min_lat, max_lat), (min_lon, max_lon), counties)
+REGIONS = (
+    ("GW", "강원권", (37.0, 38.6), (127.1, 129.3), ("강원 영월군", "강원 정선군", "강원 삼척시", "강원 평창군")),
+    ("CB", "충청권", (36.0, 37.2), (127.3, 128.6), ("충북 단양군", "충북 제천시", "충북 괴산군")),
+    ("CN", "충청권", (35.9, 37.0), (126.1, 127.6), ("충남 태안군", "충남 보령시", "충남 공주시")),
+    ("GB", "경북권", (35.6, 37.1), (128.0, 129.6), ("경북 포항시", "경북 의성군", "경북 영천시", "경북 울진군")),
+    ("GN", "경남권", (34.6, 35.9), (127.6, 129.2), ("경남 고성군", "경남 남해군", "경남 진주시", "경남 통영시")),
+    ("JB", "전라권", (35.3, 36.1), (126.4, 127.9), ("전북 부안군", "전북 임실군", "전북 진안군")),
+    ("JN", "전라권", (34.2, 35.5), (125.9, 127.9), ("전남 해남군", "전남 화순군", "전남 여수시", "전남 신안군")),
+    ("JJ", "제주", (33.2, 33.6), (126.1, 126.95), ("제주 제주시", "제주 서귀포시")),
+    ("US", "울산", (35.4, 35.7), (129.0, 129.45), ("울산 울주군", "울산 북구")),
+)
+VILLAGES = ("상진리", "도담리", "석항리", "하동리", "덕천리", "용암리", "송학리", "대평리", "월곡리", "신기리")
+FEATURES = (
+    "석회암 지질구조", "해안 주상절리", "공룡발자국 화석산지", "습곡 노두", "동굴", "용암동굴",
+    "퇴적층 단면", "단층 노두", "화강암 토르", "해식애", "하식동굴", "규화목 산지", "층상 석회암",
+)
+AGES = (
+    "고생대 캄브리아기-오르도비스기\n조선누층군 영흥층", "중생대 백악기\n경상누층군 하양층군",
+    "신생대 제4기", "선캄브리아대 원생누대", "중생대 쥐라기\n대보화강암", "신생대 제3기 마이오세",
+    "고생대 석탄기-페름기\n평안누층군",
+)
+ROCKS = ("석회암", "셰일", "사암", "역암", "현무암", "화강암", "응회암", "편마암", "이암", "규암")
+PEOPLE = ("진광민", "김문기", "이승배", "박정웅", "최범영", "조형성", "강희철", "신승원", "정대교", "임현수")
+ORGS = ("한국지질자원연구원", "국립문화재연구원", "한국동굴연구소", "지역대학 지질학과")
+SENTENCES = (
+    "도로절개시면을 따라 약 {n}m의 노두가 노출되어 있다.",
+    "층리면의 주향은 동북동-서남서이며 {n}°의 경사각을 가진다.",
+    "습곡과 단층 등 다양한 지질구조를 한 노두에서 관찰할 수 있다.",
+    "관입암맥이 수십 cm에서 수 m의 두께로 발달한다.",
+    "해안을 따라 파식대와 해식동굴이 연속적으로 분포한다.",
+    "학술적 가치가 높아 지질학습 장소로 활용할 수 있다.",
+    "풍화가 진행되어 일부 구간은 보호조치가 필요하다.",
+    "공룡발자국 화석 {n}여 개가 보행렬을 이루며 관찰된다.",
+)
+CAVE_TYPES = ("수평", "수직", "복합")
+DIRECTIONS = ("북", "북동", "동", "남동", "남", "남서", "서", "북서")
+RANKS = ("가", "나", "다", "라")
+BOOKS = (
+    "한국의 지질노두 160선(한국지질자원연구원, 2013)",
+    "지질·광물 문화재 정밀조사 보고서(문화재청, 2005)",
+    "천연기념물 동굴 조사보고서(문화재청, 2010)",
+    "{a}, {b}, {y}, {r} 지질유산의 분포와 가치평가. 지질학회지, {v}, {p}-{q}.",
+)
+
+
+def type_codes():
+    """(CODE, CODE_NM, TOP_CD_NM, MID_CD_NM) for every code in sql/common_code.sql."""
+    text = (ROOT / "sql" / "common_code.sql").read_text(encoding="utf-8")
+    return re.findall(
+        r"'([A-Z][a-z]\d{3})','([^']*)','[A-Z]','([^']*)','[A-Z][a-z]','([^']*)'", text
+    )
+
+
+def dms(value, pos, neg):
+    """Decimal degrees → '36°59′21.05″N' (the format import_heritage.parse_dms reads)."""
+    direction = pos if value >= 0 else neg
+    value = abs(value)
+    deg = int(value)
+    minutes = int((value - deg) * 60)
+    sec = (value - deg - minutes / 60) * 3600
+    return f"{deg}°{minutes}′{sec:.2f}″{direction}"
+
+
+def make_record(i, seed=DEFAULT_SEED, codes=None):
+    rng = random.Random(f"{seed}:{i}")
+    codes = codes or type_codes()
+    prefix, area, lat_range, lon_range, counties = rng.choice(REGIONS)
+    county = rng.choice(counties)
+    village = rng.choice(VILLAGES)
+    feature = rng.choice(FEATURES)
+    picked = rng.sample(codes, rng.choice((1, 1, 1, 2, 3)))
+    is_cave = "동굴" in feature or any(code.startswith("La") for code, *_ in picked)
+
+    record = {
+        "survey_no": f"{prefix}{i:07d}",
+        "survey_year": rng.choice((2022, 2023, 2024, 2025)),
+        "gch_nm": f"{county.split()[1][:-1]} {village} {feature}",
+        "survey_nm": ", ".join(rng.sample(PEOPLE, 2)),
+        "psitn": rng.choice(ORGS),
+        "cttpc": None,
+        "area_nm": area,
+        "geolgc_map_nm": county.split()[1][:-1],
+        "strk_sdp": f"N{rng.randint(0, 89)}°{rng.choice('EW')}/{rng.randint(5, 85)}°{rng.choice(('NW', 'SE', 'NE', 'SW'))}",
+        "types": [{"code": code, "des": f"{top}({mid}_{nm})"} for code, nm, top, mid in picked],
+        "geolgc_age": rng.choice(AGES),
+        "rrstv_rck": rng.choice(ROCKS),
+        "address": f"{county} {village} 산 {rng.randint(1, 300)}-{rng.randint(1, 20)}",
+        "lat_dms": dms(rng.uniform(*lat_range), "N", "S"),
+        "lon_dms": dms(rng.uniform(*lon_range), "E", "W"),
+        "cclt_scl": f"정밀발굴조사지역: {rng.randint(1000, 50000):,}㎡",
+        "rkfr_des": " ".join(
+            s.format(n=rng.randint(5, 90)) for s in rng.sample(SENTENCES, rng.randint(2, 5))
+        ),
+        "cave": None,
+        "references": [],
+    }
+    if is_cave:
+        record["cave"] = {
+            "ent_size": f"{rng.uniform(1, 15):.1f}m × {rng.uniform(1, 12):.1f}m",
+            "length": f"약 {rng.randint(10, 3000)}m",
+            "type": rng.choice(CAVE_TYPES),
+            "ent_dir": f"{rng.choice(DIRECTIONS)}",
+            "direction": f"{rng.choice(DIRECTIONS)}과 {rng.choice(DIRECTIONS)}",
+            "ungrd_water": rng.choice(("유", "무")),
+            "ent_water": rng.choice(("유", "무")),
+            "access": f"{county} {village} 마을 뒤편 절벽 하부에 위치",
+            "unkn_topo_des": rng.choice(("용식공", "천장용식구", "벽면요곡")),
+            "unkn_topo_rank": rng.choice(RANKS),
+            "prodt_des": rng.choice(("유석, 동굴산호", "종유석, 석순", "석주, 커튼")),
+            "prodt_rank": rng.choice(RANKS),
+            "bio_des": f"동굴통거미 등 {rng.randint(1, 40)}종",
+            "bio_rank": rng.choice(RANKS),
+            "prs_protect": rng.choice(("유", "무")),
+            "protect": "보호시설설치여부: " + rng.choice(("설치 필요", "설치됨")),
+            "prsv_rank": rng.choice(("양호", "보통", "불량")),
+            "eval_des": "동굴전문가의 자문을 통해 보호시설물의 설치가 필요함.",
+            "eval_rank": rng.choice(RANKS),
+        }
+    for n in range(rng.randint(0, 4)):
+        a, b = rng.sample(PEOPLE, 2)
+        record["references"].append({
+            "group_gbn": rng.choice(("1", "기존자료")),
+            "ordr": str(n + 1),
+            "material_nm": rng.choice(BOOKS).format(
+                a=a, b=b, y=rng.randint(1990, 2024), r=area, v=rng.randint(1, 60),
+                p=rng.randint(1, 600), q=rng.randint(601, 700),
+            ),
+            "pge": rng.choice((None, f"{rng.randint(1, 300)}-{rng.randint(301, 400)}")),
+        })
+    return record
+
+
+def _write_range(out_dir, start, stop, seed):
+    codes = type_codes()
+    out = Path(out_dir)
+    for i in range(start, stop):
+        record = make_record(i, seed, codes)
+        (out / f"{record['survey_no']}.json").write_text(
+            json.dumps(record, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    return stop - start
+
+
+def generate(out_dir, count, seed=DEFAULT_SEED, workers=None):
+    """Write `count` records into out_dir (reused if a matching set is already there)."""
+    out = Path(out_dir)
+    marker = out / MARKER
+    if marker.exists() and json.loads(marker.read_text()) == {"count": count, "seed": seed}:
+        return out
+    out.mkdir(parents=True, exist_ok=True)
+    for stale in out.glob("*.json"):
+        stale.unlink()
+    step = 5000
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [
+            pool.submit(_write_range, str(out), start, min(start + step, count), seed)
+            for start in range(0, count, step)
+        ]
+        for job in jobs:
+            job.result()
+    marker.write_text(json.dumps({"count": count, "seed": seed}))
+    return out
+
+
+def parse_size(value):
+    """'10k' / '100k' / '1m' or a plain number → record count."""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    out_dir, count = sys.argv[1], parse_size(sys.argv[2])
+    seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else DEFAULT_SEED
+    workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else None
+    generate(out_dir, count, seed, workers)
+    print(f"Generated {count} records in {out_dir} (seed {seed})")
+
+
+if __name__ == "__main__":
+    main()
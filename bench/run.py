@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark: generate → import → drive the web app under concurrency.
+
+For each size, synthetic JSON is generated (or reused), loaded into a fresh
+SQLite database through import_heritage.import_batch, then the FastAPI app is
+driven in-process with its TestClient from a thread pool. Per-scenario latency
+percentiles, throughput and status counts are written as JSON to bench/results/
+so runs can be compared across commits with `python -m bench.compare`.
+
+Usage: python -m bench.run [--size 10k,100k] [--requests 200] [--concurrency 8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench.generate import DEFAULT_SEED, generate, parse_size
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = ROOT / "bench" / ".work"
+RESULTS_DIR = ROOT / "bench" / "results"
+SCHEMA_FILES = ("geological_heritage_sqlite_schema.sql", "common_code.sql")
+SEARCH_TERMS = ("동굴", "석회암", "주상절리", "공룡발자국", "단양", "화강암", "지질학회지")
+# Map views from the whole peninsula down to a single site (minLon, minLat, maxLon, maxLat, zoom)
+MAP_VIEWS = (
+    (124.5, 33.0, 130.0, 38.7, 7),
+    (127.0, 36.0, 129.5, 37.5, 9),
+    (126.0, 33.1, 127.0, 33.7, 11),
+    (128.3, 35.0, 128.6, 35.2, 14),
+)
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def create_db(db_path):
+    """Fresh database with the base schema and COMMON_CODE (as in README step 2)."""
+    db_path = Path(db_path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    conn = sqlite3.connect(db_path)
+    for name in SCHEMA_FILES:
+        conn.executescript((ROOT / "sql" / name).read_text(encoding="utf-8"))
+    conn.close()
+
+
+def bench_import(db_path, data_dir):
+    """Full import, then a second run that should find every file unchanged."""
+    import import_heritage
+
+    files = sorted(Path(data_dir).glob("*.json"))
+    result = {"files": len(files)}
+    for phase in ("initial", "reimport"):
+        start = time.perf_counter()
+        counts, errors, timings = import_heritage.import_batch(str(db_path), files)
+        result[phase] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "counts": counts,
+            "errors": len(errors),
+            "phases_ms": {k: round(v * 1000, 1) for k, v in timings.items()},
+        }
+    return result
+
+
+def _summary(latencies, statuses, wall):
+    latencies = sorted(latencies)
+    n = len(latencies)
+
+    def pct(p):
+        return round(latencies[min(n - 1, int(p * n))] * 1000, 3) if n else None
+
+    return {
+        "requests": n,
+        "wall_s": round(wall, 3),
+        "rps": round(n / wall, 1) if wall else None,
+        "mean_ms": round(sum(latencies) / n * 1000, 3) if n else None,
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(latencies[-1] * 1000, 3) if n else None,
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def _save_form(row, refs, suffix):
+    """/heritage/save form fields for an existing record, with GCH_NM changed."""
+    form = {k.lower(): "" if v is None else str(v) for k, v in row.items() if k != "SURVEY_NO"}
+    form["survey_no"] = row["SURVEY_NO"]
+    form["gch_nm"] = f"{row['GCH_NM'] or ''} {suffix}".strip()
+    form["ref_group_gbn"] = [r["GROUP_GBN"] or "" for r in refs]
+    form["ref_ordr"] = [r["ORDR"] or "" for r in refs]
+    form["ref_material_nm"] = [r["MATERIAL_NM"] or "" for r in refs]
+    form["ref_pge"] = [r["PGE"] or "" for r in refs]
+    return form
+
+
+def scenarios(db_path, seed):
+    """name → callable(client, rng, i) issuing one request and returning the response."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    ids = [r[0] for r in conn.execute("SELECT SURVEY_NO FROM GEOLOGICAL_CULTURAL_HERITAGE")]
+    ids = random.Random(seed).sample(ids, min(len(ids), 5000))
+    edit_ids = ids[:50]
+    columns = ("SURVEY_NO", "GCH_NM", "SURVEY_NM", "PSITN", "CTTPC", "AREA_NM", "GEOLGC_MAP_NM",
+               "STRK_SDP", "TY1_CD", "TY1_DES", "TY2_CD", "TY2_DES", "TY3_CD", "TY3_DES",
+               "GEOLGC_AGE", "RRSTV_RCK", "ADDRESS", "LAT", "LON", "CCLT_SCL", "RKFR_DES")
+    editable = {}
+    for sn in edit_ids:
+        row = dict(conn.execute(
+            f"SELECT {', '.join(columns)} FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?", [sn]
+        ).fetchone())
+        refs = conn.execute(
+            "SELECT GROUP_GBN, ORDR, MATERIAL_NM, PGE FROM REFERENCE_MATERIAL WHERE SURVEY_NO = ?", [sn]
+        ).fetchall()
+        editable[sn] = (row, refs)
+    conn.close()
+
+    def page(rng):
+        return rng.randint(1, 20)
+
+    def bbox(rng):
+        view = rng.choice(MAP_VIEWS)
+        return f"bbox={view[0]},{view[1]},{view[2]},{view[3]}&zoom={view[4]}"
+
+    def save(c, rng, i):
+        sn = edit_ids[i % len(edit_ids)]
+        row, refs = editable[sn]
+        return c.post("/heritage/save", data=_save_form(row, refs, f"#{i}"), follow_redirects=False)
+
+    return {
+        "index": lambda c, rng, i: c.get(f"/?page={page(rng)}"),
+        "index_search": lambda c, rng, i: c.get(f"/?q={rng.choice(SEARCH_TERMS)}"),
+        "map": lambda c, rng, i: c.get("/map"),
+        "detail": lambda c, rng, i: c.get(f"/heritage/{rng.choice(ids)}"),
+        "api_list": lambda c, rng, i: c.get(f"/api/heritage?page={page(rng)}"),
+        "api_search": lambda c, rng, i: c.get(f"/api/heritage?q={rng.choice(SEARCH_TERMS)}"),
+        "api_detail": lambda c, rng, i: c.get(f"/api/heritage/{rng.choice(ids)}"),
+        "api_geo": lambda c, rng, i: c.get(f"/api/heritage/geo?{bbox(rng)}"),
+        "api_batch": lambda c, rng, i: c.post(
+            "/api/heritage/batch", json={"ids": rng.sample(ids, min(len(ids), 50))}
+        ),
+        "save": save,
+    }
+
+
+def bench_http(db_path, requests, concurrency, seed, only=None):
+    import app.database as database
+
+    database.DB_PATH = str(db_path)
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.metrics import query_tracer
+
+    # Slow queries are counted in the result; logging each one would drown the table
+    logging.getLogger("app.metrics").setLevel(logging.ERROR)
+    results = {}
+    plans = scenarios(db_path, seed)
+    with TestClient(app) as client:
+        for name, issue in plans.items():
+            if only and name not in only:
+                continue
+
+            def one(i, name=name, issue=issue):
+                rng = random.Random(f"{seed}:{name}:{i}")
+                start = time.perf_counter()
+                response = issue(client, rng, i)
+                return time.perf_counter() - start, response.status_code
+
+            one(-1)  # keep connection setup and template compilation out of the numbers
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                outcomes = list(pool.map(one, range(requests)))
+            wall = time.perf_counter() - start
+            statuses = {}
+            for _, status in outcomes:
+                statuses[status] = statuses.get(status, 0) + 1
+            results[name] = _summary([t for t, _ in outcomes], statuses, wall)
+            print(f"  {name:<13} p50 {results[name]['p50_ms']:>8} ms  "
+                  f"p99 {results[name]['p99_ms']:>8} ms  {results[name]['rps']:>8} req/s  "
+                  f"{results[name]['status']}")
+        slow = len(query_tracer.slow_queries())
+    return results, slow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the importer and web app.")
+    parser.add_argument("--size", default="10k", help="comma-separated sizes: 10k, 100k, 1m or N")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--only", default="", help="comma-separated scenario names")
+    parser.add_argument("--work-dir", type=Path, default=WORK_DIR,
+                        help="generated data and databases (reused between runs)")
+    parser.add_argument("--out", type=Path, default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # template and static paths are relative to the repository root
+    sizes = args.size.split(",")
+    if len(sizes) > 1:
+        # One process per size so pools, caches and the cluster index start cold
+        for size in sizes:
+            subprocess.run([sys.executable, "-m", "bench.run", *sys.argv[1:], "--size", size],
+                           check=True)
+        return
+
+    commit, dirty = git_revision()
+    only = {s for s in args.only.split(",") if s}
+    args.out.mkdir(parents=True, exist_ok=True)
+    size = sizes[0]
+    count = parse_size(size)
+
+    print(f"[{size}] generating {count} records")
+    start = time.perf_counter()
+    data_dir = generate(args.work_dir / f"data-{count}-{args.seed}", count, args.seed)
+    generate_s = time.perf_counter() - start
+
+    db_path = args.work_dir / f"bench-{count}.db"
+    create_db(db_path)
+    print(f"[{size}] importing")
+    imported = bench_import(db_path, data_dir)
+    print(f"[{size}] import {imported['initial']['seconds']} s, "
+          f"re-import {imported['reimport']['seconds']} s")
+
+    print(f"[{size}] http: {args.requests} requests x {args.concurrency} threads")
+    http, slow = bench_http(db_path, args.requests, args.concurrency, args.seed, only)
+
+    now = datetime.now(timezone.utc)
+    result = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": now.isoformat(timespec="seconds"),
+            "size": count,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "generate_s": round(generate_s, 3),
+        "import": imported,
+        "http": http,
+        "slow_queries": slow,
+    }
+    path = args.out / f"{size}-{(commit or 'nogit')[:10]}-{now:%Y%m%dT%H%M%S}.json"
+    path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[{size}] wrote {path}")
+
+if __name__ == "__main__":
+    main()
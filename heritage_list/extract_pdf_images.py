@@ -1,20 +1,55 @@
 #!/usr/bin/env python3
+import argparse
 import csv
+import hashlib
+import json
+import os
 import re
 import shutil
 import subprocess
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
 ROOT = Path(__file__).resolve().parent
 OUT_DIR = ROOT / "extracted_images"
 TMP_DIR = ROOT / ".tmp_image_extract"
+# Per-PDF text/image-list cache keyed by PDF SHA-256, plus output state
+CACHE_DIR = ROOT / ".extract_cache"
 MIN_IMAGE_AREA = 50000
+PAGE_CHUNK = 40  # pages per `pdfimages -all` job, so large PDFs split across workers
 
 SURVEY_RE = re.compile(r"조사번호\s*([A-Z]{2}\d{3})")
-IMG_ROW_RE = re.compile(r"^\s*(\d+)\s+(\d+)\s+image\s+(\d+)\s+(\d+)\s+")
+# `pdfimages -list` row: page, num, type, width, height, ...
+LIST_ROW_RE = re.compile(r"^\s*(\d+)\s+(\d+)\s+(\w+)\s+(\d+)\s+(\d+)\s+")
 SPLIT_RE = re.compile(r"\s{2,}")
+SPACE_RE = re.compile(r"\s+")
+# Page headers, table labels and page numbers that are never photo captions
+BAD_TITLE_RE = re.compile(
+    "|".join(
+        [r"^-\s*\d+\s*-$", r"^\d+\s*그룹"]
+        + [
+            re.escape(b)
+            for b in (
+                "지질유산 분포지도 구축",
+                "지질유산 현장 조사표",
+                "조사번호",
+                "지질유산명",
+                "유형 분류",
+                "문 헌 명",
+                "문헌명",
+                "참고자료",
+                "기존자료",
+                "페이지",
+                "소속 및 연락처",
+            )
+        ]
+    )
+)
+TITLE_KEYWORD_RE = re.compile("분포지도|사진|전경|산출|위치|단면도|동굴")
+LETTER_RE = re.compile(r"[가-힣A-Za-z]")
 
 
 def run(cmd):
@@ -43,178 +78,300 @@ def survey_start_pages(pages: list[str]) -> list[tuple[int, str]]:
     return starts
 
 
-def survey_for_page(page_no: int, starts: list[tuple[int, str]]) -> tuple[str | None, int | None]:
-    last_page = None
-    last_code = None
-    for p, code in starts:
-        if p <= page_no:
-            last_page = p
-            last_code = code
-        else:
-            break
-    if last_page is None:
-        return None, None
-    delta = page_no - last_page
-    if delta > 2:
-        return None, None
-    return last_code, delta
+class SurveyPageIndex:
+    """Page → (survey code, pages since its start page), by bisect over start pages."""
+
+    def __init__(self, starts: list[tuple[int, str]]):
+        self.pages = [p for p, _ in starts]
+        self.codes = [code for _, code in starts]
+
+    def lookup(self, page_no: int) -> tuple[str | None, int | None]:
+        i = bisect_right(self.pages, page_no) - 1
+        if i < 0:
+            return None, None
+        delta = page_no - self.pages[i]
+        if delta > 2:
+            return None, None
+        return self.codes[i], delta
 
 
 def clean_title(line: str) -> str:
-    line = line.strip()
-    line = re.sub(r"\s+", " ", line)
-    return line
+    return SPACE_RE.sub(" ", line.strip())
 
 
 def is_bad_title(line: str) -> bool:
-    bad = [
-        "지질유산 분포지도 구축",
-        "지질유산 현장 조사표",
-        "조사번호",
-        "지질유산명",
-        "유형 분류",
-        "문 헌 명",
-        "문헌명",
-        "참고자료",
-        "기존자료",
-        "페이지",
-        "소속 및 연락처",
-    ]
-    if not line:
-        return True
-    if re.match(r"^-\s*\d+\s*-$", line):
-        return True
-    if re.match(r"^\d+\s*그룹", line):
-        return True
-    for b in bad:
-        if b in line:
-            return True
-    return False
+    return not line or BAD_TITLE_RE.search(line) is not None
 
 
 def extract_titles(page_text: str) -> list[str]:
-    lines = [clean_title(x) for x in page_text.splitlines() if x.strip()]
     out = []
-    for ln in lines:
+    for raw in page_text.splitlines():
+        ln = clean_title(raw)
         if is_bad_title(ln):
             continue
-        parts = SPLIT_RE.split(ln)
-        parts = [clean_title(p) for p in parts if p.strip()]
-        if not parts:
-            continue
-        for p in parts:
+        for p in SPLIT_RE.split(ln):
+            p = p.strip()
             if is_bad_title(p):
                 continue
             if len(p) < 4 or len(p) > 80:
                 continue
-            if not re.search(r"[가-힣A-Za-z]", p):
+            if not LETTER_RE.search(p):
                 continue
-            if (
-                "분포지도" in p
-                or "사진" in p
-                or "전경" in p
-                or "산출" in p
-                or "위치" in p
-                or "단면도" in p
-                or "동굴" in p
-            ):
+            if TITLE_KEYWORD_RE.search(p):
                 out.append(p)
-    dedup = []
-    seen = set()
-    for x in out:
-        if x not in seen:
-            dedup.append(x)
-            seen.add(x)
-    return dedup
+    return list(dict.fromkeys(out))
 
 
-def main():
-    pdf_files = sorted(ROOT.glob("*.pdf"))
-    if not pdf_files:
-        raise SystemExit("No PDF files found.")
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-    if OUT_DIR.exists():
-        shutil.rmtree(OUT_DIR)
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    if TMP_DIR.exists():
-        shutil.rmtree(TMP_DIR)
-    TMP_DIR.mkdir(parents=True, exist_ok=True)
+def read_json(path: Path, default):
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return default
 
-    manifest_rows = []
-    seq_by_code = defaultdict(int)
 
-    for pdf in pdf_files:
-        base = pdf.stem
-        txt_path = TMP_DIR / f"{base}.txt"
+def write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def pdf_digest(pdf: Path, index: dict) -> str:
+    """SHA-256 of a PDF, reusing the recorded hash while size and mtime match."""
+    st = pdf.stat()
+    entry = index.get(pdf.name)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+    digest = file_sha256(pdf)
+    index[pdf.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def load_pdf(pdf: Path, digest: str) -> dict:
+    """Worker: page texts and `pdfimages -list` rows of one PDF (cached by hash)."""
+    cache = CACHE_DIR / f"{digest}.json"
+    data = read_json(cache, None)
+    if data is not None:
+        return data
+
+    job_dir = TMP_DIR / f"text_{digest[:16]}"
+    job_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        txt_path = job_dir / "text.txt"
         run(["pdftotext", "-layout", str(pdf), str(txt_path)])
         pages = txt_path.read_text(errors="ignore").split("\f")
-        starts = survey_start_pages(pages)
-        if not starts:
-            continue
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
 
-        list_out = run(["pdfimages", "-list", str(pdf)]).stdout.splitlines()
-        extract_dir = TMP_DIR / f"imgs_{base}"
-        extract_dir.mkdir(parents=True, exist_ok=True)
-        run(["pdfimages", "-all", str(pdf), str(extract_dir / base)])
+    images = []
+    for row in run(["pdfimages", "-list", str(pdf)]).stdout.splitlines():
+        m = LIST_ROW_RE.match(row)
+        if m:
+            images.append(
+                [int(m.group(1)), int(m.group(2)), m.group(3), int(m.group(4)), int(m.group(5))]
+            )
 
-        page_titles = {}
-        for pno in range(1, len(pages) + 1):
-            code, delta = survey_for_page(pno, starts)
-            if not code or delta is None or delta == 0:
-                continue
-            page_titles[pno] = extract_titles(pages[pno - 1])
+    data = {"pages": pages, "images": images}
+    write_json(cache, data)
+    return data
+
+
+def select_images(data: dict) -> list[dict]:
+    """Survey photos of one PDF, in `pdfimages -list` order."""
+    pages = data["pages"]
+    starts = survey_start_pages(pages)
+    if not starts:
+        return []
+    index = SurveyPageIndex(starts)
+
+    # Photo pages are the one or two pages after each survey's start page
+    page_titles = {}
+    for pno, _ in starts:
+        for p in (pno + 1, pno + 2):
+            if p <= len(pages) and index.lookup(p)[1] in (1, 2):
+                page_titles[p] = extract_titles(pages[p - 1])
+
+    selected = []
+    page_img_idx = defaultdict(int)
+    for page_no, img_num, kind, width, height in data["images"]:
+        if kind != "image":
+            continue
+        area = width * height
+        if area < MIN_IMAGE_AREA:
+            continue
+        if width <= 260 and height <= 70:
+            continue
 
-        page_img_idx = defaultdict(int)
-        for row in list_out:
-            m = IMG_ROW_RE.match(row)
-            if not m:
-                continue
-            page_no = int(m.group(1))
-            img_num = int(m.group(2))
-            width = int(m.group(3))
-            height = int(m.group(4))
-            area = width * height
-            if area < MIN_IMAGE_AREA:
-                continue
-            if width <= 260 and height <= 70:
-                continue
+        code, delta = index.lookup(page_no)
+        if not code:
+            continue
+        if delta not in (1, 2):
+            continue
 
-            code, delta = survey_for_page(page_no, starts)
-            if not code:
-                continue
-            if delta not in (1, 2):
-                continue
+        page_img_idx[page_no] += 1
+        idx_in_page = page_img_idx[page_no] - 1
+        titles = page_titles.get(page_no, [])
+        title = titles[idx_in_page] if idx_in_page < len(titles) else ""
+
+        selected.append(
+            {
+                "survey_no": code,
+                "page": page_no,
+                "image_num": img_num,
+                "title": title,
+                "width": width,
+                "height": height,
+            }
+        )
+    return selected
 
-            src = find_source_image(extract_dir, base, img_num)
+
+def page_ranges(pages: list[int], chunk: int = PAGE_CHUNK) -> list[tuple[int, int]]:
+    """Group sorted page numbers into (first, last) ranges spanning at most `chunk` pages."""
+    ranges = []
+    for p in sorted(set(pages)):
+        if ranges and p - ranges[-1][0] < chunk:
+            ranges[-1][1] = p
+        else:
+            ranges.append([p, p])
+    return [tuple(r) for r in ranges]
+
+
+def extract_range(pdf: Path, digest: str, first: int, last: int, offset: int,
+                  targets: list[tuple[int, str]]) -> list[tuple[str, str]]:
+    """Worker: `pdfimages -all` for pages first..last and copy the wanted images.
+
+    targets are (image_num, output stem relative to ROOT). Image numbers
+    restart at 0 on the first extracted page, so `offset` (the global number
+    of the first image on that page) is subtracted. Returns (stem,
+    output_file) for each image written.
+    """
+    job_dir = TMP_DIR / f"imgs_{digest[:16]}_{first}_{last}"
+    job_dir.mkdir(parents=True, exist_ok=True)
+    done = []
+    try:
+        run(["pdfimages", "-all", "-f", str(first), "-l", str(last), str(pdf), str(job_dir / "img")])
+        for img_num, stem in targets:
+            src = find_source_image(job_dir, "img", img_num - offset)
             if src is None:
                 continue
+            ext = src.suffix.lower() or ".jpg"
+            out_path = ROOT / f"{stem}{ext}"
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = out_path.with_name(f".{out_path.name}.tmp")
+            shutil.copy2(src, tmp)
+            os.replace(tmp, out_path)
+            done.append((stem, str(out_path.relative_to(ROOT))))
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+    return done
 
-            page_img_idx[page_no] += 1
-            idx_in_page = page_img_idx[page_no] - 1
-            titles = page_titles.get(page_no, [])
-            title = titles[idx_in_page] if idx_in_page < len(titles) else ""
 
-            seq_by_code[code] += 1
-            ext = src.suffix.lower() or ".jpg"
-            out_name = f"{code}_{seq_by_code[code]:03d}{ext}"
-            code_dir = OUT_DIR / code
-            code_dir.mkdir(parents=True, exist_ok=True)
-            out_path = code_dir / out_name
-            shutil.copy2(src, out_path)
-
-            manifest_rows.append(
-                {
-                    "survey_no": code,
-                    "pdf_file": pdf.name,
-                    "page": page_no,
-                    "image_num": img_num,
-                    "output_file": str(out_path.relative_to(ROOT)),
-                    "title": title,
-                    "width": width,
-                    "height": height,
-                }
-            )
+def main():
+    parser = argparse.ArgumentParser(description="Extract survey photos from heritage PDFs.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clean", action="store_true",
+                        help="drop cached text/image lists and re-extract every image")
+    args = parser.parse_args()
+
+    pdf_files = sorted(ROOT.glob("*.pdf"))
+    if not pdf_files:
+        raise SystemExit("No PDF files found.")
+
+    if args.clean:
+        for d in (OUT_DIR, TMP_DIR, CACHE_DIR):
+            if d.exists():
+                shutil.rmtree(d)
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    index_path = CACHE_DIR / "pdfs.json"
+    state_path = CACHE_DIR / "outputs.json"
+    index = read_json(index_path, {})
+    # output_file → [pdf sha256, page, image_num] of the image it was copied from
+    state = read_json(state_path, {})
+    digests = [pdf_digest(pdf, index) for pdf in pdf_files]
+    write_json(index_path, index)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        loaded = list(pool.map(load_pdf, pdf_files, digests))
+
+        # Output names are numbered per survey across PDFs in name order,
+        # so they are assigned serially before anything is extracted.
+        selected = []
+        seq_by_code = defaultdict(int)
+        for pdf, digest, data in zip(pdf_files, digests, loaded):
+            for img in select_images(data):
+                code = img["survey_no"]
+                seq_by_code[code] += 1
+                stem = (OUT_DIR / code / f"{code}_{seq_by_code[code]:03d}").relative_to(ROOT)
+                source = [digest, img["page"], img["image_num"]]
+                selected.append((pdf, digest, data, img, stem.as_posix(), source))
+
+        # Only images whose output is missing or came from another source
+        # are extracted, grouped into page ranges per PDF.
+        outputs = {}
+        jobs = defaultdict(list)
+        for pdf, digest, data, img, stem, source in selected:
+            entry = state.get(stem)
+            if entry and entry["source"] == source and (ROOT / entry["file"]).exists():
+                outputs[stem] = entry["file"]
+            else:
+                jobs[(pdf, digest)].append((img, stem))
+
+        futures = []
+        for (pdf, digest), items in jobs.items():
+            data = loaded[pdf_files.index(pdf)]
+            for first, last in page_ranges([img["page"] for img, _ in items]):
+                offset = min(r[1] for r in data["images"] if r[0] >= first)
+                targets = [
+                    (img["image_num"], stem)
+                    for img, stem in items
+                    if first <= img["page"] <= last
+                ]
+                futures.append(
+                    pool.submit(extract_range, pdf, digest, first, last, offset, targets)
+                )
+        extracted = 0
+        for future in futures:
+            for stem, output_file in future.result():
+                outputs[stem] = output_file
+                extracted += 1
+
+    manifest_rows = []
+    new_state = {}
+    for pdf, digest, data, img, stem, source in selected:
+        if stem not in outputs:
+            continue
+        new_state[stem] = {"source": source, "file": outputs[stem]}
+        manifest_rows.append(
+            {
+                "survey_no": img["survey_no"],
+                "pdf_file": pdf.name,
+                "page": img["page"],
+                "image_num": img["image_num"],
+                "output_file": outputs[stem],
+                "title": img["title"],
+                "width": img["width"],
+                "height": img["height"],
+            }
+        )
+
+    # Outputs from a previous run that are no longer produced
+    removed = 0
+    for stem, entry in state.items():
+        if new_state.get(stem, {}).get("file") != entry["file"]:
+            (ROOT / entry["file"]).unlink(missing_ok=True)
+            removed += 1
+    write_json(state_path, new_state)
 
     manifest_rows.sort(key=lambda r: (r["survey_no"], int(r["page"]), int(r["image_num"])))
     manifest = OUT_DIR / "manifest.csv"
@@ -251,7 +408,7 @@ def main():
         for code in sorted(by_code):
             f.write(f"{code}\t{by_code[code]}\n")
 
-    print(f"Extracted images: {len(manifest_rows)}")
+    print(f"Extracted images: {len(manifest_rows)} ({extracted} new/changed, {removed} removed)")
     print(f"Survey count: {len(by_code)}")
     print(f"Manifest: {manifest}")
 
@@ -1,96 +1,51 @@
 #!/usr/bin/env python3
 """JSON → SQLite import script for geological cultural heritage data."""
 
+import csv
+import hashlib
 import json
 import re
 import sqlite3
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from app.codes import code_cache
+from app.coords import parse_coordinates, parse_dms_column
+from app.database import init_db
+from app.writes import REFERENCE_INSERT_SQL, sync_references
+
 
 def parse_dms(dms_str):
-    """Convert DMS string like '34°44′19.18″N' to decimal degrees."""
+    """Convert DMS string like '34°44′19.18″N' to decimal degrees.
+
+    Accepts the same variants as app.coords (ASCII quotes, spaces, decimal
+    minutes). No bounds check; use parse_coordinates() for lat/lon pairs.
+    """
     if not dms_str:
         return None
-    m = re.match(
-        r"(\d+)[°]\s*(\d+)[′']\s*([\d.]+)[″\"]\s*([NSEWnsew])", dms_str
-    )
-    if not m:
+    values, _, errors, _ = parse_dms_column([dms_str])
+    if errors[0]:
         raise ValueError(f"Cannot parse DMS: {dms_str}")
-    deg, minutes, sec, direction = (
-        int(m.group(1)),
-        int(m.group(2)),
-        float(m.group(3)),
-        m.group(4).upper(),
-    )
-    dd = deg + minutes / 60 + sec / 3600
-    if direction in ("S", "W"):
-        dd = -dd
-    return round(dd, 6)
+    return values[0]
 
 
 def validate_type_codes(cursor, types):
     """Validate that all type codes exist in COMMON_CODE. Returns list of missing codes."""
-    missing = []
-    for t in types:
-        cursor.execute("SELECT 1 FROM COMMON_CODE WHERE CODE = ?", (t["code"],))
-        if not cursor.fetchone():
-            missing.append(t["code"])
-    return missing
-
-
-def insert_heritage(cursor, data):
-    """Insert a record into GEOLOGICAL_CULTURAL_HERITAGE."""
-    types = data.get("types", [])
-    ty1_cd = types[0]["code"] if len(types) > 0 else None
-    ty1_des = types[0]["des"] if len(types) > 0 else None
-    ty2_cd = types[1]["code"] if len(types) > 1 else None
-    ty2_des = types[1]["des"] if len(types) > 1 else None
-    ty3_cd = types[2]["code"] if len(types) > 2 else None
-    ty3_des = types[2]["des"] if len(types) > 2 else None
+    codes = code_cache.get(cursor.connection).by_code
+    return [t["code"] for t in types if t["code"] not in codes]
 
-    lat = parse_dms(data.get("lat_dms"))
-    lon = parse_dms(data.get("lon_dms"))
 
-    cursor.execute(
-        """INSERT INTO GEOLOGICAL_CULTURAL_HERITAGE
+HERITAGE_INSERT_SQL = """INSERT INTO GEOLOGICAL_CULTURAL_HERITAGE
            (SURVEY_NO, SURVEY_YEAR, GCH_NM, SURVEY_NM, PSITN, CTTPC, AREA_NM,
             GEOLGC_MAP_NM, STRK_SDP,
             TY1_CD, TY1_DES, TY2_CD, TY2_DES, TY3_CD, TY3_DES,
             GEOLGC_AGE, RRSTV_RCK, ADDRESS, LAT, LON,
             CCLT_SCL, RKFR_DES, CREATE_DT)
-           VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,datetime('now'))""",
-        (
-            data["survey_no"],
-            data.get("survey_year"),
-            data.get("gch_nm"),
-            data.get("survey_nm"),
-            data.get("psitn"),
-            data.get("cttpc"),
-            data.get("area_nm"),
-            data.get("geolgc_map_nm"),
-            data.get("strk_sdp"),
-            ty1_cd,
-            ty1_des,
-            ty2_cd,
-            ty2_des,
-            ty3_cd,
-            ty3_des,
-            data.get("geolgc_age"),
-            data.get("rrstv_rck"),
-            data.get("address"),
-            lat,
-            lon,
-            data.get("cclt_scl"),
-            data.get("rkfr_des"),
-        ),
-    )
+           VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,datetime('now'))"""
 
-
-def insert_cave(cursor, survey_no, cave):
-    """Insert a record into GEOLOGICAL_CULTURAL_CAVE."""
-    cursor.execute(
-        """INSERT INTO GEOLOGICAL_CULTURAL_CAVE
+CAVE_INSERT_SQL = """INSERT INTO GEOLOGICAL_CULTURAL_CAVE
            (SURVEY_NO, ENT_SIZE, LENGTH, TYPE, ENT_DIR, DIRECTION,
             UNGRD_WATER, ENT_WATER, ACCESS,
             UNKN_TOPO_DES, UNKN_TOPO_RANK,
@@ -98,54 +53,125 @@ def insert_cave(cursor, survey_no, cave):
             BIO_DES, BIO_RANK,
             PRS_PROTECT, PROTECT, PRSV_RANK,
             EVAL_DES, EVAL_RANK)
-           VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+           VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+
+def heritage_values(data, coords=None):
+    """Build the GEOLOGICAL_CULTURAL_HERITAGE parameter tuple for one JSON record.
+
+    coords is an already validated (lat, lon); without it the DMS strings are
+    parsed here.
+    """
+    types = data.get("types") or []
+    ty1_cd = types[0]["code"] if len(types) > 0 else None
+    ty1_des = types[0]["des"] if len(types) > 0 else None
+    ty2_cd = types[1]["code"] if len(types) > 1 else None
+    ty2_des = types[1]["des"] if len(types) > 1 else None
+    ty3_cd = types[2]["code"] if len(types) > 2 else None
+    ty3_des = types[2]["des"] if len(types) > 2 else None
+
+    if coords is None:
+        lat, lon = parse_dms(data.get("lat_dms")), parse_dms(data.get("lon_dms"))
+    else:
+        lat, lon = coords
+
+    return (
+        data["survey_no"],
+        data.get("survey_year"),
+        data.get("gch_nm"),
+        data.get("survey_nm"),
+        data.get("psitn"),
+        data.get("cttpc"),
+        data.get("area_nm"),
+        data.get("geolgc_map_nm"),
+        data.get("strk_sdp"),
+        ty1_cd,
+        ty1_des,
+        ty2_cd,
+        ty2_des,
+        ty3_cd,
+        ty3_des,
+        data.get("geolgc_age"),
+        data.get("rrstv_rck"),
+        data.get("address"),
+        lat,
+        lon,
+        data.get("cclt_scl"),
+        data.get("rkfr_des"),
+    )
+
+
+def cave_values(survey_no, cave):
+    """Build the GEOLOGICAL_CULTURAL_CAVE parameter tuple."""
+    return (
+        survey_no,
+        cave.get("ent_size"),
+        cave.get("length"),
+        cave.get("type"),
+        cave.get("ent_dir"),
+        cave.get("direction"),
+        cave.get("ungrd_water"),
+        cave.get("ent_water"),
+        cave.get("access"),
+        cave.get("unkn_topo_des"),
+        cave.get("unkn_topo_rank"),
+        cave.get("prodt_des"),
+        cave.get("prodt_rank"),
+        cave.get("bio_des"),
+        cave.get("bio_rank"),
+        cave.get("prs_protect"),
+        cave.get("protect"),
+        cave.get("prsv_rank"),
+        cave.get("eval_des"),
+        cave.get("eval_rank"),
+    )
+
+
+def reference_values(survey_no, refs):
+    """Build REFERENCE_MATERIAL parameter tuples."""
+    return [
         (
             survey_no,
-            cave.get("ent_size"),
-            cave.get("length"),
-            cave.get("type"),
-            cave.get("ent_dir"),
-            cave.get("direction"),
-            cave.get("ungrd_water"),
-            cave.get("ent_water"),
-            cave.get("access"),
-            cave.get("unkn_topo_des"),
-            cave.get("unkn_topo_rank"),
-            cave.get("prodt_des"),
-            cave.get("prodt_rank"),
-            cave.get("bio_des"),
-            cave.get("bio_rank"),
-            cave.get("prs_protect"),
-            cave.get("protect"),
-            cave.get("prsv_rank"),
-            cave.get("eval_des"),
-            cave.get("eval_rank"),
-        ),
-    )
+            ref.get("group_gbn"),
+            ref.get("ordr"),
+            ref.get("material_nm"),
+            ref.get("pge"),
+        )
+        for ref in refs
+    ]
+
+
+def insert_heritage(cursor, data, coords=None):
+    """Insert a record into GEOLOGICAL_CULTURAL_HERITAGE."""
+    cursor.execute(HERITAGE_INSERT_SQL, heritage_values(data, coords))
+
+
+def insert_cave(cursor, survey_no, cave):
+    """Insert a record into GEOLOGICAL_CULTURAL_CAVE."""
+    cursor.execute(CAVE_INSERT_SQL, cave_values(survey_no, cave))
 
 
 def insert_references(cursor, survey_no, refs):
     """Insert records into REFERENCE_MATERIAL."""
-    for ref in refs:
-        cursor.execute(
-            """INSERT INTO REFERENCE_MATERIAL
-               (SURVEY_NO, GROUP_GBN, ORDR, MATERIAL_NM, PGE, CREATE_DT)
-               VALUES (?,?,?,?,?,datetime('now'))""",
-            (
-                survey_no,
-                ref.get("group_gbn"),
-                ref.get("ordr"),
-                ref.get("material_nm"),
-                ref.get("pge"),
-            ),
-        )
+    cursor.executemany(REFERENCE_INSERT_SQL, reference_values(survey_no, refs))
 
 
 def import_json(db_path, json_path, update=False):
-    """Import a single JSON file into the database."""
+    """Import a single JSON file into the database.
+
+    With update=True an existing record is diffed in place (_update_record),
+    like directory and stream imports, instead of deleted and re-inserted.
+    Returns "imported", "updated" or "unchanged", or None if the record was
+    skipped or failed.
+    """
     with open(json_path, encoding="utf-8") as f:
         data = json.load(f)
 
+    problems = validate_record(data)
+    if problems:
+        print(f"  ERROR {Path(json_path).name}: {'; '.join(problems)}")
+        return None
+
     survey_no = data["survey_no"]
     conn = sqlite3.connect(db_path)
     conn.execute("PRAGMA foreign_keys = ON")
@@ -162,26 +188,35 @@ def import_json(db_path, json_path, update=False):
         if exists and not update:
             print(f"  SKIP {survey_no}: already exists (use --update to overwrite)")
             conn.close()
-            return False
-
-        if exists and update:
-            # Delete existing record (cascades to cave and references)
-            cursor.execute(
-                "DELETE FROM GEOLOGICAL_CULTURAL_HERITAGE WHERE SURVEY_NO = ?",
-                (survey_no,),
-            )
-            print(f"  UPDATE {survey_no}: deleting existing record for re-insert")
+            return None
 
         # Validate type codes
-        types = data.get("types", [])
+        types = data.get("types") or []
         missing = validate_type_codes(cursor, types)
         if missing:
             print(f"  ERROR {survey_no}: unknown type codes: {missing}")
             conn.close()
-            return False
+            return None
+
+        # Validate coordinates (format, Korean peninsula bounds, swapped lat/lon);
+        # a bad coordinate is reported and stored as NULL, not a reason to skip
+        coord = parse_coordinates([(data.get("lat_dms"), data.get("lon_dms"))])[0]
+        for issue in coord.errors + coord.warnings:
+            print(f"  COORD {survey_no}: {issue}")
+
+        if exists:
+            # Same field-level diff as directory imports: unchanged rows and
+            # references (and their MATERIAL_SN) are left alone
+            changes = _update_record(conn, _record(data, coord))
+            conn.commit()
+            if changes:
+                print(f"  UPDATE {survey_no}: {', '.join(changes)}")
+            else:
+                print(f"  UNCHANGED {survey_no}")
+            return "updated" if changes else "unchanged"
 
         # Insert heritage record
-        insert_heritage(cursor, data)
+        insert_heritage(cursor, data, (coord.lat, coord.lon))
 
         # Insert cave data if present
         cave = data.get("cave")
@@ -189,30 +224,839 @@ def import_json(db_path, json_path, update=False):
             insert_cave(cursor, survey_no, cave)
 
         # Insert references
-        refs = data.get("references", [])
+        refs = data.get("references") or []
         if refs:
             insert_references(cursor, survey_no, refs)
 
         conn.commit()
         cave_mark = " +cave" if cave else ""
         print(f"  OK {survey_no}: {data.get('gch_nm')}{cave_mark}, {len(refs)} refs")
-        return True
+        return "imported"
 
     except Exception as e:
         conn.rollback()
         print(f"  ERROR {survey_no}: {e}")
-        return False
+        return None
     finally:
         conn.close()
 
 
+BATCH_CHUNK_SIZE = 500
+BATCH_WORKERS = 8
+
+# Column order of heritage_values() / cave_values(), used for field-level diffs
+HERITAGE_COLUMNS = (
+    "SURVEY_NO", "SURVEY_YEAR", "GCH_NM", "SURVEY_NM", "PSITN", "CTTPC", "AREA_NM",
+    "GEOLGC_MAP_NM", "STRK_SDP",
+    "TY1_CD", "TY1_DES", "TY2_CD", "TY2_DES", "TY3_CD", "TY3_DES",
+    "GEOLGC_AGE", "RRSTV_RCK", "ADDRESS", "LAT", "LON",
+    "CCLT_SCL", "RKFR_DES",
+)
+CAVE_COLUMNS = (
+    "SURVEY_NO", "ENT_SIZE", "LENGTH", "TYPE", "ENT_DIR", "DIRECTION",
+    "UNGRD_WATER", "ENT_WATER", "ACCESS",
+    "UNKN_TOPO_DES", "UNKN_TOPO_RANK",
+    "PRODT_DES", "PRODT_RANK",
+    "BIO_DES", "BIO_RANK",
+    "PRS_PROTECT", "PROTECT", "PRSV_RANK",
+    "EVAL_DES", "EVAL_RANK",
+)
+
+STATE_UPSERT_SQL = """INSERT INTO IMPORT_STATE
+               (SOURCE_PATH, MTIME_NS, FILE_SIZE, SHA256, SURVEY_NO, IMPORT_DT)
+               VALUES (?,?,?,?,?,datetime('now'))
+               ON CONFLICT(SOURCE_PATH) DO UPDATE SET
+               MTIME_NS=excluded.MTIME_NS, FILE_SIZE=excluded.FILE_SIZE,
+               SHA256=excluded.SHA256, SURVEY_NO=excluded.SURVEY_NO,
+               IMPORT_DT=excluded.IMPORT_DT"""
+
+# Shape of one survey record, in a small JSON Schema subset understood by
+# compile_schema(): type, required, properties, additionalProperties, items,
+# maxItems, minLength. Unknown top-level keys are ignored; unknown keys in
+# types, cave and references are errors since they would be dropped silently.
+NULLABLE_TEXT = {"type": ["string", "null"]}
+RECORD_SCHEMA = {
+    "type": "object",
+    "required": ["survey_no"],
+    "properties": {
+        "survey_no": {"type": "string", "minLength": 1},
+        "survey_year": {"type": ["integer", "null"]},
+        **{
+            name: NULLABLE_TEXT
+            for name in (
+                "gch_nm", "survey_nm", "psitn", "cttpc", "area_nm", "geolgc_map_nm",
+                "strk_sdp", "geolgc_age", "rrstv_rck", "address", "lat_dms", "lon_dms",
+                "cclt_scl", "rkfr_des",
+            )
+        },
+        "types": {
+            "type": ["array", "null"],
+            "maxItems": 3,
+            "items": {
+                "type": "object",
+                "required": ["code"],
+                "properties": {"code": {"type": "string", "minLength": 1}, "des": NULLABLE_TEXT},
+                "additionalProperties": False,
+            },
+        },
+        "cave": {
+            "type": ["object", "null"],
+            "properties": {col.lower(): NULLABLE_TEXT for col in CAVE_COLUMNS[1:]},
+            "additionalProperties": False,
+        },
+        "references": {
+            "type": ["array", "null"],
+            "items": {
+                "type": "object",
+                "properties": {
+                    "group_gbn": NULLABLE_TEXT,
+                    "ordr": {"type": ["string", "integer", "null"]},
+                    "material_nm": NULLABLE_TEXT,
+                    "pge": NULLABLE_TEXT,
+                },
+                "additionalProperties": False,
+            },
+        },
+    },
+}
+
+_JSON_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def _compile_node(schema):
+    """Schema node → (allowed types, type description, check or None).
+
+    check(value, path, errors) does everything beyond the type test and is
+    None for plain leaves, so those cost one set lookup in their parent.
+    """
+    kinds = schema.get("type")
+    kinds = [kinds] if isinstance(kinds, str) else kinds
+    allowed = frozenset(t for k in kinds for t in _JSON_TYPES[k]) if kinds else None
+    expected = " or ".join(kinds) if kinds else ""
+    min_length = schema.get("minLength")
+    max_items = schema.get("maxItems")
+    required = tuple(schema.get("required", ()))
+    properties = {k: _compile_node(v) for k, v in schema.get("properties", {}).items()}
+    closed = schema.get("additionalProperties", True) is False
+    items = _compile_node(schema["items"]) if "items" in schema else None
+
+    def check(value, path, errors):
+        kind = type(value)
+        if kind is dict:
+            prefix = f"{path}." if path else ""
+            for key in required:
+                if key not in value:
+                    errors.append(f"{prefix}{key}: required")
+            for key, item in value.items():
+                node = properties.get(key)
+                if node is None:
+                    if closed:
+                        errors.append(f"{prefix}{key}: unknown key")
+                elif node[0] is not None and type(item) not in node[0]:
+                    errors.append(f"{prefix}{key}: expected {node[1]}, got {type(item).__name__}")
+                elif node[2] is not None:
+                    node[2](item, prefix + key, errors)
+        elif kind is list:
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: {len(value)} items, at most {max_items} allowed")
+            if items is not None:
+                item_allowed, item_expected, item_check = items
+                for i, item in enumerate(value):
+                    if item_allowed is not None and type(item) not in item_allowed:
+                        errors.append(
+                            f"{path}[{i}]: expected {item_expected}, got {type(item).__name__}"
+                        )
+                    elif item_check is not None:
+                        item_check(item, f"{path}[{i}]", errors)
+        elif kind is str and min_length and len(value) < min_length:
+            errors.append(f"{path}: empty")
+
+    deep = required or properties or closed or items or max_items is not None or min_length
+    return allowed, expected, check if deep else None
+
+
+def compile_schema(schema):
+    """Compile a RECORD_SCHEMA-style schema into validate(value) → [errors].
+
+    Every schema node is turned into a closure once, so validating a record
+    is exact type lookups (bool is not accepted as integer) and dict walks,
+    with no schema interpretation per record.
+    """
+    allowed, expected, check = _compile_node(schema)
+
+    def validate(value):
+        errors = []
+        kind = type(value)
+        if allowed is not None and kind not in allowed:
+            errors.append(f"record: expected {expected}, got {kind.__name__}")
+        elif check is not None:
+            check(value, "", errors)
+        return errors
+
+    return validate
+
+
+validate_record = compile_schema(RECORD_SCHEMA)
+
+STREAM_READ_SIZE = 1 << 20
+STREAM_MAX_RECORD = 16 << 20
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_stream(path, read_size=STREAM_READ_SIZE):
+    """Yield (where, record, error) from a JSON Lines file or a top-level JSON array.
+
+    A file whose first character is '[' is read as one array, anything else
+    as JSON Lines (one record per line, blank lines ignored). The file is read
+    read_size characters at a time and each record is decoded with
+    JSONDecoder.raw_decode, so memory depends on the largest record, not on
+    the file size. where is "line N" or "record N" for messages. A bad line
+    is reported and skipped; inside an array the stream cannot be resynced,
+    so a decode error (or a record over STREAM_MAX_RECORD) ends it.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8-sig") as f:
+        head = f.read(read_size)
+        start = _WS.match(head).end()
+        if not head.startswith("[", start):
+            for line_no, line in enumerate(_chain_lines(head, f), 1):
+                pos = _WS.match(line).end()
+                if pos == len(line):
+                    continue
+                try:
+                    record, end = decoder.raw_decode(line, pos)
+                    if _WS.match(line, end).end() != len(line):
+                        raise ValueError("extra data after the record")
+                except ValueError as e:
+                    yield f"line {line_no}", None, str(e)
+                    continue
+                yield f"line {line_no}", record, None
+            return
+
+        buf, pos, eof, n = head, start + 1, False, 0
+
+        def more():
+            nonlocal buf, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                pos = _WS.match(buf, pos).end()
+                if pos < len(buf) or not more():
+                    return
+
+        skip_ws()
+        if buf.startswith("]", pos):
+            return
+        while True:
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except ValueError as e:
+                # Usually the record just continues past this read
+                if len(buf) - pos <= STREAM_MAX_RECORD and more():
+                    continue
+                yield f"record {n + 1}", None, f"{e}; stopping"
+                return
+            n += 1
+            pos = end
+            yield f"record {n}", record, None
+            skip_ws()
+            if buf.startswith(",", pos):
+                pos += 1
+                skip_ws()
+            elif buf.startswith("]", pos):
+                return
+            else:
+                yield f"record {n + 1}", None, "expected ',' or ']' between records; stopping"
+                return
+
+
+def _chain_lines(head, f):
+    """Lines of a file whose first characters were already read into head.
+
+    Split on "\\n" only: JSON strings may contain U+2028 and friends, which
+    str.splitlines() would treat as line breaks.
+    """
+    lines = (head + f.readline()).split("\n")
+    if not lines[-1]:
+        lines.pop()  # text ends with a newline, or the file is empty
+    yield from lines
+    yield from f
+
+
+def _read_json(path, state=None):
+    """Worker: fingerprint and parse one JSON file.
+
+    Returns (path, status, fingerprint, data, error). status is "unchanged"
+    when mtime and size match the recorded state (the file is not read),
+    "touched" when only the mtime moved but the SHA-256 is the same,
+    "changed" for new or modified files and "error" otherwise.
+    fingerprint is (mtime_ns, size, sha256). Parsed records that do not
+    match RECORD_SCHEMA are returned as errors.
+    """
+    try:
+        st = Path(path).stat()
+        if state and state[0] == st.st_mtime_ns and state[1] == st.st_size:
+            return path, "unchanged", None, None, None
+        raw = Path(path).read_bytes()
+        fingerprint = (st.st_mtime_ns, st.st_size, hashlib.sha256(raw).hexdigest())
+        if state and state[2] == fingerprint[2]:
+            return path, "touched", fingerprint, None, None
+        data = json.loads(raw.decode("utf-8"))
+        problems = validate_record(data)
+        if problems:
+            raise ValueError("; ".join(problems))
+        return path, "changed", fingerprint, data, None
+    except (OSError, ValueError) as e:
+        return path, "error", None, None, str(e)
+
+
+def _write_records(conn, records):
+    """Insert a list of prepared new records with executemany.
+
+    References and caves are inserted before their heritage rows (foreign
+    keys are deferred for the batch transaction), so the heritage insert
+    trigger indexes the reference titles once instead of once per reference.
+    """
+    conn.executemany(REFERENCE_INSERT_SQL, [ref for r in records for ref in r[3]])
+    conn.executemany(CAVE_INSERT_SQL, [r[2] for r in records if r[2]])
+    conn.executemany(HERITAGE_INSERT_SQL, [r[1] for r in records])
+
+
+def _record(data, coord, path=None, fingerprint=None):
+    """Prepared record tuple for _write_records()/_update_record().
+
+    (survey_no, heritage values, cave values or None, reference values,
+    source path, fingerprint)
+    """
+    survey_no = data["survey_no"]
+    cave = data.get("cave")
+    return (
+        survey_no,
+        heritage_values(data, (coord.lat, coord.lon)),
+        cave_values(survey_no, cave) if cave else None,
+        reference_values(survey_no, data.get("references") or []),
+        path,
+        fingerprint,
+    )
+
+
+def _report_coord(survey_no, coord, counts):
+    for issue in coord.errors + coord.warnings:
+        print(f"  COORD {survey_no}: {issue}")
+    if coord.errors:
+        counts["bad_coords"] += 1
+
+
+def _insert_chunk(conn, chunk, errors):
+    """Insert one chunk of new records in its own SAVEPOINT.
+
+    If the chunk fails it is rolled back to the savepoint and retried record
+    by record, so one bad record only drops itself. Returns the records
+    written.
+    """
+    conn.execute("SAVEPOINT batch_chunk")
+    try:
+        _write_records(conn, chunk)
+        conn.execute("RELEASE batch_chunk")
+        return chunk
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO batch_chunk")
+        conn.execute("RELEASE batch_chunk")
+    written = []
+    for rec in chunk:
+        conn.execute("SAVEPOINT batch_record")
+        try:
+            _write_records(conn, [rec])
+            conn.execute("RELEASE batch_record")
+            written.append(rec)
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO batch_record")
+            conn.execute("RELEASE batch_record")
+            errors.append((rec[0], str(e)))
+    return written
+
+
+def _apply_updates(conn, changed, errors, counts):
+    """Diff each changed existing record into place (own SAVEPOINT each).
+
+    Counts it as updated or unchanged; returns the records written.
+    """
+    written = []
+    for rec in changed:
+        conn.execute("SAVEPOINT batch_record")
+        try:
+            diff = _update_record(conn, rec)
+            conn.execute("RELEASE batch_record")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO batch_record")
+            conn.execute("RELEASE batch_record")
+            errors.append((rec[0], str(e)))
+            continue
+        written.append(rec)
+        if diff:
+            print(f"  UPDATE {rec[0]}: {', '.join(diff)}")
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+    return written
+
+
+def _same(old, new):
+    """Compare a stored value with a JSON value, ignoring SQLite type affinity."""
+    return old == new or (old is not None and new is not None and str(old) == str(new))
+
+
+def _update_record(conn, record):
+    """Apply one changed record to its existing rows as a field-level diff.
+
+    Only heritage/cave columns whose value differs are UPDATEd; the cave row
+    is inserted or deleted when it appears or disappears, and references are
+    matched as a multiset so unchanged ones keep their MATERIAL_SN. Returns
+    a list of human-readable change descriptions (empty if nothing changed).
+    """
+    survey_no, heritage, cave, refs = record[:4]
+    changes = []
+
+    row = conn.execute(
+        f"SELECT {', '.join(HERITAGE_COLUMNS)} FROM GEOLOGICAL_CULTURAL_HERITAGE "
+        "WHERE SURVEY_NO = ?",
+        (survey_no,),
+    ).fetchone()
+    diff = [
+        (col, new)
+        for col, old, new in zip(HERITAGE_COLUMNS, row, heritage)
+        if not _same(old, new)
+    ]
+    if diff:
+        conn.execute(
+            f"UPDATE GEOLOGICAL_CULTURAL_HERITAGE SET "
+            f"{', '.join(f'{col} = ?' for col, _ in diff)} WHERE SURVEY_NO = ?",
+            [new for _, new in diff] + [survey_no],
+        )
+        changes.extend(col for col, _ in diff)
+
+    row = conn.execute(
+        f"SELECT {', '.join(CAVE_COLUMNS)} FROM GEOLOGICAL_CULTURAL_CAVE "
+        "WHERE SURVEY_NO = ?",
+        (survey_no,),
+    ).fetchone()
+    if row and not cave:
+        conn.execute("DELETE FROM GEOLOGICAL_CULTURAL_CAVE WHERE SURVEY_NO = ?", (survey_no,))
+        changes.append("cave removed")
+    elif cave and not row:
+        conn.execute(CAVE_INSERT_SQL, cave)
+        changes.append("cave added")
+    elif cave:
+        diff = [
+            (col, new)
+            for col, old, new in zip(CAVE_COLUMNS, row, cave)
+            if not _same(old, new)
+        ]
+        if diff:
+            conn.execute(
+                f"UPDATE GEOLOGICAL_CULTURAL_CAVE SET "
+                f"{', '.join(f'{col} = ?' for col, _ in diff)} WHERE SURVEY_NO = ?",
+                [new for _, new in diff] + [survey_no],
+            )
+            changes.extend(f"cave.{col}" for col, _ in diff)
+
+    # Same multiset diff as the web save path (app.writes)
+    added, removed = sync_references(conn, survey_no, [ref[1:] for ref in refs])
+    if added or removed:
+        changes.append(f"references +{added} -{removed}")
+
+    return changes
+
+
+def import_batch(db_path, json_files, update=False, chunk_size=BATCH_CHUNK_SIZE,
+                 workers=BATCH_WORKERS, force=False):
+    """Import many JSON files in one transaction, skipping unchanged files.
+
+    Each source file's mtime, size and SHA-256 are recorded in IMPORT_STATE.
+    Files whose mtime and size are unchanged are not even read, and files
+    whose content hash is unchanged are not parsed (force=True ignores the
+    recorded state). New records are inserted; with update=True, changed
+    records that already exist are applied as a field-level diff instead of
+    delete-and-reinsert.
+
+    Phases: parse and RECORD_SCHEMA check (worker pool) → coords (all DMS strings converted and
+    bounds-checked in one batch, see app.coords) → validate (COMMON_CODE and
+    existing SURVEY_NOs loaded once) → write (executemany per chunk, each chunk in
+    its own SAVEPOINT) → commit. If a chunk fails, it is rolled back to its
+    savepoint and retried record by record so one bad file only drops
+    itself. A record whose coordinates fail app.coords validation is still
+    imported, with LAT/LON left NULL and the problem printed. Returns
+    (counts, errors, timings) where counts has imported, updated, unchanged,
+    skipped and bad_coords.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    init_db(conn)
+    codes = code_cache.get(conn).by_code
+    existing = {
+        r[0] for r in conn.execute("SELECT SURVEY_NO FROM GEOLOGICAL_CULTURAL_HERITAGE")
+    }
+    state = {}
+    if not force:
+        # A recorded file whose record has since been deleted is imported again
+        state = {
+            r[0]: r[1:4]
+            for r in conn.execute(
+                "SELECT SOURCE_PATH, MTIME_NS, FILE_SIZE, SHA256, SURVEY_NO FROM IMPORT_STATE"
+            )
+            if r[4] in existing
+        }
+    sources = [str(Path(p).resolve()) for p in json_files]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(_read_json, sources, [state.get(p) for p in sources]))
+    t1 = time.perf_counter()
+    timings["parse"] = t1 - t0
+
+    fresh = [(path, data) for path, status, _, data, _ in parsed if status == "changed"]
+    coords = dict(zip(
+        (path for path, _ in fresh),
+        parse_coordinates(
+            (data.get("lat_dms"), data.get("lon_dms")) if isinstance(data, dict) else (None, None)
+            for _, data in fresh
+        ),
+    ))
+    t2 = time.perf_counter()
+    timings["coords"] = t2 - t1
+
+    counts = {"imported": 0, "updated": 0, "unchanged": 0, "skipped": 0, "bad_coords": 0}
+    records, changed, touched, errors, seen = [], [], [], [], set()
+    for path, status, fingerprint, data, err in parsed:
+        if status == "error":
+            errors.append((Path(path).name, err))
+            continue
+        if status == "unchanged":
+            counts["unchanged"] += 1
+            continue
+        if status == "touched":
+            counts["unchanged"] += 1
+            touched.append((path, fingerprint))
+            continue
+        try:
+            survey_no = data["survey_no"]
+            missing = [t["code"] for t in data.get("types") or [] if t["code"] not in codes]
+            if missing:
+                raise ValueError(f"unknown type codes: {missing}")
+            if survey_no in seen:
+                raise ValueError("duplicate survey_no in batch")
+            if survey_no in existing and not update:
+                print(f"  SKIP {survey_no}: already exists (use --update to overwrite)")
+                counts["skipped"] += 1
+                continue
+            coord = coords[path]
+            _report_coord(survey_no, coord, counts)
+            record = _record(data, coord, path, fingerprint)
+            (changed if survey_no in existing else records).append(record)
+            seen.add(survey_no)
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append((Path(path).name, str(e)))
+    t3 = time.perf_counter()
+    timings["validate"] = t3 - t2
+
+    written = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("PRAGMA defer_foreign_keys = ON")
+        for i in range(0, len(records), chunk_size):
+            written += _insert_chunk(conn, records[i:i + chunk_size], errors)
+        counts["imported"] = len(written)
+        written += _apply_updates(conn, changed, errors, counts)
+        conn.executemany(
+            STATE_UPSERT_SQL, [(rec[4],) + rec[5] + (rec[0],) for rec in written]
+        )
+        # Same content, new mtime: only refresh the stat fingerprint
+        conn.executemany(
+            "UPDATE IMPORT_STATE SET MTIME_NS = ?, FILE_SIZE = ? WHERE SOURCE_PATH = ?",
+            [(fp[0], fp[1], path) for path, fp in touched],
+        )
+        t4 = time.perf_counter()
+        timings["write"] = t4 - t3
+        conn.execute("COMMIT")
+        timings["commit"] = time.perf_counter() - t4
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    return counts, errors, timings
+
+
+STREAM_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def is_stream_file(path):
+    """True for JSON Lines files (by suffix) and files holding a top-level array."""
+    if Path(path).suffix.lower() in STREAM_SUFFIXES:
+        return True
+    with open(path, encoding="utf-8-sig") as f:
+        head = f.read(4096)
+    return head.lstrip().startswith("[")
+
+
+def _stream_chunk(conn, chunk, codes, update, seen, counts, errors, timings):
+    """Validate and write one chunk of schema-checked records in its own transaction.
+
+    seen holds every SURVEY_NO met so far in the stream (updated in place), so
+    a repeat is reported as a duplicate even when it lands in a later chunk.
+    """
+    t0 = time.perf_counter()
+    coords = parse_coordinates((d.get("lat_dms"), d.get("lon_dms")) for d in chunk)
+    t1 = time.perf_counter()
+    timings["coords"] += t1 - t0
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("PRAGMA defer_foreign_keys = ON")
+        existing = {
+            r[0]
+            for r in conn.execute(
+                """SELECT SURVEY_NO FROM GEOLOGICAL_CULTURAL_HERITAGE
+                   WHERE SURVEY_NO IN (SELECT value FROM json_each(?))""",
+                (json.dumps([d["survey_no"] for d in chunk]),),
+            )
+        }
+        records, changed = [], []
+        for data, coord in zip(chunk, coords):
+            survey_no = data["survey_no"]
+            if survey_no in seen:
+                errors.append((survey_no, "duplicate survey_no in batch"))
+                continue
+            seen.add(survey_no)
+            missing = [t["code"] for t in data.get("types") or [] if t["code"] not in codes]
+            if missing:
+                errors.append((survey_no, f"unknown type codes: {missing}"))
+                continue
+            if survey_no in existing and not update:
+                print(f"  SKIP {survey_no}: already exists (use --update to overwrite)")
+                counts["skipped"] += 1
+                continue
+            _report_coord(survey_no, coord, counts)
+            (changed if survey_no in existing else records).append(_record(data, coord))
+        t2 = time.perf_counter()
+        timings["validate"] += t2 - t1
+
+        counts["imported"] += len(_insert_chunk(conn, records, errors))
+        _apply_updates(conn, changed, errors, counts)
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    timings["write"] += time.perf_counter() - t2
+
+
+def import_stream(db_path, source, update=False, chunk_size=BATCH_CHUNK_SIZE):
+    """Import one large JSON Lines file or top-level JSON array, streaming.
+
+    Records are decoded incrementally (iter_json_stream), checked against
+    RECORD_SCHEMA and gathered into chunks of chunk_size. Each chunk goes
+    through import_batch's steps for just that chunk — coords, type codes,
+    existing SURVEY_NOs, executemany in a SAVEPOINT with per-record
+    fallback, field-level diffs with update=True — and is committed on its
+    own, so memory stays bounded by the chunk size whatever the input size.
+    An interrupted run can simply be repeated: records already imported are
+    skipped (or diffed with update=True). A SURVEY_NO repeated anywhere in
+    the stream is reported as a duplicate. IMPORT_STATE tracks one record per
+    file and is not used here. Returns (counts, errors, timings) like
+    import_batch; errors are (location or SURVEY_NO, message).
+    """
+    timings = dict.fromkeys(("read", "coords", "validate", "write"), 0.0)
+    counts = {"imported": 0, "updated": 0, "unchanged": 0, "skipped": 0, "bad_coords": 0}
+    errors = []
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        init_db(conn)
+        codes = code_cache.get(conn).by_code
+        chunk, seen = [], set()
+        t = time.perf_counter()
+        for where, data, err in iter_json_stream(source):
+            problems = [err] if err else validate_record(data)
+            if problems:
+                errors.append((where, "; ".join(problems)))
+                continue
+            chunk.append(data)
+            if len(chunk) >= chunk_size:
+                timings["read"] += time.perf_counter() - t
+                _stream_chunk(conn, chunk, codes, update, seen, counts, errors, timings)
+                chunk = []
+                t = time.perf_counter()
+        timings["read"] += time.perf_counter() - t
+        if chunk:
+            _stream_chunk(conn, chunk, codes, update, seen, counts, errors, timings)
+    finally:
+        conn.close()
+
+    return counts, errors, timings
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def import_manifest(db_path, manifest_path):
+    """Bulk-load extract_pdf_images.py's manifest.csv into CHT_IMAG_DM.
+
+    Paths in the manifest are relative to the directory that holds
+    extracted_images/ (heritage_list/). Rows are diffed against existing
+    CHT_IMAG_DM rows by file SHA-256, so re-runs only insert new images,
+    update changed ones and delete images that are no longer extracted.
+    Everything happens in a single transaction.
+    """
+    manifest_path = Path(manifest_path)
+    base = manifest_path.resolve().parent.parent
+    with open(manifest_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    init_db(conn)
+
+    try:
+        known = {
+            r[0]
+            for r in conn.execute("SELECT SURVEY_NO FROM GEOLOGICAL_CULTURAL_HERITAGE")
+        }
+        existing = {
+            (r[1], r[2]): (r[0], r[3])
+            for r in conn.execute(
+                """SELECT FILE_SN, SAVE_PT, SFILE_NM, FILE_HASH FROM CHT_IMAG_DM
+                   WHERE SAVE_PT LIKE 'extracted_images/%'"""
+            )
+        }
+
+        inserts, updates, seen = [], [], set()
+        unknown, missing, unchanged = 0, 0, 0
+        for row in rows:
+            if row["survey_no"] not in known:
+                unknown += 1
+                continue
+            rel = Path(row["output_file"])
+            path = base / rel
+            if not path.is_file():
+                missing += 1
+                continue
+            key = (rel.parent.as_posix(), rel.name)
+            seen.add(key)
+            digest = file_sha256(path)
+            values = (
+                row["survey_no"],
+                rel.stem.rsplit("_", 1)[-1],
+                row["pdf_file"],
+                str(path.stat().st_size),
+                digest,
+                int(row["width"]) if row["width"] else None,
+                int(row["height"]) if row["height"] else None,
+                row["title"] or None,
+            )
+            if key not in existing:
+                inserts.append(key + values)
+            elif existing[key][1] != digest:
+                updates.append(values + (existing[key][0],))
+            else:
+                unchanged += 1
+
+        deletes = [(sn,) for key, (sn, _) in existing.items() if key not in seen]
+
+        conn.executemany(
+            """INSERT INTO CHT_IMAG_DM
+               (SAVE_PT, SFILE_NM, REF_SEID, SUB_NO, OFILE_NM, FILE_SZ, FILE_HASH,
+                IMG_WIDTH, IMG_HEIGHT, REMARK, CREATE_DT)
+               VALUES (?,?,?,?,?,?,?,?,?,?,datetime('now'))""",
+            inserts,
+        )
+        conn.executemany(
+            """UPDATE CHT_IMAG_DM SET
+               REF_SEID=?, SUB_NO=?, OFILE_NM=?, FILE_SZ=?, FILE_HASH=?,
+               IMG_WIDTH=?, IMG_HEIGHT=?, REMARK=?
+               WHERE FILE_SN=?""",
+            updates,
+        )
+        conn.executemany("DELETE FROM CHT_IMAG_DM WHERE FILE_SN = ?", deletes)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    print(
+        f"Done: {len(inserts)} inserted, {len(updates)} updated, "
+        f"{len(deletes)} deleted, {unchanged} unchanged"
+    )
+    if unknown or missing:
+        print(f"  skipped: {unknown} unknown survey_no, {missing} missing files")
+
+
+def _option(name, default):
+    """Value following a `--name` flag on the command line, or default."""
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return default
+
+
+def _print_summary(counts, errors, timings):
+    for name, err in errors:
+        print(f"  ERROR {name}: {err}")
+    print(
+        f"Done: {counts['imported']} imported, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged, {counts['skipped']} skipped, "
+        f"{len(errors)} errors"
+    )
+    if counts["bad_coords"]:
+        print(f"  {counts['bad_coords']} record(s) imported without coordinates (see COORD lines)")
+    print("  " + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in timings.items()))
+
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: python import_heritage.py <db_path> <json_path_or_dir> [--update]")
+        print("       python import_heritage.py <db_path> --images <manifest.csv>")
         print()
         print("  db_path          Path to SQLite database")
-        print("  json_path_or_dir Single JSON file or directory of JSON files")
-        print("  --update         Overwrite existing records (default: skip)")
+        print("  json_path_or_dir Single JSON file or directory of JSON files; a .jsonl/.ndjson")
+        print("                   file or a file holding a JSON array is streamed")
+        print("  --update         Update existing records in place, field by field (default: skip)")
+        print("  --force          Directory import: re-read files even if unchanged")
+        print("  --images         Load extracted image manifest into CHT_IMAG_DM")
+        print("  --stream         Stream the file even without a .jsonl suffix or '['")
+        print("  --chunk N        Directory/stream import: records per executemany chunk")
+        print(f"                   (default: {BATCH_CHUNK_SIZE})")
+        print(f"  --workers N      Directory import: parser threads (default: {BATCH_WORKERS})")
         sys.exit(1)
 
     db_path = sys.argv[1]
@@ -223,7 +1067,24 @@ def main():
         print(f"Error: database not found: {db_path}")
         sys.exit(1)
 
+    if target == "--images":
+        if len(sys.argv) < 4 or not Path(sys.argv[3]).is_file():
+            print("Error: --images requires a manifest.csv path")
+            sys.exit(1)
+        import_manifest(db_path, sys.argv[3])
+        return
+
     target_path = Path(target)
+    if target_path.is_file() and ("--stream" in sys.argv or is_stream_file(target_path)):
+        print(f"Streaming {target} into {db_path}")
+        counts, errors, timings = import_stream(
+            db_path,
+            target_path,
+            update=update,
+            chunk_size=int(_option("--chunk", BATCH_CHUNK_SIZE)),
+        )
+        _print_summary(counts, errors, timings)
+        return
     if target_path.is_file():
         json_files = [target_path]
     elif target_path.is_dir():
@@ -236,15 +1097,21 @@ def main():
         sys.exit(1)
 
     print(f"Importing {len(json_files)} file(s) into {db_path}")
-    ok, skip_err = 0, 0
-    for jf in json_files:
-        print(f"  Processing {jf.name}...")
-        if import_json(db_path, str(jf), update):
-            ok += 1
-        else:
-            skip_err += 1
 
-    print(f"Done: {ok} imported, {skip_err} skipped/errors")
+    if target_path.is_file():
+        status = import_json(db_path, str(json_files[0]), update)
+        print(f"Done: 1 {status}" if status else "Done: 0 imported, 1 skipped/errors")
+        return
+
+    counts, errors, timings = import_batch(
+        db_path,
+        json_files,
+        update=update,
+        chunk_size=int(_option("--chunk", BATCH_CHUNK_SIZE)),
+        workers=int(_option("--workers", BATCH_WORKERS)),
+        force="--force" in sys.argv,
+    )
+    _print_summary(counts, errors, timings)
 
 
 if __name__ == "__main__":
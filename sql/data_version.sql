@@ -0,0 +1,101 @@
+-- ============================================
+-- DATA_VERSION — 데이터 변경 카운터 (프로세스 간 캐시 무효화용)
+-- ============================================
+-- 유산/동굴/참고문헌/분류코드/사진 행이 바뀔 때마다 트리거가 VERSION을 1씩 올린다.
+-- 웹 서버는 읽기 작업 전에 이 값을 확인해, 자기가 커밋하지 않은 변경(일괄 입력 등
+-- 다른 프로세스)이 있으면 건수/패싯/클러스터/응답 캐시를 모두 버린다 (app/cache.py).
+CREATE TABLE IF NOT EXISTS DATA_VERSION (
+    ID      INTEGER PRIMARY KEY CHECK (ID = 1),
+    VERSION INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO DATA_VERSION (ID, VERSION) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_VERSION_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_VERSION_AU
+AFTER UPDATE ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_VERSION_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_VERSION_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_VERSION_AU
+AFTER UPDATE ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_VERSION_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REFERENCE_VERSION_AI
+AFTER INSERT ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REFERENCE_VERSION_AU
+AFTER UPDATE ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REFERENCE_VERSION_AD
+AFTER DELETE ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_VERSION_AI
+AFTER INSERT ON COMMON_CODE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_VERSION_AU
+AFTER UPDATE ON COMMON_CODE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_VERSION_AD
+AFTER DELETE ON COMMON_CODE
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_IMAGE_VERSION_AI
+AFTER INSERT ON CHT_IMAG_DM
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_IMAGE_VERSION_AU
+AFTER UPDATE ON CHT_IMAG_DM
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_IMAGE_VERSION_AD
+AFTER DELETE ON CHT_IMAG_DM
+BEGIN
+    UPDATE DATA_VERSION SET VERSION = VERSION + 1 WHERE ID = 1;
+END;
@@ -78,6 +78,9 @@ CREATE TABLE CHT_IMAG_DM (
     SFILE_NM    TEXT,
     OFILE_NM    TEXT,
     FILE_SZ     TEXT,
+    FILE_HASH   TEXT,
+    IMG_WIDTH   INTEGER,
+    IMG_HEIGHT  INTEGER,
 
     CREATE_DT   TEXT,
     CREATOR_ID  TEXT,
@@ -0,0 +1,43 @@
+-- ============================================
+-- HERITAGE_RTREE — 위치 공간 색인 (R*Tree)
+-- ============================================
+-- 좌표(LAT/LON)가 있는 유산만 점(최소=최대) 사각형으로 색인한다.
+-- id는 GEOLOGICAL_CULTURAL_HERITAGE의 rowid와 같게 유지하며,
+-- 트리거가 유산 테이블의 등록/좌표 수정/삭제를 따라간다.
+-- (VACUUM으로 rowid가 바뀌면 app.database.init_db()가 색인을 다시 만든다)
+CREATE VIRTUAL TABLE IF NOT EXISTS HERITAGE_RTREE USING rtree(
+    id,
+    MIN_LAT, MAX_LAT,
+    MIN_LON, MAX_LON,
+    +SURVEY_NO
+);
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_RTREE_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_HERITAGE
+WHEN NEW.LAT IS NOT NULL AND NEW.LON IS NOT NULL
+BEGIN
+    INSERT INTO HERITAGE_RTREE (id, MIN_LAT, MAX_LAT, MIN_LON, MAX_LON, SURVEY_NO)
+    VALUES (NEW.rowid, NEW.LAT, NEW.LAT, NEW.LON, NEW.LON, NEW.SURVEY_NO);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_RTREE_AU
+AFTER UPDATE OF SURVEY_NO, LAT, LON ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_RTREE WHERE id = OLD.rowid;
+    INSERT INTO HERITAGE_RTREE (id, MIN_LAT, MAX_LAT, MIN_LON, MAX_LON, SURVEY_NO)
+    SELECT NEW.rowid, NEW.LAT, NEW.LAT, NEW.LON, NEW.LON, NEW.SURVEY_NO
+    WHERE NEW.LAT IS NOT NULL AND NEW.LON IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_RTREE_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_RTREE WHERE id = OLD.rowid;
+END;
+
+-- 기존 데이터 최초 색인 (색인이 비어 있을 때만)
+INSERT INTO HERITAGE_RTREE (id, MIN_LAT, MAX_LAT, MIN_LON, MAX_LON, SURVEY_NO)
+SELECT rowid, LAT, LAT, LON, LON, SURVEY_NO
+FROM GEOLOGICAL_CULTURAL_HERITAGE
+WHERE LAT IS NOT NULL AND LON IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM HERITAGE_RTREE);
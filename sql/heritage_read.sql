@@ -0,0 +1,135 @@
+-- ============================================
+-- HERITAGE_READ — 목록/필터/지도용 비정규화 읽기 테이블
+-- ============================================
+-- 목록/지도/패싯에 필요한 유산 컬럼에 분류코드 이름/대분류/중분류(COMMON_CODE)와
+-- 동굴 여부를 미리 붙여 둔다. 조회 시 COMMON_CODE/동굴 테이블을 조인하지 않는다.
+-- ID는 GEOLOGICAL_CULTURAL_HERITAGE의 rowid와 같게 유지하므로 HERITAGE_FTS,
+-- HERITAGE_RTREE와 rowid로 바로 맞붙일 수 있다.
+-- 행 내용은 HERITAGE_READ_SRC 뷰 한 곳에서 정의하고, 트리거는 바뀐 유산의 행을
+-- 지운 뒤 뷰에서 다시 읽어 넣는다. (바깥 문장이 UPSERT이면 트리거 안의
+-- OR REPLACE 충돌 처리가 무시되므로 DELETE + INSERT를 쓴다)
+-- (VACUUM으로 rowid가 바뀌면 app.database.init_db()가 테이블을 다시 채운다)
+CREATE TABLE IF NOT EXISTS HERITAGE_READ (
+    ID          INTEGER PRIMARY KEY,
+    SURVEY_NO   TEXT NOT NULL UNIQUE,
+    GCH_NM      TEXT,
+    TY1_CD      TEXT,
+    TY1_DES     TEXT,
+    TY2_CD      TEXT,
+    TY3_CD      TEXT,
+    ADDRESS     TEXT,
+    GEOLGC_AGE  TEXT,
+    AREA_NM     TEXT,
+    SURVEY_YEAR INTEGER,
+    LAT         REAL,
+    LON         REAL,
+    TY1_NM      TEXT,
+    TY1_TOP_CD  TEXT,
+    TY1_TOP_NM  TEXT,
+    TY1_MID_CD  TEXT,
+    TY2_NM      TEXT,
+    TY2_TOP_NM  TEXT,
+    TY3_NM      TEXT,
+    TY3_TOP_NM  TEXT,
+    HAS_CAVE    INTEGER NOT NULL DEFAULT 0
+);
+
+-- 대분류 필터 + SURVEY_NO 정렬을 색인 하나로 처리
+CREATE INDEX IF NOT EXISTS IDX_HERITAGE_READ_TOP ON HERITAGE_READ(TY1_TOP_CD, SURVEY_NO);
+-- 패싯 필터 (/?mid=, area=, year=, age=)
+CREATE INDEX IF NOT EXISTS IDX_HERITAGE_READ_MID ON HERITAGE_READ(TY1_MID_CD, SURVEY_NO);
+CREATE INDEX IF NOT EXISTS IDX_HERITAGE_READ_AREA ON HERITAGE_READ(AREA_NM, SURVEY_NO);
+CREATE INDEX IF NOT EXISTS IDX_HERITAGE_READ_YEAR ON HERITAGE_READ(SURVEY_YEAR, SURVEY_NO);
+CREATE INDEX IF NOT EXISTS IDX_HERITAGE_READ_AGE ON HERITAGE_READ(GEOLGC_AGE, SURVEY_NO);
+
+CREATE VIEW IF NOT EXISTS HERITAGE_READ_SRC AS
+SELECT h.rowid AS ID, h.SURVEY_NO, h.GCH_NM, h.TY1_CD, h.TY1_DES, h.TY2_CD, h.TY3_CD,
+       h.ADDRESS, h.GEOLGC_AGE, h.AREA_NM, h.SURVEY_YEAR, h.LAT, h.LON,
+       c1.CODE_NM, c1.TOP_CD, c1.TOP_CD_NM, c1.MID_CD,
+       c2.CODE_NM, c2.TOP_CD_NM,
+       c3.CODE_NM, c3.TOP_CD_NM,
+       EXISTS (SELECT 1 FROM GEOLOGICAL_CULTURAL_CAVE c WHERE c.SURVEY_NO = h.SURVEY_NO)
+FROM GEOLOGICAL_CULTURAL_HERITAGE h
+LEFT JOIN COMMON_CODE c1 ON c1.CODE = h.TY1_CD
+LEFT JOIN COMMON_CODE c2 ON c2.CODE = h.TY2_CD
+LEFT JOIN COMMON_CODE c3 ON c3.CODE = h.TY3_CD;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_READ_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    INSERT INTO HERITAGE_READ
+    SELECT * FROM HERITAGE_READ_SRC WHERE SURVEY_NO = NEW.SURVEY_NO;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_READ_AU
+AFTER UPDATE OF SURVEY_NO, GCH_NM, TY1_CD, TY1_DES, TY2_CD, TY3_CD,
+                ADDRESS, GEOLGC_AGE, AREA_NM, SURVEY_YEAR, LAT, LON
+ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_READ WHERE ID = OLD.rowid;
+    INSERT INTO HERITAGE_READ
+    SELECT * FROM HERITAGE_READ_SRC WHERE SURVEY_NO = NEW.SURVEY_NO;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_READ_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_READ WHERE ID = OLD.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_READ_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE HERITAGE_READ SET HAS_CAVE = 1 WHERE SURVEY_NO = NEW.SURVEY_NO;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_READ_AU
+AFTER UPDATE OF SURVEY_NO ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE HERITAGE_READ SET HAS_CAVE = 0 WHERE SURVEY_NO = OLD.SURVEY_NO;
+    UPDATE HERITAGE_READ SET HAS_CAVE = 1 WHERE SURVEY_NO = NEW.SURVEY_NO;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CAVE_READ_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_CAVE
+BEGIN
+    UPDATE HERITAGE_READ SET HAS_CAVE = 0 WHERE SURVEY_NO = OLD.SURVEY_NO;
+END;
+
+-- 분류코드 이름/대분류가 바뀌면 그 코드를 쓰는 유산만 다시 계산한다
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_READ_AI
+AFTER INSERT ON COMMON_CODE
+BEGIN
+    DELETE FROM HERITAGE_READ
+    WHERE TY1_CD = NEW.CODE OR TY2_CD = NEW.CODE OR TY3_CD = NEW.CODE;
+    INSERT INTO HERITAGE_READ
+    SELECT * FROM HERITAGE_READ_SRC
+    WHERE TY1_CD = NEW.CODE OR TY2_CD = NEW.CODE OR TY3_CD = NEW.CODE;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_READ_AU
+AFTER UPDATE OF CODE, CODE_NM, TOP_CD, TOP_CD_NM, MID_CD ON COMMON_CODE
+BEGIN
+    DELETE FROM HERITAGE_READ
+    WHERE TY1_CD IN (OLD.CODE, NEW.CODE) OR TY2_CD IN (OLD.CODE, NEW.CODE)
+       OR TY3_CD IN (OLD.CODE, NEW.CODE);
+    INSERT INTO HERITAGE_READ
+    SELECT * FROM HERITAGE_READ_SRC
+    WHERE TY1_CD IN (OLD.CODE, NEW.CODE) OR TY2_CD IN (OLD.CODE, NEW.CODE)
+       OR TY3_CD IN (OLD.CODE, NEW.CODE);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_CODE_READ_AD
+AFTER DELETE ON COMMON_CODE
+BEGIN
+    DELETE FROM HERITAGE_READ
+    WHERE TY1_CD = OLD.CODE OR TY2_CD = OLD.CODE OR TY3_CD = OLD.CODE;
+    INSERT INTO HERITAGE_READ
+    SELECT * FROM HERITAGE_READ_SRC
+    WHERE TY1_CD = OLD.CODE OR TY2_CD = OLD.CODE OR TY3_CD = OLD.CODE;
+END;
+
+-- 기존 데이터 최초 적재 (테이블이 비어 있을 때만)
+INSERT INTO HERITAGE_READ
+SELECT * FROM HERITAGE_READ_SRC
+WHERE NOT EXISTS (SELECT 1 FROM HERITAGE_READ);
@@ -0,0 +1,97 @@
+-- ============================================
+-- HERITAGE_FTS — 전문 검색 색인 (FTS5, trigram)
+-- ============================================
+-- 유산명/주소/암석기재/지질시대/대표암석 + 참고문헌명을 한 행으로 색인한다.
+-- trigram 토크나이저는 띄어쓰기와 무관하게 3글자 이상의 부분 문자열을
+-- 찾으므로 한글 부분 일치 검색이 가능하다 (SQLite 3.34+).
+-- rowid는 GEOLOGICAL_CULTURAL_HERITAGE의 rowid와 같게 유지하며,
+-- 트리거가 GEOLOGICAL_CULTURAL_HERITAGE / REFERENCE_MATERIAL 변경을 따라간다.
+-- (VACUUM으로 rowid가 바뀌면 app.database.init_db()가 색인을 다시 만든다)
+CREATE VIRTUAL TABLE IF NOT EXISTS HERITAGE_FTS USING fts5(
+    SURVEY_NO UNINDEXED,
+    GCH_NM,
+    ADDRESS,
+    RKFR_DES,
+    GEOLGC_AGE,
+    RRSTV_RCK,
+    MATERIAL_NM,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_FTS_AI
+AFTER INSERT ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    INSERT INTO HERITAGE_FTS
+        (rowid, SURVEY_NO, GCH_NM, ADDRESS, RKFR_DES, GEOLGC_AGE, RRSTV_RCK, MATERIAL_NM)
+    VALUES (
+        NEW.rowid, NEW.SURVEY_NO, NEW.GCH_NM, NEW.ADDRESS, NEW.RKFR_DES,
+        NEW.GEOLGC_AGE, NEW.RRSTV_RCK,
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = NEW.SURVEY_NO)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_FTS_AU
+AFTER UPDATE OF SURVEY_NO, GCH_NM, ADDRESS, RKFR_DES, GEOLGC_AGE, RRSTV_RCK
+ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_FTS WHERE rowid = OLD.rowid;
+    INSERT INTO HERITAGE_FTS
+        (rowid, SURVEY_NO, GCH_NM, ADDRESS, RKFR_DES, GEOLGC_AGE, RRSTV_RCK, MATERIAL_NM)
+    VALUES (
+        NEW.rowid, NEW.SURVEY_NO, NEW.GCH_NM, NEW.ADDRESS, NEW.RKFR_DES,
+        NEW.GEOLGC_AGE, NEW.RRSTV_RCK,
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = NEW.SURVEY_NO)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_HERITAGE_FTS_AD
+AFTER DELETE ON GEOLOGICAL_CULTURAL_HERITAGE
+BEGIN
+    DELETE FROM HERITAGE_FTS WHERE rowid = OLD.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REF_FTS_AI
+AFTER INSERT ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE HERITAGE_FTS SET MATERIAL_NM =
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = NEW.SURVEY_NO)
+    WHERE rowid = (SELECT rowid FROM GEOLOGICAL_CULTURAL_HERITAGE
+                   WHERE SURVEY_NO = NEW.SURVEY_NO);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REF_FTS_AU
+AFTER UPDATE OF SURVEY_NO, MATERIAL_NM ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE HERITAGE_FTS SET MATERIAL_NM =
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = OLD.SURVEY_NO)
+    WHERE rowid = (SELECT rowid FROM GEOLOGICAL_CULTURAL_HERITAGE
+                   WHERE SURVEY_NO = OLD.SURVEY_NO);
+    UPDATE HERITAGE_FTS SET MATERIAL_NM =
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = NEW.SURVEY_NO)
+    WHERE rowid = (SELECT rowid FROM GEOLOGICAL_CULTURAL_HERITAGE
+                   WHERE SURVEY_NO = NEW.SURVEY_NO);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TRG_REF_FTS_AD
+AFTER DELETE ON REFERENCE_MATERIAL
+BEGIN
+    UPDATE HERITAGE_FTS SET MATERIAL_NM =
+        (SELECT group_concat(MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL
+         WHERE SURVEY_NO = OLD.SURVEY_NO)
+    WHERE rowid = (SELECT rowid FROM GEOLOGICAL_CULTURAL_HERITAGE
+                   WHERE SURVEY_NO = OLD.SURVEY_NO);
+END;
+
+-- 기존 데이터 최초 색인 (색인이 비어 있을 때만)
+INSERT INTO HERITAGE_FTS
+    (rowid, SURVEY_NO, GCH_NM, ADDRESS, RKFR_DES, GEOLGC_AGE, RRSTV_RCK, MATERIAL_NM)
+SELECT h.rowid, h.SURVEY_NO, h.GCH_NM, h.ADDRESS, h.RKFR_DES, h.GEOLGC_AGE, h.RRSTV_RCK,
+       (SELECT group_concat(r.MATERIAL_NM, char(10)) FROM REFERENCE_MATERIAL r
+        WHERE r.SURVEY_NO = h.SURVEY_NO)
+FROM GEOLOGICAL_CULTURAL_HERITAGE h
+WHERE NOT EXISTS (SELECT 1 FROM HERITAGE_FTS);
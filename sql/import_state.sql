@@ -0,0 +1,13 @@
+-- ============================================
+-- IMPORT_STATE — JSON 입력 파일 상태 (증분 입력용)
+-- ============================================
+-- import_heritage.py가 마지막으로 반영한 원본 파일의 mtime/크기/SHA-256.
+-- mtime과 크기가 같으면 파일을 읽지 않고, 해시가 같으면 다시 입력하지 않는다.
+CREATE TABLE IF NOT EXISTS IMPORT_STATE (
+    SOURCE_PATH  TEXT PRIMARY KEY,
+    MTIME_NS     INTEGER,
+    FILE_SIZE    INTEGER,
+    SHA256       TEXT,
+    SURVEY_NO    TEXT,
+    IMPORT_DT    TEXT
+);